@@ -0,0 +1,213 @@
+# core/cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+Key = Tuple[str, Hashable]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float      # 이 시각까지는 그대로 반환
+    stale_until: float      # 이 시각까지는 오래된 값을 반환하면서 백그라운드 갱신
+
+
+class TTLCache:
+    """
+    (네임스페이스, 파라미터) 키 단위의 프로세스 내 TTL 캐시.
+    - 키마다 ttl/stale 을 따로 줄 수 있음
+    - max_entries 를 넘으면 가장 오래 안 쓴 키부터 제거(LRU)
+    - TTL 이 지났지만 stale 구간이면 이전 값을 즉시 돌려주고 백그라운드에서 갱신
+    - 쓰기 경로에서는 invalidate(네임스페이스...) 로 비움. 스레드풀의 동기 쓰기에서도 부를 수 있어 내부 상태는 락으로 보호
+    - 로더를 singleflight 로 합칠 때는 generation(네임스페이스) 를 키에 넣어, invalidate 전에 시작된 로드에
+      invalidate 뒤의 조회가 합류하지 않게 할 것
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[Key, _Entry]" = OrderedDict()
+        self._refreshing: Dict[Key, asyncio.Task] = {}
+        self._gen: Dict[str, int] = {}      # invalidate 이후 끝난 로더가 옛 값을 넣지 않도록
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._gen.get(namespace, 0)
+
+    def _put(self, key: Key, value: Any, ttl: float, stale: float, gen: int) -> None:
+        with self._lock:
+            if self._gen.get(key[0], 0) != gen:
+                return
+            now = time.monotonic()
+            self._data[key] = _Entry(value, now + ttl, now + ttl + stale)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    async def _load(self, key: Key, loader: Callable[[], Awaitable[Any]], ttl: float, stale: float) -> Any:
+        # loader() 는 generation 을 읽은 직후 await 없이 호출되므로 둘은 같은 세대
+        gen = self.generation(key[0])
+        value = await loader()
+        self._put(key, value, ttl, stale, gen)
+        return value
+
+    def _revalidate(self, key: Key, loader: Callable[[], Awaitable[Any]], ttl: float, stale: float) -> None:
+        if key in self._refreshing:
+            return
+
+        async def run() -> None:
+            try:
+                await self._load(key, loader, ttl, stale)
+            except Exception as e:
+                print(f"[경고] 캐시 갱신 실패 {key[0]}: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(run())
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        params: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        ttl: float,
+        stale: float = 0.0,
+    ) -> Any:
+        key = (namespace, params)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if now < entry.fresh_until:
+                    self.hits += 1
+                    self._data.move_to_end(key)
+                    return entry.value
+                if now < entry.stale_until:
+                    self.stale_hits += 1
+                    self._data.move_to_end(key)
+                else:
+                    del self._data[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+        if entry is not None:
+            self._revalidate(key, loader, ttl, stale)
+            return entry.value
+        return await self._load(key, loader, ttl, stale)
+
+    def invalidate(self, *namespaces: str) -> None:
+        targets: Set[str] = set(namespaces)
+        with self._lock:
+            for ns in targets:
+                self._gen[ns] = self._gen.get(ns, 0) + 1
+            for key in [k for k in self._data if k[0] in targets]:
+                del self._data[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            namespaces = {k[0] for k in self._data}
+        self.invalidate(*namespaces)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            per_ns: Dict[str, int] = {}
+            for ns, _ in self._data:
+                per_ns[ns] = per_ns.get(ns, 0) + 1
+            entries = len(self._data)
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "refreshing": len(self._refreshing),
+            "by_namespace": per_ns,
+        }
+
+
+def freeze(d: Optional[Dict[str, Any]]) -> Hashable:
+    # kwargs → 캐시 키 (None 값은 생략해 같은 호출을 같은 키로)
+    return tuple(sorted((k, v) for k, v in (d or {}).items() if v is not None))
+
+
+class TTLMap:
+    """
+    동기 코드(스레드풀 의존성 등)용 TTL + LRU 맵. 로더 없이 get/set 만 하고 스레드 안전.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, *, max_entries: int, ttl: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, self._MISSING)
+            if item is not self._MISSING and time.monotonic() < item[1]:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not self._MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, pred: Callable[[Any], bool]) -> int:
+        with self._lock:
+            keys = [k for k, (v, _exp) in self._data.items() if pred(v)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,41 @@
+# core/concurrency.py
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_bounded(
+    calls: Sequence[Callable[[], Awaitable[T]]],
+    *,
+    limit: int,
+    timeout: Optional[float] = None,
+) -> List[T | BaseException]:
+    """
+    calls 를 최대 limit 개씩 동시에 실행하고, 입력 순서대로 결과(또는 예외)를 돌려준다.
+    timeout 안에 끝나지 않은 호출은 취소되고 asyncio.TimeoutError 로 채워진다.
+    """
+    if not calls:
+        return []
+
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _run(call: Callable[[], Awaitable[T]]) -> T:
+        async with sem:
+            return await call()
+
+    tasks = [asyncio.ensure_future(_run(c)) for c in calls]
+    _done, pending = await asyncio.wait(tasks, timeout=timeout if timeout is None else max(0.0, timeout))
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    out: List[T | BaseException] = []
+    for t in tasks:
+        if t in pending:
+            out.append(asyncio.TimeoutError())
+            continue
+        exc = t.exception()
+        out.append(exc if exc is not None else t.result())
+    return out
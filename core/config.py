@@ -42,9 +42,205 @@ class Settings(BaseSettings):
         "", validation_alias=AliasChoices("SERVER_ONLY_AI_API_KEY", "AI_API_TOKEN", "server_only_ai_api_key", "ai_api_token")
     )
 
-    @field_validator("CORS_ORIGINS", mode="before")
+    # AI HTTP client (워커당 공유 커넥션 풀)
+    AI_HTTP_MAX_CONNECTIONS: int = Field(
+        200, validation_alias=AliasChoices("AI_HTTP_MAX_CONNECTIONS", "ai_http_max_connections")
+    )
+    AI_HTTP_MAX_KEEPALIVE: int = Field(
+        20, validation_alias=AliasChoices("AI_HTTP_MAX_KEEPALIVE", "ai_http_max_keepalive")
+    )
+    AI_HTTP_KEEPALIVE_EXPIRY: float = Field(
+        30.0, validation_alias=AliasChoices("AI_HTTP_KEEPALIVE_EXPIRY", "ai_http_keepalive_expiry")
+    )
+    AI_CONNECT_TIMEOUT: float = Field(5.0, validation_alias=AliasChoices("AI_CONNECT_TIMEOUT", "ai_connect_timeout"))
+    AI_TIMEOUT_ANALYSIS: float = Field(30.0, validation_alias=AliasChoices("AI_TIMEOUT_ANALYSIS", "ai_timeout_analysis"))
+    AI_TIMEOUT_LIST: float = Field(20.0, validation_alias=AliasChoices("AI_TIMEOUT_LIST", "ai_timeout_list"))
+    AI_TIMEOUT_MATCH: float = Field(15.0, validation_alias=AliasChoices("AI_TIMEOUT_MATCH", "ai_timeout_match"))
+    AI_TIMEOUT_WRITE: float = Field(30.0, validation_alias=AliasChoices("AI_TIMEOUT_WRITE", "ai_timeout_write"))
+
+    # GET /notifications 매칭 조회 fan-out
+    NOTIFY_FANOUT_CONCURRENCY: int = Field(
+        8, validation_alias=AliasChoices("NOTIFY_FANOUT_CONCURRENCY", "notify_fanout_concurrency")
+    )
+    NOTIFY_FANOUT_DEADLINE: float = Field(
+        10.0, validation_alias=AliasChoices("NOTIFY_FANOUT_DEADLINE", "notify_fanout_deadline")
+    )
+
+    # 알림함 (services/notification_inbox.py): 페이지 크기, AI 에서 다시 채우는 주기(초, 웹훅 누락 대비)
+    NOTIFY_INBOX_ENABLED: bool = Field(True, validation_alias=AliasChoices("NOTIFY_INBOX_ENABLED", "notify_inbox_enabled"))
+    NOTIFY_INBOX_PAGE_SIZE: int = Field(
+        50, validation_alias=AliasChoices("NOTIFY_INBOX_PAGE_SIZE", "notify_inbox_page_size")
+    )
+    NOTIFY_INBOX_MAX_AGE: float = Field(
+        600.0, validation_alias=AliasChoices("NOTIFY_INBOX_MAX_AGE", "notify_inbox_max_age")
+    )
+
+    # GET /notifications/stream (SSE): heartbeat 간격, 다른 워커 이벤트 조회 주기, Last-Event-ID 재개 최대 건수,
+    # 연결별 대기열 크기, 클라이언트 재접속 대기(초), 접속용 스트림 티켓 유효 시간(초)
+    NOTIFY_STREAM_HEARTBEAT: float = Field(
+        15.0, validation_alias=AliasChoices("NOTIFY_STREAM_HEARTBEAT", "notify_stream_heartbeat")
+    )
+    NOTIFY_STREAM_POLL: float = Field(1.0, validation_alias=AliasChoices("NOTIFY_STREAM_POLL", "notify_stream_poll"))
+    NOTIFY_STREAM_REPLAY_MAX: int = Field(
+        200, validation_alias=AliasChoices("NOTIFY_STREAM_REPLAY_MAX", "notify_stream_replay_max")
+    )
+    NOTIFY_STREAM_QUEUE: int = Field(100, validation_alias=AliasChoices("NOTIFY_STREAM_QUEUE", "notify_stream_queue"))
+    NOTIFY_STREAM_RETRY: float = Field(3.0, validation_alias=AliasChoices("NOTIFY_STREAM_RETRY", "notify_stream_retry"))
+    NOTIFY_STREAM_TICKET_TTL: int = Field(
+        60, validation_alias=AliasChoices("NOTIFY_STREAM_TICKET_TTL", "notify_stream_ticket_ttl")
+    )
+
+    # request_id 인덱스 (services/request_index.py)
+    REQUEST_INDEX_TTL: float = Field(60.0, validation_alias=AliasChoices("REQUEST_INDEX_TTL", "request_index_ttl"))
+    REQUEST_INDEX_MISS_REFRESH: float = Field(
+        5.0, validation_alias=AliasChoices("REQUEST_INDEX_MISS_REFRESH", "request_index_miss_refresh")
+    )
+
+    # AI 요청/자원 로컬 미러 (services/mirror_service.py)
+    MIRROR_ENABLED: bool = Field(True, validation_alias=AliasChoices("MIRROR_ENABLED", "mirror_enabled"))
+    MIRROR_RECONCILE_INTERVAL: float = Field(
+        300.0, validation_alias=AliasChoices("MIRROR_RECONCILE_INTERVAL", "mirror_reconcile_interval")
+    )
+
+    # AI 목록 응답 캐시 (core/cache.py, stale-while-revalidate)
+    AI_CACHE_ENABLED: bool = Field(True, validation_alias=AliasChoices("AI_CACHE_ENABLED", "ai_cache_enabled"))
+    AI_CACHE_MAX_ENTRIES: int = Field(
+        512, validation_alias=AliasChoices("AI_CACHE_MAX_ENTRIES", "ai_cache_max_entries")
+    )
+    AI_CACHE_TTL_LIST: float = Field(15.0, validation_alias=AliasChoices("AI_CACHE_TTL_LIST", "ai_cache_ttl_list"))
+    AI_CACHE_TTL_HISTORY: float = Field(
+        10.0, validation_alias=AliasChoices("AI_CACHE_TTL_HISTORY", "ai_cache_ttl_history")
+    )
+    AI_CACHE_STALE: float = Field(60.0, validation_alias=AliasChoices("AI_CACHE_STALE", "ai_cache_stale"))
+
+    # 이미지 분석 결과 재사용 (services/analysis_service.py)
+    # 같은 사용자가 같은 내용(sha256)을 다시 올리면 AI 호출 없이 이전 추출 결과로 새 분석 행 생성 (다른 사용자 결과는 쓰지 않음).
+    # ANALYSIS_PHASH_DISTANCE > 0 이면 dHash 해밍 거리 이내의 비슷한 사진도 재사용 (Pillow 필요)
+    ANALYSIS_CACHE_ENABLED: bool = Field(
+        True, validation_alias=AliasChoices("ANALYSIS_CACHE_ENABLED", "analysis_cache_enabled")
+    )
+    ANALYSIS_CACHE_MAX_AGE: float = Field(
+        7 * 24 * 3600.0, validation_alias=AliasChoices("ANALYSIS_CACHE_MAX_AGE", "analysis_cache_max_age")
+    )
+    ANALYSIS_PHASH_DISTANCE: int = Field(
+        0, validation_alias=AliasChoices("ANALYSIS_PHASH_DISTANCE", "analysis_phash_distance")
+    )
+    ANALYSIS_PHASH_CANDIDATES: int = Field(
+        2000, validation_alias=AliasChoices("ANALYSIS_PHASH_CANDIDATES", "analysis_phash_candidates")
+    )
+
+    # AI 전송 전 이미지 정규화 (core/images.py 프로세스 풀, Pillow 필요)
+    # EXIF 회전 보정 + 긴 변 IMAGE_MAX_EDGE 로 축소 + IMAGE_FORMAT(jpeg|webp) 재인코딩
+    IMAGE_PREPROCESS_ENABLED: bool = Field(
+        True, validation_alias=AliasChoices("IMAGE_PREPROCESS_ENABLED", "image_preprocess_enabled")
+    )
+    IMAGE_MAX_EDGE: int = Field(1600, validation_alias=AliasChoices("IMAGE_MAX_EDGE", "image_max_edge"))
+    IMAGE_FORMAT: str = Field("jpeg", validation_alias=AliasChoices("IMAGE_FORMAT", "image_format"))
+    IMAGE_QUALITY: int = Field(85, validation_alias=AliasChoices("IMAGE_QUALITY", "image_quality"))
+    IMAGE_WORKERS: int = Field(2, validation_alias=AliasChoices("IMAGE_WORKERS", "image_workers"))
+    IMAGE_MAX_QUEUE: int = Field(16, validation_alias=AliasChoices("IMAGE_MAX_QUEUE", "image_max_queue"))
+    IMAGE_RETRY_AFTER: float = Field(1.0, validation_alias=AliasChoices("IMAGE_RETRY_AFTER", "image_retry_after"))
+
+    # 여러 장 한 번에 분석 (POST /analysis/batch): 요청당 최대 장수, 동시 저장/AI 호출 수
+    ANALYSIS_BATCH_MAX_IMAGES: int = Field(
+        10, validation_alias=AliasChoices("ANALYSIS_BATCH_MAX_IMAGES", "analysis_batch_max_images")
+    )
+    ANALYSIS_BATCH_CONCURRENCY: int = Field(
+        4, validation_alias=AliasChoices("ANALYSIS_BATCH_CONCURRENCY", "analysis_batch_concurrency")
+    )
+
+    # 비동기 분석 작업 (services/analysis_jobs.py). WORKERS 가 0 이면 job 모드 요청도 동기로 처리
+    ANALYSIS_DEFAULT_MODE: str = Field(
+        "sync", validation_alias=AliasChoices("ANALYSIS_DEFAULT_MODE", "analysis_default_mode")
+    )
+    ANALYSIS_JOB_WORKERS: int = Field(4, validation_alias=AliasChoices("ANALYSIS_JOB_WORKERS", "analysis_job_workers"))
+    ANALYSIS_JOB_RETRIES: int = Field(2, validation_alias=AliasChoices("ANALYSIS_JOB_RETRIES", "analysis_job_retries"))
+    ANALYSIS_JOB_RETRY_BACKOFF: float = Field(
+        1.0, validation_alias=AliasChoices("ANALYSIS_JOB_RETRY_BACKOFF", "analysis_job_retry_backoff")
+    )
+    ANALYSIS_JOB_STALE_AFTER: float = Field(
+        120.0, validation_alias=AliasChoices("ANALYSIS_JOB_STALE_AFTER", "analysis_job_stale_after")
+    )
+
+    # Idempotency-Key 재시도 응답 재사용 (core/idempotency.py). 저장 기간, 처리 중인 같은 키 대기 한도,
+    # 처리하던 워커가 죽었다고 보고 키를 다시 쓰는 시간, 저장할 응답 본문 상한
+    IDEMPOTENCY_ENABLED: bool = Field(True, validation_alias=AliasChoices("IDEMPOTENCY_ENABLED", "idempotency_enabled"))
+    IDEMPOTENCY_PATHS: List[str] = Field(
+        default=["/resources", "/requests", "/analysis/image", "/notifications/iwant"],
+        validation_alias=AliasChoices("IDEMPOTENCY_PATHS", "idempotency_paths"),
+    )
+    IDEMPOTENCY_TTL: float = Field(86400.0, validation_alias=AliasChoices("IDEMPOTENCY_TTL", "idempotency_ttl"))
+    IDEMPOTENCY_WAIT: float = Field(30.0, validation_alias=AliasChoices("IDEMPOTENCY_WAIT", "idempotency_wait"))
+    IDEMPOTENCY_LOCK_TIMEOUT: float = Field(
+        120.0, validation_alias=AliasChoices("IDEMPOTENCY_LOCK_TIMEOUT", "idempotency_lock_timeout")
+    )
+    IDEMPOTENCY_MAX_BODY: int = Field(
+        1024 * 1024, validation_alias=AliasChoices("IDEMPOTENCY_MAX_BODY", "idempotency_max_body")
+    )
+
+    # AI 쓰기 outbox (services/ai_outbox.py). sync 는 기록 후 이 요청에서 한 번 바로 전달, async 는 바로 202
+    AI_WRITE_DEFAULT_MODE: str = Field(
+        "sync", validation_alias=AliasChoices("AI_WRITE_DEFAULT_MODE", "ai_write_default_mode")
+    )
+    AI_OUTBOX_POLL: float = Field(1.0, validation_alias=AliasChoices("AI_OUTBOX_POLL", "ai_outbox_poll"))
+    AI_OUTBOX_BATCH: int = Field(20, validation_alias=AliasChoices("AI_OUTBOX_BATCH", "ai_outbox_batch"))
+    AI_OUTBOX_CONCURRENCY: int = Field(
+        4, validation_alias=AliasChoices("AI_OUTBOX_CONCURRENCY", "ai_outbox_concurrency")
+    )
+    AI_OUTBOX_MAX_ATTEMPTS: int = Field(
+        8, validation_alias=AliasChoices("AI_OUTBOX_MAX_ATTEMPTS", "ai_outbox_max_attempts")
+    )
+    AI_OUTBOX_BACKOFF: float = Field(2.0, validation_alias=AliasChoices("AI_OUTBOX_BACKOFF", "ai_outbox_backoff"))
+    AI_OUTBOX_BACKOFF_MAX: float = Field(
+        300.0, validation_alias=AliasChoices("AI_OUTBOX_BACKOFF_MAX", "ai_outbox_backoff_max")
+    )
+    AI_OUTBOX_STALE_AFTER: float = Field(
+        120.0, validation_alias=AliasChoices("AI_OUTBOX_STALE_AFTER", "ai_outbox_stale_after")
+    )
+
+    # AI 호출 서킷 브레이커 / 작업 종류별 동시 호출 상한 (core/resilience.py)
+    AI_BREAKER_FAILURES: int = Field(5, validation_alias=AliasChoices("AI_BREAKER_FAILURES", "ai_breaker_failures"))
+    AI_BREAKER_RESET: float = Field(30.0, validation_alias=AliasChoices("AI_BREAKER_RESET", "ai_breaker_reset"))
+    AI_BULKHEAD_ANALYSIS: int = Field(8, validation_alias=AliasChoices("AI_BULKHEAD_ANALYSIS", "ai_bulkhead_analysis"))
+    AI_BULKHEAD_LIST: int = Field(32, validation_alias=AliasChoices("AI_BULKHEAD_LIST", "ai_bulkhead_list"))
+    AI_BULKHEAD_MATCH: int = Field(32, validation_alias=AliasChoices("AI_BULKHEAD_MATCH", "ai_bulkhead_match"))
+    AI_BULKHEAD_WRITE: int = Field(16, validation_alias=AliasChoices("AI_BULKHEAD_WRITE", "ai_bulkhead_write"))
+    AI_BULKHEAD_MAX_WAIT: float = Field(
+        1.0, validation_alias=AliasChoices("AI_BULKHEAD_MAX_WAIT", "ai_bulkhead_max_wait")
+    )
+
+    # 인증 토큰/사용자 캐시 (core/deps.py)
+    AUTH_CACHE_TTL: float = Field(60.0, validation_alias=AliasChoices("AUTH_CACHE_TTL", "auth_cache_ttl"))
+    AUTH_CACHE_MAX_ENTRIES: int = Field(
+        10000, validation_alias=AliasChoices("AUTH_CACHE_MAX_ENTRIES", "auth_cache_max_entries")
+    )
+
+    # 비밀번호 해시 (core/security.py 프로세스 풀)
+    AUTH_BCRYPT_ROUNDS: int = Field(12, validation_alias=AliasChoices("AUTH_BCRYPT_ROUNDS", "auth_bcrypt_rounds"))
+    AUTH_HASH_WORKERS: int = Field(2, validation_alias=AliasChoices("AUTH_HASH_WORKERS", "auth_hash_workers"))
+    AUTH_HASH_MAX_QUEUE: int = Field(32, validation_alias=AliasChoices("AUTH_HASH_MAX_QUEUE", "auth_hash_max_queue"))
+    AUTH_HASH_RETRY_AFTER: float = Field(
+        1.0, validation_alias=AliasChoices("AUTH_HASH_RETRY_AFTER", "auth_hash_retry_after")
+    )
+
+    # 업로드 (core/uploads.py): 파일당 최대 크기, 디스크로 옮길 때 청크 크기
+    UPLOAD_MAX_BYTES: int = Field(
+        5 * 1024 * 1024, validation_alias=AliasChoices("UPLOAD_MAX_BYTES", "upload_max_bytes")
+    )
+    UPLOAD_CHUNK_SIZE: int = Field(
+        64 * 1024, validation_alias=AliasChoices("UPLOAD_CHUNK_SIZE", "upload_chunk_size")
+    )
+
+    # AI 서버 → 백엔드 이벤트 웹훅 (POST /internal/ai-events)
+    # 서명 키가 비어 있으면 SERVER_ONLY_AI_API_KEY 를 쓰고, 둘 다 비어 있으면 엔드포인트를 끔
+    AI_EVENTS_SECRET: str = Field("", validation_alias=AliasChoices("AI_EVENTS_SECRET", "ai_events_secret"))
+    AI_EVENTS_TOLERANCE: int = Field(
+        300, validation_alias=AliasChoices("AI_EVENTS_TOLERANCE", "ai_events_tolerance")
+    )
+
+    @field_validator("CORS_ORIGINS", "IDEMPOTENCY_PATHS", mode="before")
     @classmethod
-    def _parse_cors_origins(cls, v: Any):
+    def _parse_str_list(cls, v: Any):
         if isinstance(v, str):
             s = v.strip()
             if s.startswith("[") and s.endswith("]"):
@@ -1,25 +1,162 @@
 # core/deps.py
 
-from fastapi import Depends, HTTPException, status
+import time
+from dataclasses import dataclass
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
 
-from core.security import decode_token
+from core.cache import TTLMap
+from core.config import settings
+from core.security import ai_events_secret, decode_token, token_expires_at, verify_ai_event
+from models.user import User
+from repositories.user_repo import AsyncUserRepository
 from services.auth_service import AuthService
-from db.session import get_db
+from db.session import AsyncSessionLocal, get_async_db, get_db
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
+
+@dataclass(frozen=True)
+class Principal:
+    """인증된 사용자 중 id/username 만 필요한 라우트용 (DB 조회 없이 캐시에서)"""
+    id: int
+    username: str
+
+
+# 토큰 → user_id (디코드/서명 검증 결과), user_id → Principal
+# 토큰 항목은 만료 시각을 넘겨 캐시되지 않음
+_token_cache = TTLMap(max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL)
+_principal_cache = TTLMap(max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL)
+
+
+def _user_id_from(creds: HTTPAuthorizationCredentials | None) -> int:
+    if creds is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    token = creds.credentials
+    user_id = _token_cache.get(token)
+    if user_id is None:
+        user_id, ttype = decode_token(token)
+        if user_id is None or ttype != "access":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        exp = token_expires_at(token)
+        _token_cache.set(token, user_id, ttl=exp - time.time() if exp else None)
+    return user_id
+
+
+def _remember(user: User) -> Principal:
+    principal = Principal(id=user.id, username=user.username)
+    _principal_cache.set(user.id, principal)
+    return principal
+
+
 def get_current_user(
     creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     auth: AuthService = Depends(lambda: AuthService()),
     db = Depends(get_db),
 ):
-    if creds is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    user_id, ttype = decode_token(creds.credentials)
-    if user_id is None or ttype != "access":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user_id = _user_id_from(creds)
     user = auth.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    _remember(user)
     return user
+
+
+async def get_current_user_async(
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # get_current_user 의 비동기판 (async 라우트에서 스레드풀을 쓰지 않음)
+    user_id = _user_id_from(creds)
+    user = await AsyncUserRepository().get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    _remember(user)
+    return user
+
+
+async def _load_principal(user_id: int) -> Principal | None:
+    async with AsyncSessionLocal() as db:
+        user = await AsyncUserRepository().get_by_id(db, user_id)
+        return _remember(user) if user else None
+
+
+async def get_current_principal(
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> Principal:
+    return await _principal_for(_user_id_from(creds))
+
+
+async def get_stream_principal(ticket: str | None) -> Principal:
+    # SSE 스트림 티켓 (type=stream) 으로 인증. access 토큰과 섞이지 않게 토큰 캐시는 거치지 않음
+    user_id, ttype = decode_token(ticket) if ticket else (None, None)
+    if user_id is None or ttype != "stream":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid stream ticket")
+    return await _principal_for(user_id)
+
+
+async def _principal_for(user_id: int) -> Principal:
+    # 캐시 적중이면 DB 를 건드리지 않고, 미스여도 이벤트 루프에서 비동기 세션으로 조회
+    principal = _principal_cache.get(user_id)
+    if principal is None:
+        principal = await _load_principal(user_id)
+        if principal is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    _principal_cache.pop(user_id)
+    _token_cache.discard_where(lambda uid: uid == user_id)
+
+
+def clear_auth_caches() -> None:
+    # 대상 user_id 를 모르는 users 쓰기 뒤에 (bulk update/delete 등)
+    _principal_cache.clear()
+    _token_cache.clear()
+
+
+def auth_cache_stats() -> dict:
+    return {"tokens": _token_cache.stats(), "principals": _principal_cache.stats()}
+
+
+# users 행이 바뀌거나 지워지면 이 프로세스의 캐시에서 즉시 제거 (다른 워커는 AUTH_CACHE_TTL 안에 만료)
+# - 객체 단위 ORM 변경: mapper 이벤트로 해당 user_id 만
+# - Session.execute(update(User)/delete(User)) 같은 bulk/Core 문장: mapper 이벤트가 없으므로 캐시를 통째로 비움
+# - Session 을 거치지 않고 Connection 으로 users 를 직접 고치는 코드는 clear_auth_caches()/invalidate_principal() 을 직접 호출할 것
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_changed(_mapper, _conn, target: User) -> None:
+    invalidate_principal(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_user_write(state: ORMExecuteState) -> None:
+    if not (state.is_update or state.is_delete):
+        return
+    if getattr(state.statement.table, "name", None) == User.__tablename__:
+        clear_auth_caches()
+
+
+def require_admin_key(x_admin_key: str | None = Header(default=None)):
+    if not x_admin_key or x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="invalid admin key")
+    return True
+
+
+async def require_ai_signature(
+    request: Request,
+    x_ai_timestamp: str | None = Header(default=None),
+    x_ai_signature: str | None = Header(default=None),
+):
+    # 본문은 Request 에 캐시되므로 라우트의 body 파싱과 같은 바이트로 서명을 검사
+    if not ai_events_secret():
+        raise HTTPException(status_code=503, detail="AI event webhook is not configured")
+    body = await request.body()
+    if not verify_ai_event(body, x_ai_timestamp, x_ai_signature):
+        raise HTTPException(status_code=401, detail="invalid signature")
+    return True
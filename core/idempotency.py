@@ -0,0 +1,373 @@
+# core/idempotency.py
+# Idempotency-Key 헤더가 붙은 POST 의 첫 응답을 저장해 두고, 같은 키의 재시도에는 AI 호출 없이 그 응답을 그대로 돌려줌
+# - 키 범위: (사용자, 키). 토큰이 없거나 틀리거나 사용자가 없으면 그냥 통과시켜 라우트가 401 을 내게 함
+# - 같은 키로 본문/쿼리가 다른 요청이면 422
+# - 같은 키가 아직 처리 중이면 끝날 때까지 기다렸다가 그 결과를 돌려줌 (IDEMPOTENCY_WAIT 를 넘기면 409 + Retry-After)
+# - 5xx/409/429 나 너무 큰 응답은 저장하지 않고 키를 풀어, 다음 재시도가 다시 실행되게 함
+# - 재사용한 응답에는 Idempotency-Replayed: true
+# - 본문은 받으면서 해시하고 SpooledTemporaryFile 에 모아 두었다가 라우트에 청크 단위로 다시 흘려보냄 (업로드도 메모리 일정)
+import asyncio
+import hashlib
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from core.config import settings
+from core.deps import get_current_principal
+from db.session import AsyncSessionLocal
+from models.idempotency import IDEMPOTENCY_DONE, IDEMPOTENCY_IN_PROGRESS, IdempotencyKey
+
+_MAX_KEY_LENGTH = 255
+_POLL = 0.2                 # 다른 워커가 처리 중인 키를 다시 확인하는 간격
+_PURGE_INTERVAL = 300.0     # 만료된 키 정리 주기
+_NOT_STORED = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+_SPOOL_MAX = 1024 * 1024    # 이보다 큰 본문은 임시 파일로
+
+# 이 프로세스에서 처리 중인 키: 끝나면 set → 같은 워커의 대기 요청은 폴링 없이 바로 깨어남
+_inflight: Dict[Tuple[int, str], asyncio.Event] = {}
+_last_purge = 0.0
+_counters = {"executed": 0, "replayed": 0, "waited": 0, "mismatched": 0, "released": 0, "timeouts": 0}
+
+CLAIMED, EXISTING = "claimed", "existing"
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+
+async def _user_of(scope) -> Optional[int]:
+    # 라우트와 같은 기준(get_current_principal)으로: 토큰이 맞아도 지워진 사용자면 None → 라우트가 401
+    auth = _header(scope, b"authorization") or ""
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token.strip())
+        principal = await get_current_principal(creds)
+    except HTTPException:
+        return None
+    return principal.id
+
+
+class _Fingerprint:
+    """요청 지문 (메서드/경로/쿼리/content-type + 본문). 본문은 청크로 받는 대로 해시"""
+
+    def __init__(self, scope) -> None:
+        # multipart 경계 문자열은 재시도마다 바뀔 수 있어 빼고 해시
+        ctype = _header(scope, b"content-type") or ""
+        _, _, boundary = ctype.partition("boundary=")
+        self._boundary = boundary.split(";")[0].strip().strip('"').encode("latin-1")
+        self._tail = b""
+        self._h = hashlib.sha256()
+        for part in (scope["method"], scope.get("path", ""), scope.get("query_string", b"").decode("latin-1"), ctype.split(";")[0]):
+            self._h.update(part.encode("utf-8") + b"\0")
+
+    def update(self, chunk: bytes) -> None:
+        if not self._boundary:
+            self._h.update(chunk)
+            return
+        # 경계 문자열이 청크 사이에 걸칠 수 있어 끝부분(경계 길이 - 1)은 다음 청크와 이어서 처리
+        data = (self._tail + chunk).replace(self._boundary, b"")
+        keep = len(self._boundary) - 1
+        if len(data) > keep:
+            self._h.update(data[: len(data) - keep])
+            data = data[len(data) - keep:]
+        self._tail = data
+
+    def hexdigest(self) -> str:
+        self._h.update(self._tail)
+        self._tail = b""
+        return self._h.hexdigest()
+
+
+async def _write(spool, chunk: bytes) -> None:
+    # 메모리에 있을 때는 바로, 디스크로 넘어간 뒤에는 스레드풀에서 (UploadFile 과 같은 방식)
+    if getattr(spool, "_rolled", True):
+        await run_in_threadpool(spool.write, chunk)
+    else:
+        spool.write(chunk)
+
+
+async def _read(spool, size: int) -> bytes:
+    if getattr(spool, "_rolled", True):
+        return await run_in_threadpool(spool.read, size)
+    return spool.read(size)
+
+
+async def _spool_body(scope, receive) -> Optional[Tuple[Any, str]]:
+    """본문을 받으며 해시하고 임시 파일에 모음. (파일, 지문). 다 보내기 전에 끊으면 None"""
+    fp = _Fingerprint(scope)
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX)
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                if chunk:
+                    fp.update(chunk)
+                    await _write(spool, chunk)
+                if not message.get("more_body", False):
+                    break
+            elif message["type"] == "http.disconnect":
+                spool.close()
+                return None
+        spool.seek(0)
+        return spool, fp.hexdigest()
+    except BaseException:
+        spool.close()
+        raise
+
+
+async def _purge_expired() -> None:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < _PURGE_INTERVAL:
+        return
+    _last_purge = now
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow()))
+        await db.commit()
+
+
+async def _claim(user_id: int, key: str, fingerprint: str, scope) -> Tuple[str, Optional[IdempotencyKey]]:
+    """키 선점. (CLAIMED, 새 행) 이거나 이미 있으면 (EXISTING, 기존 행)"""
+    cur: Optional[IdempotencyKey] = None
+    async with AsyncSessionLocal() as db:
+        for _ in range(3):
+            now = datetime.utcnow()
+            row = IdempotencyKey(
+                user_id=user_id,
+                key=key,
+                method=scope["method"],
+                path=scope.get("path", "")[:255],
+                fingerprint=fingerprint,
+                status=IDEMPOTENCY_IN_PROGRESS,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+            )
+            db.add(row)
+            try:
+                await db.commit()
+                return CLAIMED, row
+            except IntegrityError:
+                await db.rollback()
+
+            cur = await db.scalar(
+                select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            )
+            if cur is None:
+                continue        # 그 사이 풀린 키: 다시 선점 시도
+            abandoned = (
+                cur.status == IDEMPOTENCY_IN_PROGRESS
+                and cur.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+            )
+            if cur.expires_at > now and not abandoned:
+                return EXISTING, cur
+            # 만료됐거나 처리하던 워커가 죽은 키: 지우고 다시 선점
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == cur.id))
+            await db.commit()
+    return EXISTING, cur
+
+
+async def _load(user_id: int, key: str) -> Optional[IdempotencyKey]:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        )
+
+
+async def _wait(user_id: int, key: str) -> Tuple[bool, Optional[IdempotencyKey]]:
+    """처리 중인 키가 끝나기를 기다림. (시간 안에 끝남/풀림 여부, 그때의 행 또는 None=풀림)"""
+    _counters["waited"] += 1
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while time.monotonic() < deadline:
+        ev = _inflight.get((user_id, key))
+        timeout = min(_POLL, max(0.0, deadline - time.monotonic()))
+        if ev is not None:
+            try:
+                await asyncio.wait_for(ev.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(timeout)
+        row = await _load(user_id, key)
+        if row is None or row.status == IDEMPOTENCY_DONE:
+            return True, row
+    return False, None
+
+
+async def _complete(row_id: int, status_code: int, headers: List[List[str]], body: bytes) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == row_id)
+            .values(status=IDEMPOTENCY_DONE, response_status=status_code, response_headers=headers, response_body=body)
+        )
+        await db.commit()
+
+
+async def _release(row_id: int) -> None:
+    _counters["released"] += 1
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row_id))
+        await db.commit()
+
+
+async def _replay(send, status_code: int, body: bytes, headers: List[List[str]]) -> None:
+    raw = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+    raw.append((b"idempotency-replayed", b"true"))
+    await send({"type": "http.response.start", "status": status_code, "headers": raw})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _error(scope, receive, send, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None) -> None:
+    await JSONResponse({"detail": detail}, status_code=status_code, headers=headers)(scope, receive, send)
+
+
+def idempotency_stats() -> Dict[str, Any]:
+    return {"inflight": len(_inflight), **_counters}
+
+
+class IdempotencyMiddleware:
+    """
+    paths 의 POST 에 Idempotency-Key 가 있으면 (사용자, 키) 로 첫 응답을 저장하고 재시도에 재사용.
+    본문을 한 번 다 읽어 지문을 만들므로 UploadSizeLimitMiddleware 보다 안쪽에 등록
+    """
+
+    def __init__(self, app, paths: Optional[Iterable[str]] = None) -> None:
+        self.app = app
+        self.paths = {p.rstrip("/") or "/" for p in (paths if paths is not None else settings.IDEMPOTENCY_PATHS)}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not settings.IDEMPOTENCY_ENABLED
+            or (scope.get("path", "").rstrip("/") or "/") not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = _header(scope, b"idempotency-key")
+        user_id = await _user_of(scope) if key is not None else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.strip()
+        if not key or len(key) > _MAX_KEY_LENGTH:
+            await _error(scope, receive, send, 400, f"Idempotency-Key 는 1~{_MAX_KEY_LENGTH}자여야 합니다.")
+            return
+
+        spooled = await _spool_body(scope, receive)
+        if spooled is None:
+            return
+        body, fingerprint = spooled
+        try:
+            await self._handle(scope, receive, send, body, fingerprint, user_id, key)
+        finally:
+            body.close()
+
+    async def _handle(self, scope, receive, send, body, fingerprint: str, user_id: int, key: str) -> None:
+        await _purge_expired()
+
+        while True:
+            state, row = await _claim(user_id, key, fingerprint, scope)
+            if state == CLAIMED:
+                break
+            if row is None:
+                # 선점 경합이 계속 엇갈림: 처리 중일 때와 같이 재시도 요청
+                await _error(
+                    scope, receive, send, 409, "같은 Idempotency-Key 의 요청이 아직 처리 중입니다.",
+                    headers={"Retry-After": "1"},
+                )
+                return
+            if row.fingerprint != fingerprint:
+                _counters["mismatched"] += 1
+                await _error(scope, receive, send, 422, "같은 Idempotency-Key 가 다른 요청에 이미 사용되었습니다.")
+                return
+            if row.status == IDEMPOTENCY_IN_PROGRESS:
+                finished, row = await _wait(user_id, key)
+                if not finished:
+                    _counters["timeouts"] += 1
+                    await _error(
+                        scope, receive, send, 409, "같은 Idempotency-Key 의 요청이 아직 처리 중입니다.",
+                        headers={"Retry-After": str(max(1, int(settings.IDEMPOTENCY_WAIT)))},
+                    )
+                    return
+                if row is None:
+                    continue        # 앞 요청이 실패해 키를 풀었음: 이번 요청이 다시 실행
+                if row.fingerprint != fingerprint:
+                    continue
+            _counters["replayed"] += 1
+            await _replay(send, row.response_status, row.response_body or b"", row.response_headers or [])
+            return
+
+        await self._execute(scope, receive, send, row, body, (user_id, key))
+
+    async def _execute(self, scope, receive, send, row: IdempotencyKey, body, inflight_key) -> None:
+        _counters["executed"] += 1
+        done = _inflight[inflight_key] = asyncio.Event()
+        body_size = body.seek(0, 2)
+        body.seek(0)
+        body_sent = False
+
+        async def replay_receive():
+            # 모아 둔 본문을 청크 단위로 다시 흘려보내고, 다 보낸 뒤에는 원래 receive (disconnect 대기)
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            chunk = await _read(body, settings.UPLOAD_CHUNK_SIZE)
+            more = body.tell() < body_size
+            body_sent = not more
+            return {"type": "http.request", "body": chunk, "more_body": more}
+
+        start: Optional[Dict[str, Any]] = None
+        chunks: List[bytes] = []
+        size = 0
+        too_big = False
+
+        async def capture_send(message):
+            nonlocal start, size, too_big
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body" and not too_big:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > settings.IDEMPOTENCY_MAX_BODY:
+                    too_big = True
+                    chunks.clear()
+                else:
+                    chunks.append(chunk)
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            code = start["status"] if start else 500
+            if start is not None and not too_big and code < 500 and code not in _NOT_STORED:
+                headers = [[k.decode("latin-1"), v.decode("latin-1")] for k, v in start.get("headers", [])]
+                try:
+                    await _complete(row.id, code, headers, b"".join(chunks))
+                    stored = True
+                except Exception as e:
+                    # 응답은 이미 나갔음: 저장만 못 한 것이므로 키를 풀고 로그만
+                    print(f"[경고] Idempotency-Key 응답 저장 실패 {row.key}: {e}")
+        finally:
+            try:
+                if not stored:
+                    await _release(row.id)
+            except Exception as e:
+                # 키를 못 풀어도 IDEMPOTENCY_LOCK_TIMEOUT 뒤에는 다른 요청이 다시 쓸 수 있음
+                print(f"[경고] Idempotency-Key 해제 실패 {row.key}: {e}")
+            _inflight.pop(inflight_key, None)
+            done.set()
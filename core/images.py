@@ -0,0 +1,245 @@
+# core/images.py
+# 이미지 유틸 (Pillow 가 없으면 디코딩이 필요한 기능은 비활성: available() 가 False)
+# - sniff_format: 매직 바이트로 형식 판별 (이미지가 아니면 AI 호출 전에 415)
+# - normalize: EXIF 회전 보정 + 긴 변 축소 + 재인코딩 (전용 프로세스 풀에서 실행)
+# - dhash: 비슷한 사진 찾기용 64비트 해시
+import asyncio
+import hashlib
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow 는 선택 의존성
+    Image = None
+    ImageOps = None
+
+_DHASH_SIZE = 8     # 8x8 비교 → 64비트
+
+
+def available() -> bool:
+    return Image is not None
+
+
+# ---------------------------------------------------------------------------
+# 형식 판별
+# ---------------------------------------------------------------------------
+
+class UnsupportedImage(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="이미지 파일만 업로드할 수 있습니다. (jpeg, png, webp, gif, heic)",
+        )
+
+
+def _sniff(head: bytes) -> Optional[str]:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"hevc", b"mif1", b"msf1"):
+        return "heic"
+    return None
+
+
+def sniff_format(fp: IO[bytes]) -> str:
+    """파일 앞부분으로 이미지 형식 판별. 이미지가 아니면 UnsupportedImage(415)"""
+    pos = fp.tell()
+    fp.seek(0)
+    head = fp.read(16)
+    fp.seek(pos)
+    fmt = _sniff(head)
+    if fmt is None:
+        raise UnsupportedImage()
+    return fmt
+
+
+# ---------------------------------------------------------------------------
+# 정규화 (워커 프로세스에서 실행되므로 인자/반환값은 모두 피클 가능한 값)
+# ---------------------------------------------------------------------------
+
+_KEEP_FORMATS = {"JPEG", "PNG", "WEBP"}     # 회전/축소가 필요 없으면 재인코딩하지 않는 형식
+
+
+def normalize(src: str, dst: str, max_edge: int, fmt: str, quality: int) -> Dict[str, Any]:
+    """
+    src 를 읽어 EXIF 회전 보정, 긴 변 max_edge 로 축소, fmt(jpeg|webp) 재인코딩 후 dst 에 쓴다.
+    바꿀 필요가 없거나 결과가 더 크면 dst 를 만들지 않고 changed=False.
+    """
+    bytes_in = os.path.getsize(src)
+    with Image.open(src) as img:
+        orientation = img.getexif().get(0x0112, 1)
+        too_big = max(img.size) > max_edge
+        if orientation == 1 and not too_big and img.format in _KEEP_FORMATS:
+            return {"changed": False, "bytes_in": bytes_in, "size": img.size}
+
+        if too_big and img.format == "JPEG":
+            img.draft("RGB", (max_edge, max_edge))      # JPEG 는 축소 디코딩으로 메모리/시간 절약
+        out = ImageOps.exif_transpose(img)
+        out.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        fmt = fmt.upper()
+        if fmt == "JPEG" and out.mode not in ("RGB", "L"):
+            out = out.convert("RGB")
+        # EXIF(위치 정보 포함)는 옮기지 않음
+        out.save(dst, format=fmt, quality=quality, optimize=fmt == "JPEG")
+
+    bytes_out = os.path.getsize(dst)
+    if bytes_out >= bytes_in and orientation == 1 and not too_big:
+        os.unlink(dst)
+        return {"changed": False, "bytes_in": bytes_in, "size": out.size}
+
+    digest = hashlib.sha256()
+    with open(dst, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return {
+        "changed": True,
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "sha256": digest.hexdigest(),
+        "size": out.size,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 이미지 전용 프로세스 풀 (main.py lifespan). core/security.py 의 bcrypt 풀과 같은 방식
+# ---------------------------------------------------------------------------
+
+class ImageBusy(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="이미지 처리 요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(max(1, math.ceil(settings.IMAGE_RETRY_AFTER)))},
+        )
+
+
+_image_pool: Optional[ProcessPoolExecutor] = None
+_image_pending = 0
+_image_lock = threading.Lock()
+_metrics = {
+    "processed": 0, "changed": 0, "unchanged": 0, "failed": 0, "rejected": 0,
+    "bytes_in": 0, "bytes_out": 0, "ms_total": 0.0, "ms_max": 0.0,
+}
+
+def open_image_pool() -> None:
+    global _image_pool
+    if _image_pool is None and available() and settings.IMAGE_WORKERS > 0:
+        _image_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+def close_image_pool() -> None:
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=False, cancel_futures=True)
+        _image_pool = None
+
+def _record(result: Optional[Dict[str, Any]], elapsed_ms: float) -> None:
+    with _image_lock:
+        _metrics["processed"] += 1
+        _metrics["ms_total"] += elapsed_ms
+        _metrics["ms_max"] = max(_metrics["ms_max"], elapsed_ms)
+        if result is None:
+            _metrics["failed"] += 1
+            return
+        _metrics["bytes_in"] += result["bytes_in"]
+        if result["changed"]:
+            _metrics["changed"] += 1
+            _metrics["bytes_out"] += result["bytes_out"]
+        else:
+            _metrics["unchanged"] += 1
+            _metrics["bytes_out"] += result["bytes_in"]
+
+def image_pool_stats() -> Dict[str, Any]:
+    with _image_lock:
+        m = dict(_metrics)
+    done = m["processed"] or 1
+    return {
+        "enabled": settings.IMAGE_PREPROCESS_ENABLED and available(),
+        "workers": settings.IMAGE_WORKERS if _image_pool is not None else 0,
+        "pending": _image_pending,
+        "max_queue": settings.IMAGE_MAX_QUEUE,
+        **m,
+        "ms_avg": round(m["ms_total"] / done, 1),
+        "ms_total": round(m["ms_total"], 1),
+        "ms_max": round(m["ms_max"], 1),
+        "saved_ratio": round(1 - m["bytes_out"] / m["bytes_in"], 4) if m["bytes_in"] else None,
+    }
+
+async def normalize_async(src: str, dst: str) -> Optional[Dict[str, Any]]:
+    """풀에서 normalize 실행. 디코딩 실패 등은 None (원본을 그대로 쓰도록)"""
+    global _image_pending
+    args = (src, dst, settings.IMAGE_MAX_EDGE, settings.IMAGE_FORMAT, settings.IMAGE_QUALITY)
+    pooled = _image_pool is not None
+    if not pooled:
+        runner = run_in_threadpool(normalize, *args)
+    else:
+        with _image_lock:
+            if _image_pending >= settings.IMAGE_WORKERS + settings.IMAGE_MAX_QUEUE:
+                _metrics["rejected"] += 1
+                raise ImageBusy()
+            _image_pending += 1
+        runner = asyncio.get_running_loop().run_in_executor(_image_pool, normalize, *args)
+
+    started = time.perf_counter()
+    result = None
+    try:
+        result = await runner
+    except Exception as e:
+        print(f"[경고] 이미지 정규화 실패 {os.path.basename(src)}: {e}")
+        if os.path.exists(dst):
+            os.unlink(dst)
+    finally:
+        if pooled:
+            with _image_lock:
+                _image_pending -= 1
+        _record(result, (time.perf_counter() - started) * 1000)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 비슷한 사진 찾기
+# ---------------------------------------------------------------------------
+
+def dhash(src: IO[bytes] | str) -> Optional[str]:
+    """
+    difference hash (64비트, 16자리 hex). 크기/압축률만 다른 같은 사진은 해밍 거리가 작게 나온다.
+    디코딩할 수 없는 파일이면 None.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(src) as img:
+            img.draft("L", (_DHASH_SIZE * 4, _DHASH_SIZE * 4))     # JPEG 는 축소 디코딩
+            small = img.convert("L").resize((_DHASH_SIZE + 1, _DHASH_SIZE), Image.Resampling.LANCZOS)
+            px = list(small.getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(_DHASH_SIZE):
+        base = row * (_DHASH_SIZE + 1)
+        for col in range(_DHASH_SIZE):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return f"{bits:016x}"
+
+
+def hamming(a: str, b: str) -> int:
+    return (int(a, 16) ^ int(b, 16)).bit_count()
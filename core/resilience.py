@@ -0,0 +1,220 @@
+# core/resilience.py
+# AI 서버 장애가 다른 엔드포인트로 번지지 않도록
+# - 작업 종류(analysis/list/match/write)마다 서킷 브레이커: closed → open → half-open
+# - 작업 종류마다 동시 호출 수 제한(bulkhead): 가득 차면 잠깐 기다린 뒤 바로 503
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Tuple
+
+import httpx
+from fastapi import HTTPException, status
+
+
+class UpstreamUnavailable(HTTPException):
+    """AI 서버 호출을 시도하지 않고 바로 실패시킬 때 (503 + Retry-After)"""
+
+    def __init__(self, op: str, reason: str, retry_after: float) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"AI 서버를 일시적으로 사용할 수 없습니다({op}: {reason}). 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        self.op = op
+        self.reason = reason
+
+
+def is_transient(e: BaseException) -> bool:
+    """다시 시도하면 성공할 수 있는 AI 호출 실패인지 (브레이커/bulkhead 503, 연결 오류, 5xx)"""
+    if isinstance(e, (UpstreamUnavailable, httpx.TransportError)):
+        return True
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500
+
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, op: str, *, failure_threshold: int, reset_timeout: float) -> None:
+        self.op = op
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0              # 연속 실패 수
+        self._opened_at = 0.0
+        self._trial = False             # half-open 에서 시험 호출이 진행 중인지
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial = False
+            return self._state
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def before_call(self) -> None:
+        state = self.state
+        with self._lock:
+            if state == OPEN:
+                self.rejected += 1
+                raise UpstreamUnavailable(self.op, "circuit open", self._retry_after())
+            if state == HALF_OPEN:
+                # 시험 호출은 한 번에 하나만
+                if self._trial:
+                    self.rejected += 1
+                    raise UpstreamUnavailable(self.op, "circuit half-open", 1)
+                self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def abandon(self) -> None:
+        with self._lock:
+            self._trial = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self._retry_after(), 1) if state == OPEN else None,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class Bulkhead:
+    """
+    작업 종류별 동시 호출 상한. 동기(스레드) 경로와 async 경로가 같은 슬롯을 나눠 쓴다.
+    슬롯이 없으면 폴링하지 않고 반납 알림을 기다린다: 스레드는 Condition, async 쪽은 대기 future
+    (반납은 어느 스레드에서든 일어나므로 call_soon_threadsafe 로 깨움)
+    """
+
+    def __init__(self, op: str, *, limit: int, max_wait: float) -> None:
+        self.op = op
+        self.limit = max(1, limit)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._in_use = 0
+        self.rejected = 0
+
+    def _acquire_locked(self) -> bool:
+        if self._in_use < self.limit:
+            self._in_use += 1
+            return True
+        return False
+
+    def _wake_async_locked(self) -> None:
+        # 대기 중인 async 호출 하나를 깨움 (깨어난 쪽이 다시 슬롯을 잡아봄)
+        while self._waiters:
+            loop, fut = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(self._resolve, fut)
+                return
+            except RuntimeError:
+                continue    # 닫힌 루프
+
+    def _resolve(self, fut: asyncio.Future) -> None:
+        if not fut.done():
+            fut.set_result(None)
+            return
+        # 깨우기 전에 시간 초과로 포기한 대기자면 다음 대기자에게 넘김
+        with self._lock:
+            if self._in_use < self.limit:
+                self._wake_async_locked()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+            self._cond.notify()
+            self._wake_async_locked()
+
+    def _reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+        raise UpstreamUnavailable(self.op, "too many concurrent calls", 1)
+
+    @contextmanager
+    def slot(self):
+        deadline = time.monotonic() + self.max_wait
+        with self._lock:
+            acquired = self._acquire_locked()
+            while not acquired and (remaining := deadline - time.monotonic()) > 0:
+                self._cond.wait(remaining)
+                acquired = self._acquire_locked()
+        if not acquired:
+            self._reject()
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        deadline = time.monotonic() + self.max_wait
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._acquire_locked():
+                    break
+                fut = loop.create_future()
+                self._waiters.append((loop, fut))
+            try:
+                await asyncio.wait_for(fut, max(0.0, deadline - time.monotonic()))
+            except BaseException as e:
+                with self._lock:
+                    try:
+                        self._waiters.remove((loop, fut))
+                    except ValueError:
+                        # 이미 깨워진 뒤 포기: 그 알림을 다음 대기자에게
+                        if self._in_use < self.limit:
+                            self._wake_async_locked()
+                if isinstance(e, asyncio.TimeoutError):
+                    self._reject()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "in_use": self._in_use, "rejected": self.rejected}
+
+
+class Guard:
+    """작업 종류 하나에 대한 브레이커 + bulkhead 묶음"""
+
+    def __init__(self, op: str, *, limit: int, max_wait: float, failure_threshold: int, reset_timeout: float) -> None:
+        self.op = op
+        self.breaker = CircuitBreaker(op, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        self.bulkhead = Bulkhead(op, limit=limit, max_wait=max_wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"breaker": self.breaker.stats(), "bulkhead": self.bulkhead.stats()}
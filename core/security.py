@@ -1,17 +1,120 @@
+import asyncio
+import hashlib
+import hmac
+import math
+import time
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.AUTH_BCRYPT_ROUNDS)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+_contexts_by_rounds: dict[int, CryptContext] = {}
+
+def _context(rounds: Optional[int]) -> CryptContext:
+    if not rounds or rounds == settings.AUTH_BCRYPT_ROUNDS:
+        return pwd_context
+    ctx = _contexts_by_rounds.get(rounds)
+    if ctx is None:
+        ctx = _contexts_by_rounds[rounds] = pwd_context.copy(bcrypt__rounds=rounds)
+    return ctx
+
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    return _context(rounds).hash(password)
+
+def _bcrypt_rounds(hashed: str) -> Optional[int]:
+    # $2b$12$... → 12
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed: str, rounds: Optional[int] = None) -> bool:
+    return pwd_context.needs_update(hashed) or _bcrypt_rounds(hashed) != (rounds or settings.AUTH_BCRYPT_ROUNDS)
+
+def verify_and_rehash(plain: str, hashed: str, rounds: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+    """비밀번호 확인 + 해시 비용(rounds)이 설정과 다르면 새 해시도 함께 돌려줌"""
+    if not pwd_context.verify(plain, hashed):
+        return False, None
+    return True, (get_password_hash(plain, rounds) if needs_rehash(hashed, rounds) else None)
+
+
+# ---------------------------------------------------------------------------
+# bcrypt 전용 프로세스 풀 (main.py lifespan). 요청 스레드/GIL 을 잡지 않도록
+# ---------------------------------------------------------------------------
+
+class PasswordHashBusy(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="로그인 요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(max(1, math.ceil(settings.AUTH_HASH_RETRY_AFTER)))},
+        )
+
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pending = 0           # 풀에 넣었지만 아직 끝나지 않은 작업 수 (실행 중 + 대기)
+_hash_lock = threading.Lock()
+hash_rejected = 0
+
+def open_hash_pool() -> None:
+    global _hash_pool
+    if _hash_pool is None and settings.AUTH_HASH_WORKERS > 0:
+        # 스레드가 떠 있는 서버 프로세스를 fork 하지 않도록 spawn
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.AUTH_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+def close_hash_pool() -> None:
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+def hash_pool_stats() -> dict:
+    return {
+        "workers": settings.AUTH_HASH_WORKERS if _hash_pool is not None else 0,
+        "pending": _hash_pending,
+        "max_queue": settings.AUTH_HASH_MAX_QUEUE,
+        "rejected": hash_rejected,
+        "rounds": settings.AUTH_BCRYPT_ROUNDS,
+    }
+
+async def _run_hash(fn, *args):
+    global _hash_pending, hash_rejected
+    if _hash_pool is None:
+        # 풀을 띄우지 않은 실행 환경(스크립트 등)은 스레드풀로
+        return await run_in_threadpool(fn, *args)
+    with _hash_lock:
+        if _hash_pending >= settings.AUTH_HASH_WORKERS + settings.AUTH_HASH_MAX_QUEUE:
+            hash_rejected += 1
+            raise PasswordHashBusy()
+        _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        with _hash_lock:
+            _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    # rounds 는 워커 프로세스 설정이 아니라 현재 프로세스 설정을 따름
+    return await _run_hash(get_password_hash, password, settings.AUTH_BCRYPT_ROUNDS)
+
+async def verify_password_async(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(일치 여부, 재해시가 필요하면 새 해시)"""
+    return await _run_hash(verify_and_rehash, plain, hashed, settings.AUTH_BCRYPT_ROUNDS)
 
 def create_access_token(user_id: int) -> str:
     now = datetime.now(timezone.utc)
@@ -24,6 +127,18 @@ def create_access_token(user_id: int) -> str:
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
+def create_stream_ticket(user_id: int) -> str:
+    # SSE 접속 전용 (type=stream): URL 쿼리로 오가므로 수명을 짧게, 일반 API 인증에는 쓰이지 않음
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": str(user_id),
+        "type": "stream",
+        "iat": int(now.timestamp()),
+        "exp": int((now + timedelta(seconds=settings.NOTIFY_STREAM_TICKET_TTL)).timestamp()),
+    }
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
 def decode_token(token: str) -> Tuple[Optional[int], Optional[str]]:
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
@@ -32,3 +147,35 @@ def decode_token(token: str) -> Tuple[Optional[int], Optional[str]]:
         return (int(sub) if sub is not None else None, ttype)
     except (JWTError, ValueError):
         return (None, None)
+
+
+def token_expires_at(token: str) -> Optional[int]:
+    # decode_token 으로 서명을 확인한 토큰에만 사용 (exp 만 읽음)
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        return int(exp) if exp is not None else None
+    except (JWTError, ValueError, TypeError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# AI 서버 웹훅 서명: HMAC-SHA256("{timestamp}.{body}"), 헤더 값은 "sha256=<hex>"
+# ---------------------------------------------------------------------------
+
+def ai_events_secret() -> str:
+    return settings.AI_EVENTS_SECRET or settings.SERVER_ONLY_AI_API_KEY
+
+
+def sign_ai_event(body: bytes, timestamp: str, secret: Optional[str] = None) -> str:
+    key = (secret or ai_events_secret()).encode()
+    mac = hmac.new(key, timestamp.encode() + b"." + body, hashlib.sha256)
+    return f"sha256={mac.hexdigest()}"
+
+
+def verify_ai_event(body: bytes, timestamp: Optional[str], signature: Optional[str]) -> bool:
+    # 시각이 허용 범위를 벗어나면 서명이 맞아도 거부 (가로챈 요청 재전송 방지)
+    if not timestamp or not signature or not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > settings.AI_EVENTS_TOLERANCE:
+        return False
+    return hmac.compare_digest(sign_ai_event(body, timestamp), signature.strip())
@@ -0,0 +1,99 @@
+# core/singleflight.py
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+Key = Tuple[str, Hashable]
+
+
+class _SyncCall:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 업스트림 요청 하나로 합친다.
+    먼저 온 호출(leader)만 실제로 실행하고, 나머지는 그 결과나 예외를 그대로 받는다.
+    - do(): 이벤트 루프용. 기다리던 쪽이 취소돼도 공유 작업은 끝까지 실행
+    - do_sync(): 스레드풀/동기 경로용
+    - forget(네임스페이스...): 쓰기 직후 호출. 진행 중인 호출은 끝까지 실행되지만, 이후 호출은 거기 합류하지 않고 새로 시작
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Key, asyncio.Task] = {}
+        self._calls: Dict[Key, _SyncCall] = {}
+        self._lock = threading.Lock()
+        self.calls = 0          # 전체 호출 수
+        self.shared = 0         # 이미 진행 중인 요청에 합류한 호출 수 (= 줄인 업스트림 요청 수)
+
+    async def do(self, namespace: str, params: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        key = (namespace, params)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = asyncio.get_running_loop().create_task(fn())
+            else:
+                self.shared += 1
+        if leader:
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Key, task: asyncio.Task) -> None:
+        with self._lock:
+            # forget() 뒤 같은 키로 새 작업이 들어왔으면 그대로 둠
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        # 기다리던 호출이 모두 취소된 경우에도 "never retrieved" 경고가 나지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    def do_sync(self, namespace: str, params: Hashable, fn: Callable[[], Any]) -> Any:
+        key = (namespace, params)
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _SyncCall()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.value = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def forget(self, *namespaces: str) -> None:
+        # 스레드풀의 동기 쓰기에서도 불리므로 락 안에서 (작업 취소는 하지 않음)
+        targets = set(namespaces)
+        with self._lock:
+            for table in (self._tasks, self._calls):
+                for key in [k for k in table if k[0] in targets]:
+                    del table[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "upstream": self.calls - self.shared,
+            "in_flight": len(self._tasks) + len(self._calls),
+        }
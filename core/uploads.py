@@ -0,0 +1,254 @@
+# core/uploads.py
+# 업로드 파일을 메모리에 통째로 올리지 않고 청크 단위로 처리
+# - UploadSizeLimitMiddleware: multipart 요청 본문이 받는 도중 상한을 넘으면 바로 413
+# - save_upload: 디스크로 청크 복사 + 크기 상한 + sha256 을 한 번에
+#   (내용 기준 중복 제거 저장은 services/upload_store.py)
+# - file_part: 저장된 파일을 httpx multipart 로 스트리밍 전송
+# - AsyncMultipart: AsyncClient 용 multipart 본문. 파일 청크를 스레드풀에서 읽어 이벤트 루프를 막지 않음
+import hashlib
+import os
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from core.config import settings
+
+# 파일 외 폼 필드/경계 문자열 몫으로 본문 상한에 더해주는 여유분
+_FORM_OVERHEAD = 256 * 1024
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"파일 크기가 너무 큽니다. ({max_bytes // (1024 * 1024)}MB 초과)",
+        )
+
+
+@dataclass(frozen=True)
+class SavedUpload:
+    path: str
+    size: int
+    sha256: str
+    filename: str
+    content_type: str
+
+
+class UploadSizeLimitMiddleware:
+    """
+    multipart/form-data 요청의 본문 크기를 받는 중에 센다.
+    Content-Length 가 이미 크면 본문을 읽기 전에, chunked 전송이면 상한을 넘는 순간 413.
+    max_files: 경로별로 파일 여러 개를 받는 엔드포인트의 최대 파일 수 (상한 = 파일당 상한 x 개수)
+    """
+
+    def __init__(self, app, max_body: Optional[int] = None, max_files: Optional[Dict[str, int]] = None) -> None:
+        self.app = app
+        self.max_body = max_body
+        self.max_files = max_files or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        files = max(1, self.max_files.get(scope.get("path", ""), 1))
+        limit = self.max_body or settings.UPLOAD_MAX_BYTES * files + _FORM_OVERHEAD
+        length = _header(scope, b"content-length")
+        if length and length.isdigit() and int(length) > limit:
+            await _reject(scope, receive, send)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # HTTPException 이라 라우터의 폼 파싱 중에 나와도 그대로 413 으로 응답됨
+                    raise UploadTooLarge(settings.UPLOAD_MAX_BYTES)
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLarge:
+            if started:
+                raise
+            await _reject(scope, receive, send)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+
+def _is_multipart(scope) -> bool:
+    return (_header(scope, b"content-type") or "").lower().startswith("multipart/form-data")
+
+
+async def _reject(scope, receive, send) -> None:
+    exc = UploadTooLarge(settings.UPLOAD_MAX_BYTES)
+    response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers={"Connection": "close"})
+    await response(scope, receive, send)
+
+
+def _digest(src: IO[bytes], max_bytes: int, chunk_size: int) -> tuple[int, str]:
+    # 쓰지 않고 읽기만 하면서 크기/sha256 계산
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        src.seek(0)
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+    finally:
+        src.seek(0)
+    return size, digest.hexdigest()
+
+
+def _copy_to_disk(src: IO[bytes], dest: Path, max_bytes: int, chunk_size: int) -> tuple[int, str]:
+    # 임시 이름으로 쓰고 끝나면 rename (중간에 실패해도 반쯤 쓴 파일이 남지 않음, 같은 dest 에 동시에 써도 안전)
+    digest = hashlib.sha256()
+    size = 0
+    tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        src.seek(0)
+        with open(tmp, "wb") as out:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    finally:
+        src.seek(0)
+    return size, digest.hexdigest()
+
+
+async def save_upload(upload: UploadFile, dest: Path, *, max_bytes: Optional[int] = None) -> SavedUpload:
+    """업로드를 dest 로 청크 복사하고 크기/sha256 을 돌려준다 (메모리 사용은 청크 하나 분량)"""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    size, sha256 = await run_in_threadpool(
+        _copy_to_disk,
+        upload.file,
+        dest,
+        max_bytes or settings.UPLOAD_MAX_BYTES,
+        max(1, settings.UPLOAD_CHUNK_SIZE),
+    )
+    return SavedUpload(
+        path=str(dest).replace("\\", "/"),
+        size=size,
+        sha256=sha256,
+        filename=upload.filename or dest.name,
+        content_type=upload.content_type or "application/octet-stream",
+    )
+
+
+@contextmanager
+def file_part(saved: SavedUpload) -> Iterator[tuple[str, IO[bytes], str]]:
+    # httpx 는 파일 객체를 청크로 읽어 보내므로 본문 전체가 메모리에 올라오지 않음
+    with open(saved.path, "rb") as fh:
+        yield (saved.filename, fh, saved.content_type)
+
+
+@asynccontextmanager
+async def async_file_part(saved: SavedUpload) -> AsyncIterator[tuple[str, IO[bytes], str]]:
+    # file_part 의 비동기판: 열기/닫기도 스레드풀에서 (AsyncMultipart 와 함께 사용)
+    fh = await run_in_threadpool(open, saved.path, "rb")
+    try:
+        yield (saved.filename, fh, saved.content_type)
+    finally:
+        await run_in_threadpool(fh.close)
+
+
+def _quote(value: str) -> str:
+    # 필드/파일 이름의 따옴표·줄바꿈 이스케이프 (httpx 와 같은 규칙)
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class AsyncMultipart:
+    """
+    AsyncClient 로 보내는 multipart/form-data 본문.
+    httpx 의 files= 는 AsyncClient 에서도 파일 객체를 이벤트 루프에서 동기로 읽으므로,
+    파일 청크는 스레드풀에서 읽어 async iterator 로 흘려보낸다. Content-Length 는 미리 계산
+    사용: body = AsyncMultipart(data, files); client.post(url, headers=body.headers, content=body.stream())
+    """
+
+    def __init__(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Tuple[str, IO[bytes], str]]] = None,
+        *,
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = max(1, chunk_size or settings.UPLOAD_CHUNK_SIZE)
+        # (파트 헤더, 값 bytes 또는 None, 파일 또는 None, 파일 크기)
+        self._parts: List[Tuple[bytes, Optional[bytes], Optional[IO[bytes]], int]] = []
+        for name, value in (data or {}).items():
+            head = f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+            self._parts.append((head.encode("utf-8"), str(value).encode("utf-8"), None, 0))
+        for name, (filename, fh, content_type) in (files or {}).items():
+            head = (
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"; '
+                f'filename="{_quote(filename)}"\r\nContent-Type: {content_type}\r\n\r\n'
+            )
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            fh.seek(0)
+            self._parts.append((head.encode("utf-8"), None, fh, size))
+        self._tail = f"--{self.boundary}--\r\n".encode("ascii")
+
+    @property
+    def content_length(self) -> int:
+        return sum(len(h) + (len(v) if v is not None else size) + 2 for h, v, _, size in self._parts) + len(self._tail)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(self.content_length),
+        }
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        for head, value, fh, _size in self._parts:
+            yield head
+            if value is not None:
+                yield value
+            else:
+                fh.seek(0)
+                while True:
+                    chunk = await run_in_threadpool(fh.read, self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            yield b"\r\n"
+        yield self._tail
@@ -0,0 +1,100 @@
+"""mirror AI requests/resources into local tables
+
+Revision ID: 3f9c2a7d41b0
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b0'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # requests: 기존 테이블에 미러 컬럼 추가
+    with op.batch_alter_table("requests") as batch:
+        batch.add_column(sa.Column("ai_request_id", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("username", sa.String(length=50), nullable=True))
+        batch.add_column(sa.Column("title", sa.String(length=100), nullable=True))
+        batch.add_column(sa.Column("item_type", sa.String(length=50), nullable=True))
+        batch.add_column(sa.Column("amount", sa.String(length=50), nullable=True))
+        batch.add_column(sa.Column("is_auto_written", sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch.add_column(sa.Column("payload", sa.JSON(), nullable=True))
+        batch.add_column(sa.Column("synced_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_requests_ai_request_id", "requests", ["ai_request_id"], unique=True)
+    op.create_index("ix_requests_username_id", "requests", ["username", "id"])
+
+    # resources: 모델에는 있었지만 models/__init__ 에 빠져 있어 테이블이 없을 수 있음
+    if not _has_table("resources"):
+        op.create_table(
+            "resources",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("analysis_id", sa.Integer(), nullable=True),
+            sa.Column("title", sa.String(length=100), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("unit", sa.String(length=10), nullable=True),
+            sa.Column("value", sa.Integer(), nullable=False),
+            sa.Column("detected_item", sa.String(length=100), nullable=True),
+            sa.Column("material_type", sa.String(length=50), nullable=True),
+            sa.Column("status", sa.String(length=20), server_default="registered", nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.ForeignKeyConstraint(["analysis_id"], ["analysis.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_resources_detected_item", "resources", ["detected_item"])
+        op.create_index("ix_resources_material_type", "resources", ["material_type"])
+        op.create_index("ix_resources_unit_status", "resources", ["unit", "status"])
+    else:
+        with op.batch_alter_table("resources") as batch:
+            batch.alter_column("user_id", existing_type=sa.Integer(), nullable=True)
+            batch.alter_column(
+                "status",
+                existing_type=sa.String(length=10),
+                type_=sa.String(length=20),
+                existing_nullable=False,
+            )
+
+    with op.batch_alter_table("resources") as batch:
+        batch.add_column(sa.Column("ai_resource_id", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("username", sa.String(length=50), nullable=True))
+        batch.add_column(sa.Column("item_name", sa.String(length=100), nullable=True))
+        batch.add_column(sa.Column("item_type", sa.String(length=50), nullable=True))
+        batch.add_column(sa.Column("image_path", sa.String(length=255), nullable=True))
+        batch.add_column(sa.Column("payload", sa.JSON(), nullable=True))
+        batch.add_column(sa.Column("synced_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_resources_ai_resource_id", "resources", ["ai_resource_id"], unique=True)
+    op.create_index("ix_resources_username_id", "resources", ["username", "id"])
+    op.create_index("ix_resources_status", "resources", ["status"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_resources_status", table_name="resources")
+    op.drop_index("ix_resources_username_id", table_name="resources")
+    op.drop_index("ix_resources_ai_resource_id", table_name="resources")
+    with op.batch_alter_table("resources") as batch:
+        for col in ("synced_at", "payload", "image_path", "item_type", "item_name", "username", "ai_resource_id"):
+            batch.drop_column(col)
+
+    op.drop_index("ix_requests_username_id", table_name="requests")
+    op.drop_index("ix_requests_ai_request_id", table_name="requests")
+    with op.batch_alter_table("requests") as batch:
+        for col in ("synced_at", "payload", "is_auto_written", "amount", "item_type", "title", "username", "ai_request_id"):
+            batch.drop_column(col)
@@ -0,0 +1,66 @@
+"""point_wallets.lifetime_earned / level counters
+
+Revision ID: 8b1e4c6d2f90
+Revises: 3f9c2a7d41b0
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4c6d2f90'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d41b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# services/point_service._LEVEL_TABLE 과 같은 기준 (마이그레이션은 앱 코드에 의존하지 않도록 복사)
+_LEVEL_MIN_POINTS = [0, 1000, 3000, 6000, 10000]
+
+
+def _level_case(lifetime: str) -> str:
+    whens = " ".join(
+        f"WHEN {lifetime} >= {pt} THEN {idx + 1}"
+        for idx, pt in reversed(list(enumerate(_LEVEL_MIN_POINTS)))
+    )
+    return f"CASE {whens} ELSE 1 END"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("point_wallets") as batch:
+        batch.add_column(sa.Column("lifetime_earned", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("level", sa.Integer(), nullable=False, server_default="1"))
+
+    # 원장이 있는데 지갑이 없는 유저는 지갑부터 생성
+    op.execute(
+        """
+        INSERT INTO point_wallets (user_id, balance, lifetime_earned, level)
+        SELECT l.user_id, SUM(l.delta), 0, 1
+        FROM point_ledger l
+        LEFT JOIN point_wallets w ON w.user_id = l.user_id
+        WHERE w.user_id IS NULL
+        GROUP BY l.user_id
+        """
+    )
+    # 백필: 기존 원장의 적립 합계
+    op.execute(
+        """
+        UPDATE point_wallets
+        SET lifetime_earned = COALESCE((
+            SELECT SUM(l.delta) FROM point_ledger l
+            WHERE l.user_id = point_wallets.user_id AND l.delta > 0
+        ), 0)
+        """
+    )
+    op.execute(f"UPDATE point_wallets SET level = {_level_case('lifetime_earned')}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("point_wallets") as batch:
+        batch.drop_column("level")
+        batch.drop_column("lifetime_earned")
@@ -0,0 +1,51 @@
+"""content-addressed upload blobs and their references
+
+Revision ID: c47a9e1b3d52
+Revises: 8b1e4c6d2f90
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e1b3d52'
+down_revision: Union[str, Sequence[str], None] = '8b1e4c6d2f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "upload_blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("path", sa.String(length=255), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    op.create_table(
+        "upload_refs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("ref_type", sa.String(length=20), nullable=False),
+        sa.Column("ref_id", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["sha256"], ["upload_blobs.sha256"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ref_type", "ref_id", name="uq_upload_refs_ref"),
+    )
+    op.create_index("ix_upload_refs_sha256", "upload_refs", ["sha256"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_upload_refs_sha256", table_name="upload_refs")
+    op.drop_table("upload_refs")
+    op.drop_table("upload_blobs")
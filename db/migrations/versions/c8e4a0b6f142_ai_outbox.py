@@ -0,0 +1,53 @@
+"""ai_outbox for queued AI write operations
+
+Revision ID: c8e4a0b6f142
+Revises: b6d2f8a4e031
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4a0b6f142'
+down_revision: Union[str, Sequence[str], None] = 'b6d2f8a4e031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ai_outbox",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("public_id", sa.String(length=32), nullable=False),
+        sa.Column("op", sa.String(length=30), nullable=False),
+        sa.Column("entity_key", sa.String(length=100), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.String(length=255), nullable=True),
+        sa.Column("ai_id", sa.String(length=64), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("public_id"),
+    )
+    op.create_index("ix_ai_outbox_status_next", "ai_outbox", ["status", "next_attempt_at"])
+    op.create_index("ix_ai_outbox_entity_id", "ai_outbox", ["entity_key", "id"])
+    op.create_index("ix_ai_outbox_username_id", "ai_outbox", ["username", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ai_outbox_username_id", table_name="ai_outbox")
+    op.drop_index("ix_ai_outbox_entity_id", table_name="ai_outbox")
+    op.drop_index("ix_ai_outbox_status_next", table_name="ai_outbox")
+    op.drop_table("ai_outbox")
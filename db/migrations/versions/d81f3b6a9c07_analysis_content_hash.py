@@ -0,0 +1,36 @@
+"""analysis content hash / phash for result reuse
+
+Revision ID: d81f3b6a9c07
+Revises: c47a9e1b3d52
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f3b6a9c07'
+down_revision: Union[str, Sequence[str], None] = 'c47a9e1b3d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("analysis") as batch:
+        batch.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("phash", sa.String(length=16), nullable=True))
+        batch.add_column(sa.Column("source_analysis_id", sa.String(length=40), nullable=True))
+    op.create_index("ix_analysis_content_hash", "analysis", ["content_hash"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_analysis_content_hash", table_name="analysis")
+    with op.batch_alter_table("analysis") as batch:
+        batch.drop_column("source_analysis_id")
+        batch.drop_column("phash")
+        batch.drop_column("content_hash")
@@ -0,0 +1,35 @@
+"""analysis job_status / job_error for asynchronous analysis jobs
+
+Revision ID: e2a6c8f04b1d
+Revises: d81f3b6a9c07
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c8f04b1d'
+down_revision: Union[str, Sequence[str], None] = 'd81f3b6a9c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 기존 행은 모두 AI 응답을 받은 뒤 저장된 것이라 done
+    with op.batch_alter_table("analysis") as batch:
+        batch.add_column(sa.Column("job_status", sa.String(length=20), nullable=False, server_default="done"))
+        batch.add_column(sa.Column("job_error", sa.String(length=255), nullable=True))
+    op.create_index("ix_analysis_job_status_updated", "analysis", ["job_status", "updated_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_analysis_job_status_updated", table_name="analysis")
+    with op.batch_alter_table("analysis") as batch:
+        batch.drop_column("job_error")
+        batch.drop_column("job_status")
@@ -0,0 +1,30 @@
+"""upload_blobs.normalized_sha256 for preprocessed images
+
+Revision ID: f3b7d9a15c26
+Revises: e2a6c8f04b1d
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7d9a15c26'
+down_revision: Union[str, Sequence[str], None] = 'e2a6c8f04b1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("upload_blobs") as batch:
+        batch.add_column(sa.Column("normalized_sha256", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("upload_blobs") as batch:
+        batch.drop_column("normalized_sha256")
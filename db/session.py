@@ -1,12 +1,35 @@
 # db/session.py
 
+from typing import AsyncIterator, Optional
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
 
+# DATABASE_URL 하나로 동기(pymysql)/비동기(aiomysql) 엔진을 모두 만든다 (db/migrations/env.py 와 같은 규칙)
+_ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def _split_scheme(url: str) -> tuple[str, str]:
+    scheme, sep, rest = url.partition("://")
+    return scheme, sep + rest
+
+def _sync_url(url: str) -> str:
+    return url.replace("aiomysql", "pymysql").replace("+aiosqlite", "")
+
+def _async_url(url: str) -> str:
+    scheme, rest = _split_scheme(_sync_url(url))
+    return _ASYNC_DRIVERS.get(scheme, scheme) + rest
+
+_sync_database_url = _sync_url(settings.DATABASE_URL)
+
 engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
+    _sync_database_url,
+    connect_args={"check_same_thread": False} if _sync_database_url.startswith("sqlite") else {},
     pool_pre_ping=True,
 )
 
@@ -18,3 +41,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 비동기 엔진은 처음 쓸 때 생성 (비동기 드라이버가 없는 환경에서도 동기 경로는 그대로 동작)
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        _async_engine = create_async_engine(_async_url(settings.DATABASE_URL), pool_pre_ping=True)
+        _async_sessionmaker = async_sessionmaker(
+            bind=_async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    get_async_engine()
+    return _async_sessionmaker()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
@@ -1,16 +1,58 @@
 # main.py
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from core.config import settings
-from db.session import engine
+from core.idempotency import IdempotencyMiddleware
+from core.uploads import UploadSizeLimitMiddleware
+from db.session import dispose_async_engine, engine
 from db.base import Base
 from routers import auth, users, points, resources, requests as requests_router
 from routers import analysis as analysis_router
 from routers.notifications import router as notifications_router 
+from routers import admin as admin_router
+from routers import internal as internal_router
+from routers import outbox as outbox_router
+from core import images, security
+from services import ai_client, ai_outbox, analysis_jobs, mirror_service, notification_stream
 
-app = FastAPI(title="Circular Economy API - Auth", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    ai_client.open_client()
+    ai_client.open_async_client()
+    security.open_hash_pool()
+    images.open_image_pool()
+    mirror_service.start()
+    analysis_jobs.start()
+    ai_outbox.start()
+    notification_stream.start()
+    try:
+        yield
+    finally:
+        await notification_stream.stop()
+        await ai_outbox.stop()
+        await analysis_jobs.stop()
+        await mirror_service.stop()
+        security.close_hash_pool()
+        images.close_image_pool()
+        ai_client.close_client()
+        await ai_client.close_async_client()
+        await dispose_async_engine()
+
+
+app = FastAPI(title="Circular Economy API - Auth", version="0.1.0", lifespan=lifespan)
+
+# 본문을 다 읽어 지문을 만들므로 업로드 크기 제한보다 안쪽 (413 은 키를 잡기 전에 나감)
+app.add_middleware(IdempotencyMiddleware)
+
+# CORS 보다 안쪽에 두어 413 응답에도 CORS 헤더가 붙도록 먼저 등록
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_files={"/analysis/batch": settings.ANALYSIS_BATCH_MAX_IMAGES},
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +70,9 @@ app.include_router(resources.router)
 app.include_router(requests_router.router)
 app.include_router(analysis_router.router)
 app.include_router(notifications_router) 
+app.include_router(admin_router.router)
+app.include_router(internal_router.router)
+app.include_router(outbox_router.router)
 
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 app.mount(
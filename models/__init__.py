@@ -5,4 +5,10 @@ from db.base import Base
 from .user import User
 from .point import PointWallet, PointLedger
 from .request import Request
-from .analysis import Analysis
\ No newline at end of file
+from .resource import Resource
+from .analysis import Analysis
+from .upload import UploadBlob, UploadRef
+from .ai_event import AIEvent
+from .notification import NotificationInbox, NotificationInboxState
+from .ai_outbox import AIOutbox
+from .idempotency import IdempotencyKey
@@ -0,0 +1,29 @@
+# models/ai_event.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from db.base import Base
+
+# 이벤트 처리 상태. failed 와 lease 가 지난 received 는 같은 event_id 로 다시 오거나 admin replay 로 재처리
+EVENT_RECEIVED = "received"
+EVENT_PROCESSED = "processed"
+EVENT_FAILED = "failed"
+
+class AIEvent(Base):
+    """AI 서버가 POST /internal/ai-events 로 보낸 매칭 상태 변경 이벤트 로그 (services/ai_events.py)"""
+    __tablename__ = "ai_events"
+    __table_args__ = (
+        Index("ix_ai_events_status_received", "status", "received_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String(64), unique=True, nullable=False)    # 보낸 쪽이 정한 id (중복 수신 판별)
+    event_type = Column(String(40), nullable=False)               # match.proposed | match.accepted | match.declined
+    resource_id = Column(String(64))
+    request_id = Column(String(64))
+    payload = Column(JSON)                 # 받은 본문 그대로 (replay 용)
+    status = Column(String(20), nullable=False, default=EVENT_RECEIVED)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String(255))
+    result = Column(JSON)                  # 처리 결과 (포인트 지급 여부, 알림 대상)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)    # 마지막으로 처리를 시작한 시각 (재처리 시 갱신, lease 기준)
+    processed_at = Column(DateTime)
@@ -0,0 +1,35 @@
+# models/ai_outbox.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from db.base import Base
+
+# 전달 상태. dead 는 재시도를 포기한 것 (admin 에서 다시 pending 으로 돌릴 수 있음)
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_DELIVERED = "delivered"
+OUTBOX_DEAD = "dead"
+
+class AIOutbox(Base):
+    """AI 서버로 보낼 쓰기 작업 (services/ai_outbox.py). 로컬 상태와 같은 트랜잭션에서 기록"""
+    __tablename__ = "ai_outbox"
+    __table_args__ = (
+        Index("ix_ai_outbox_status_next", "status", "next_attempt_at"),
+        Index("ix_ai_outbox_entity_id", "entity_key", "id"),
+        Index("ix_ai_outbox_username_id", "username", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    public_id = Column(String(32), unique=True, nullable=False)    # 클라이언트에 돌려주는 로컬 id
+    op = Column(String(30), nullable=False)             # resource.create | request.create | match.confirm | match.manual
+    entity_key = Column(String(100), nullable=False)    # 같은 키끼리는 id 순서대로 하나씩 전달
+    username = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default=OUTBOX_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(String(255))
+    ai_id = Column(String(64))             # 전달 후 AI 가 준 resource_id / request_id
+    result = Column(JSON)                  # AI 응답
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    delivered_at = Column(DateTime)
@@ -3,10 +3,18 @@ from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from db.base import Base
 
+# 분석 작업 상태 (job_status). status 는 자원 등록 여부(pending | used | expired)라 따로 둠
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
 class Analysis(Base):
     __tablename__ = "analysis"
     __table_args__ = (
         Index("ix_analysis_username", "username"),
+        Index("ix_analysis_content_hash", "content_hash"),
+        Index("ix_analysis_job_status_updated", "job_status", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -19,6 +27,16 @@ class Analysis(Base):
     suggested_title = Column(String(100))
     image_path = Column(Text) 
 
+    # 분석 결과 재사용: 이미지 sha256 / dHash
+    content_hash = Column(String(64))
+    phash = Column(String(16))
+    # AI 서버가 아는 분석 id 가 ai_analysis_id 와 다를 때 (재사용한 원본 / 비동기 작업의 AI 결과 id)
+    source_analysis_id = Column(String(40))
+
+    # 비동기 분석 작업 (services/analysis_jobs.py): queued → running → done | failed
+    job_status = Column(String(20), default=JOB_DONE, server_default=JOB_DONE, nullable=False)
+    job_error = Column(String(255))
+
     estimated_value = Column(Integer)     
     status = Column(String(20), default="pending", nullable=False)  # pending | used | expired
 
@@ -0,0 +1,28 @@
+# models/idempotency.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, ForeignKey, UniqueConstraint, Index
+from db.base import Base
+
+IDEMPOTENCY_IN_PROGRESS = "in_progress"
+IDEMPOTENCY_DONE = "done"
+
+class IdempotencyKey(Base):
+    """Idempotency-Key 별 첫 응답 (core/idempotency.py). (user_id, key) 당 한 줄, expires_at 이 지나면 다시 사용 가능"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        Index("ix_idempotency_keys_expires", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    method = Column(String(10), nullable=False)
+    path = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)    # sha256(메서드/경로/쿼리/본문). 같은 키로 다른 요청이면 422
+    status = Column(String(20), nullable=False, default=IDEMPOTENCY_IN_PROGRESS)
+    response_status = Column(Integer)
+    response_headers = Column(JSON)        # [[name, value], ...]
+    response_body = Column(LargeBinary(length=16 * 1024 * 1024))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
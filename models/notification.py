@@ -0,0 +1,35 @@
+# models/notification.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, UniqueConstraint, Index
+from db.base import Base
+
+class NotificationInbox(Base):
+    """사용자별 매칭 알림 (제안/상태 변경마다 한 줄). services/notification_inbox.py"""
+    __tablename__ = "notification_inbox"
+    __table_args__ = (
+        UniqueConstraint("user_id", "dedup_key", name="uq_notification_inbox_user_key"),
+        Index("ix_notification_inbox_user_created", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    dedup_key = Column(String(150), nullable=False)    # <resource_id>:<request_id>:<state> (같은 변경은 한 번만)
+    state = Column(String(20), nullable=False)          # proposed | matched | declined
+    role = Column(String(20), nullable=False)           # supplier | requester
+    resource_id = Column(String(64))
+    request_id = Column(String(64))
+    payload = Column(JSON)                 # MatchProposalItem 그대로
+    source = Column(String(20), nullable=False)         # event(웹훅) | sync(AI 조회로 채움)
+    is_read = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    read_at = Column(DateTime)
+
+
+class NotificationInboxState(Base):
+    """사용자별 안 읽은 수(알림 INSERT/읽음 처리와 같은 트랜잭션에서 갱신)와 마지막 AI 동기화 시각"""
+    __tablename__ = "notification_inbox_state"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+    synced_at = Column(DateTime)           # None 이면 다음 GET /notifications 때 AI 에서 다시 채움
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -9,6 +9,9 @@ class PointWallet(Base):
     __tablename__ = "point_wallets"
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     balance = Column(Integer, nullable=False, default=0)
+    # 누적 적립(delta > 0 합계)과 그에 따른 레벨. 원장 INSERT 와 같은 트랜잭션에서 갱신
+    lifetime_earned = Column(Integer, nullable=False, default=0, server_default="0")
+    level = Column(Integer, nullable=False, default=1, server_default="1")
     user = relationship("User", back_populates="point_wallet", lazy="joined")
 
 
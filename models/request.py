@@ -1,11 +1,14 @@
 # models/request.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, Boolean, JSON
 from sqlalchemy.orm import relationship
 from db.base import Base
 
 class Request(Base):
     __tablename__ = "requests"
+    __table_args__ = (
+        Index("ix_requests_username_id", "username", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -17,6 +20,16 @@ class Request(Base):
     image_path = Column(String(255))
     status = Column(String(20), default="pending", index=True)  # pending | completed
 
+    # AI 서버 요청의 읽기 전용 미러 (services/mirror_service.py)
+    ai_request_id = Column(String(64), unique=True, index=True, nullable=True)
+    username = Column(String(50), nullable=True)
+    title = Column(String(100))
+    item_type = Column(String(50))
+    amount = Column(String(50))            # AI 원본 수량 문자열
+    is_auto_written = Column(Boolean, nullable=False, default=False)
+    payload = Column(JSON)                 # AI 원본 응답 행
+    synced_at = Column(DateTime)
+
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="requests", lazy="joined")
@@ -1,5 +1,5 @@
 # models/resource.py
-from sqlalchemy import Column, Integer, Text, String, Float, ForeignKey, DateTime, Enum, Index
+from sqlalchemy import Column, Integer, Text, String, Float, ForeignKey, DateTime, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from db.base import Base
@@ -14,7 +14,7 @@ class Resource(Base):
     __tablename__ = "resources"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     analysis_id = Column(Integer, ForeignKey("analysis.id"))
 
     title = Column(String(100), nullable=False)
@@ -25,16 +25,28 @@ class Resource(Base):
 
     detected_item = Column(String(100), index=True)
     material_type = Column(String(50), index=True)
+    # AI 서버가 ResourceStatus 외의 상태(in_progress 등)도 내려주므로 문자열로 보관
     status = Column(
-        Enum(ResourceStatus, native_enum=False),   
+        String(20),
         nullable=False,
-        default=ResourceStatus.registered,
+        default=ResourceStatus.registered.value,
         server_default=ResourceStatus.registered.value,
+        index=True,
     )
 
+    # AI 서버 자원의 읽기 전용 미러 (services/mirror_service.py)
+    ai_resource_id = Column(String(64), unique=True, index=True, nullable=True)
+    username = Column(String(50), nullable=True)
+    item_name = Column(String(100))
+    item_type = Column(String(50))
+    image_path = Column(String(255))
+    payload = Column(JSON)                 # AI 원본 응답 행
+    synced_at = Column(DateTime)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     analysis = relationship("Analysis")
 
 Index("ix_resources_unit_status", Resource.unit, Resource.status)
+Index("ix_resources_username_id", Resource.username, Resource.id)
@@ -0,0 +1,31 @@
+# models/upload.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index
+from db.base import Base
+
+class UploadBlob(Base):
+    """내용(sha256) 기준으로 한 번만 저장되는 업로드 파일 (services/upload_store.py)"""
+    __tablename__ = "upload_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String(255), nullable=False)        # uploads/blobs/ab/<sha256>.<ext>
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(100))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)   # 마지막으로 업로드된 시각 (GC 유예 기준)
+    normalized_sha256 = Column(String(64))      # AI 로 보낼 정규화본 blob (자기 자신이면 변환 불필요)
+
+
+class UploadRef(Base):
+    """blob 을 가리키는 쪽 (analysis.ai_analysis_id, AI 요청 id 등). 참조가 없는 blob 은 GC 대상"""
+    __tablename__ = "upload_refs"
+    __table_args__ = (
+        UniqueConstraint("ref_type", "ref_id", name="uq_upload_refs_ref"),
+        Index("ix_upload_refs_sha256", "sha256"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    sha256 = Column(String(64), ForeignKey("upload_blobs.sha256", ondelete="CASCADE"), nullable=False)
+    ref_type = Column(String(20), nullable=False)     # analysis | request | outbox
+    ref_id = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,6 +1,7 @@
 # repositories/user_repo.py
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models.user import User
 
@@ -22,3 +23,23 @@ class UserRepository:
         db.commit()
         db.refresh(user)
         return user
+
+
+class AsyncUserRepository:
+    async def get_by_id(self, db: AsyncSession, user_id: int) -> User | None:
+        return await db.get(User, user_id)
+
+    async def get_by_username(self, db: AsyncSession, username: str) -> User | None:
+        return await db.scalar(select(User).where(User.username == username))
+
+    async def get_by_nickname(self, db: AsyncSession, nickname: str) -> User | None:
+        return await db.scalar(select(User).where(User.nickname == nickname))
+
+    async def get_by_phone(self, db: AsyncSession, phone: str) -> User | None:
+        return await db.scalar(select(User).where(User.phone == phone))
+
+    async def create(self, db: AsyncSession, user: User) -> User:
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
@@ -0,0 +1,151 @@
+# routers/admin.py
+
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from core.deps import auth_cache_stats, get_db, require_admin_key
+from core.idempotency import idempotency_stats
+from core.images import image_pool_stats
+from core.security import hash_pool_stats
+from services import ai_client, ai_events, ai_outbox, analysis_jobs, analysis_service, notification_stream, point_service, upload_store
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_key)])
+
+
+@router.get("/cache")
+def cache_stats() -> Dict[str, Any]:
+    """AI 목록 응답 캐시 적중/미스 통계 (TTL 튜닝용)"""
+    return ai_client.ai_cache.stats()
+
+
+@router.post("/cache/invalidate")
+def cache_invalidate() -> Dict[str, Any]:
+    """AI 목록 응답 캐시 전체 비우기"""
+    ai_client.invalidate_after_write()
+    return ai_client.ai_cache.stats()
+
+
+@router.get("/idempotency")
+def idempotency() -> Dict[str, Any]:
+    """Idempotency-Key 실행/재사용/대기/불일치 건수와 이 워커에서 처리 중인 키 수"""
+    return idempotency_stats()
+
+
+@router.get("/auth-cache")
+def auth_cache() -> Dict[str, Any]:
+    """인증 토큰/사용자 캐시 적중률 + 비밀번호 해시 풀 사용량"""
+    return {**auth_cache_stats(), "hash_pool": hash_pool_stats()}
+
+
+@router.get("/singleflight")
+def singleflight_stats() -> Dict[str, Any]:
+    """동시에 같은 AI 조회가 합쳐진 횟수 (shared = 줄인 업스트림 요청 수)"""
+    return ai_client.ai_flight.stats()
+
+
+@router.get("/ai-guards")
+def ai_guard_stats() -> Dict[str, Any]:
+    """작업 종류(analysis/list/match/write)별 서킷 브레이커 상태와 bulkhead 사용량"""
+    return {op: g.stats() for op, g in ai_client.guards.items()}
+
+
+@router.post("/ai-guards/{op}/reset")
+def ai_guard_reset(op: str) -> Dict[str, Any]:
+    """브레이커를 강제로 closed 로 되돌림 (AI 서버 복구를 확인한 뒤)"""
+    g = ai_client.guards.get(op)
+    if g is None:
+        raise HTTPException(status_code=404, detail=f"unknown op: {op}")
+    g.breaker.reset()
+    return g.stats()
+
+
+@router.get("/images")
+def image_stats() -> Dict[str, Any]:
+    """AI 전송 전 이미지 정규화: 처리 수, 전/후 바이트, 처리 시간(ms), 풀 사용량"""
+    return image_pool_stats()
+
+
+@router.get("/analysis-cache")
+def analysis_cache_stats() -> Dict[str, Any]:
+    """이미지 분석 결과 재사용 적중률 (exact: 같은 파일, near: 비슷한 사진, miss: AI 호출)"""
+    return analysis_service.reuse_stats()
+
+
+@router.get("/analysis-jobs")
+def analysis_job_stats() -> Dict[str, Any]:
+    """비동기 분석 작업 큐 길이와 처리 결과 수"""
+    return analysis_jobs.stats()
+
+
+@router.get("/ai-events")
+def ai_event_log(
+    status: str | None = Query(None, description="received | processed | failed"),
+    limit: int = Query(50, ge=1, le=500),
+) -> Dict[str, Any]:
+    """AI 웹훅 이벤트 로그 (최근 순)와 처리 통계"""
+    return {"events": ai_events.list_events(status=status, limit=limit), "stats": ai_events.stats()}
+
+
+@router.get("/notification-stream")
+def notification_stream_stats() -> Dict[str, Any]:
+    """SSE 연결 수, 전송/재개/reset 건수, 다른 워커에서 읽어 온 이벤트 수"""
+    return notification_stream.stats()
+
+
+@router.post("/ai-events/{event_id}/replay")
+async def ai_event_replay(event_id: str) -> Dict[str, Any]:
+    """기록된 이벤트 재처리 (포인트/미러는 멱등이라 중복 반영되지 않음)"""
+    status = await ai_events.replay(event_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"unknown event: {event_id}")
+    return {"event_id": event_id, "status": status}
+
+
+@router.get("/outbox")
+def outbox_log(
+    status: str | None = Query(None, description="pending | sending | delivered | dead"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """AI 쓰기 outbox (최근 순)와 상태별 건수/전달 통계"""
+    rows = ai_outbox.list_rows(db, status=status, limit=limit)
+    return {
+        "items": [{**ai_outbox.to_status(r).model_dump(), "username": r.username} for r in rows],
+        "stats": ai_outbox.stats(db),
+    }
+
+
+@router.post("/outbox/{outbox_id}/retry")
+def outbox_retry(outbox_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """dead 행을 다시 pending 으로 돌려 디스패처가 재전달하게 함"""
+    row = ai_outbox.retry(db, outbox_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"unknown outbox id: {outbox_id}")
+    return ai_outbox.to_status(row).model_dump()
+
+
+@router.get("/points/consistency")
+def points_consistency(
+    fix: bool = Query(False, description="true 면 원장 합계 기준으로 지갑을 고침"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """지갑 balance/lifetime_earned/level 과 point_ledger 합계 비교"""
+    mismatches = point_service.check_wallet_consistency(db, fix=fix)
+    if fix and mismatches:
+        db.commit()
+    return {"mismatches": mismatches, "count": len(mismatches), "fixed": bool(fix and mismatches)}
+
+
+@router.get("/uploads")
+def upload_store_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """content-addressed 업로드 저장소: blob 수/용량, 참조 수, 중복 제거로 아낀 쓰기"""
+    return upload_store.store_stats(db)
+
+
+@router.post("/uploads/gc")
+def upload_store_gc(
+    older_than: float = Query(3600.0, ge=0, description="이 시간(초) 동안 다시 올라오지 않은 무참조 blob 만 삭제"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """참조가 없는 blob 파일/행 정리"""
+    return upload_store.collect_garbage(db, older_than=older_than)
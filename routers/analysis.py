@@ -1,59 +1,101 @@
 # routers/analysis.py
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Literal
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
 from core.utils import make_public_url 
-from core.deps import get_db, get_current_user
-from services.analysis_service import call_ai_and_save, get_analysis_by_id
-from schemas.analysis import AnalysisCreateOut
+from core.deps import get_async_db, get_current_principal
+from models.analysis import JOB_DONE, JOB_FAILED, Analysis
+from services import analysis_jobs
+from services.analysis_service import analyze_batch, call_ai_and_save, get_analysis_by_id_async
+from schemas.analysis import AnalysisBatchItem, AnalysisBatchOut, AnalysisCreateOut
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
+
+def _to_out(anal: Analysis, status: str) -> AnalysisCreateOut:
+    extracted = {
+        "item_name": getattr(anal, "detected_item", None),
+        "material_type": getattr(anal, "material_type", None),
+        "title_suggested": getattr(anal, "suggested_title", None),
+    }
+    image_url = make_public_url(getattr(anal, "image_path", None))
+
+    return AnalysisCreateOut(
+        analysis_id=anal.ai_analysis_id,
+        extracted=extracted,
+        image_url=image_url,
+        status=status,
+        job_status=anal.job_status,
+        error=anal.job_error,
+    )
+
+
 @router.post("/image", response_model=AnalysisCreateOut)
-def analyze_image_route(
+async def analyze_image_route(
+    response: Response,
     image: UploadFile = File(...),             
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),   
+    mode: Literal["sync", "job"] | None = Query(
+        None, description="job 이면 이미지 저장 후 바로 202 + analysis_id, 결과는 GET /analysis/{id} 로 조회"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_principal),   
 ):
+    use_job = (mode or settings.ANALYSIS_DEFAULT_MODE) == "job" and analysis_jobs.enabled()
     try:
-        anal = call_ai_and_save(db=db, username=current_user.username, file=image)
-        extracted = {
-            "item_name": getattr(anal, "detected_item", None),
-            "material_type": getattr(anal, "material_type", None),
-            "title_suggested": getattr(anal, "suggested_title", None),
-        }
-        image_url = make_public_url(getattr(anal, "image_path", None))
-
-        return AnalysisCreateOut(
-            analysis_id=anal.ai_analysis_id,
-            extracted=extracted,
-            image_url=image_url,
-            status="pending",
+        if use_job:
+            anal = await analysis_jobs.submit(db=db, username=current_user.username, file=image)
+            if anal.job_status != JOB_DONE:
+                response.status_code = status.HTTP_202_ACCEPTED
+                response.headers["Location"] = f"/analysis/{anal.ai_analysis_id}"
+        else:
+            anal = await call_ai_and_save(db=db, username=current_user.username, file=image)
+        return _to_out(anal, "pending")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 여러 장 한 번에 분석: 이미지별 성공/실패를 따로 돌려줌 (일부 실패해도 200)
+@router.post("/batch", response_model=AnalysisBatchOut)
+async def analyze_batch_route(
+    images: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_principal),
+):
+    if len(images) > settings.ANALYSIS_BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=422, detail=f"이미지는 한 번에 최대 {settings.ANALYSIS_BATCH_MAX_IMAGES}장까지 분석할 수 있습니다."
         )
+    try:
+        results = await analyze_batch(db=db, username=current_user.username, files=images)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-# 분석내용 재조회 API
+    items = []
+    for idx, (image, res) in enumerate(zip(images, results)):
+        if isinstance(res, BaseException):
+            detail = getattr(res, "detail", None) or str(res) or res.__class__.__name__
+            items.append(AnalysisBatchItem(index=idx, filename=image.filename, ok=False, error=str(detail)))
+        else:
+            items.append(AnalysisBatchItem(index=idx, filename=image.filename, ok=True, result=_to_out(res, "pending")))
+    succeeded = sum(1 for it in items if it.ok)
+    return AnalysisBatchOut(items=items, succeeded=succeeded, failed=len(items) - succeeded)
+
+# 분석내용 재조회 API (job 모드에서는 진행 상태 조회: job_status = queued | running | done | failed)
 @router.get("/{analysis_id}", response_model=AnalysisCreateOut)
-def get_analysis_route(
+async def get_analysis_route(
     analysis_id: str,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_principal),
 ):
-    anal = get_analysis_by_id(db=db, username=current_user.username, analysis_id=analysis_id)
+    anal = await get_analysis_by_id_async(db=db, username=current_user.username, analysis_id=analysis_id)
     if not anal:
         raise HTTPException(status_code=404, detail="분석 결과를 찾을 수 없습니다.")
 
-    extracted = {
-        "item_name": getattr(anal, "detected_item", None),
-        "material_type": getattr(anal, "material_type", None),
-        "title_suggested": getattr(anal, "suggested_title", None),
-    }
-
-    image_url = make_public_url(getattr(anal, "image_path", None))
-
-    return AnalysisCreateOut(
-        analysis_id=anal.ai_analysis_id,
-        extracted=extracted,
-        image_url=image_url,
-        status=getattr(anal, "status", "pending"),
-    )
+    if anal.job_status not in (JOB_DONE, JOB_FAILED):
+        response.headers["Retry-After"] = "1"
+    return _to_out(anal, getattr(anal, "status", "pending"))
@@ -11,25 +11,25 @@ from services.auth_service import AuthService
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/signup", response_model=UserOut)
-def signup(
+async def signup(
     body: SignUpIn,
     db: Session = Depends(get_db),
     svc: AuthService = Depends(AuthService),
 ):
-    user = svc.signup(db, body)
+    user = await svc.signup(db, body)
     return user
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     body: LoginIn,
     db: Session = Depends(get_db),
     svc: AuthService = Depends(AuthService), 
 ):
-    user = svc.authenticate(db, body.username, body.password)
+    user = await svc.authenticate(db, body.username, body.password)
     token = svc.issue_token(user.id)
     return Token(access_token=token)
 
-from core.deps import get_current_user
+from core.deps import get_current_user_async
 @router.get("/me", response_model=UserOut)
-def me(user = Depends(get_current_user)):
+async def me(user = Depends(get_current_user_async)):
     return user
@@ -0,0 +1,27 @@
+# routers/internal.py
+# 서버 간 호출 전용 (사용자 토큰이 아니라 AI 서버 서명으로 인증)
+from fastapi import APIRouter, Depends, HTTPException
+from core.deps import require_ai_signature
+from models.ai_event import EVENT_FAILED, EVENT_RECEIVED
+from schemas.ai_event import AIEventAck, AIEventIn
+from services import ai_events
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_ai_signature)])
+
+
+# AI 서버가 매칭 제안/수락/거절 시 호출.
+# 헤더: X-AI-Timestamp(unix 초), X-AI-Signature("sha256=" + HMAC-SHA256(secret, "{timestamp}.{body}"))
+# 처리에 실패하면 500 → 보낸 쪽이 같은 event_id 로 재전송하면 다시 처리, 이미 처리된 event_id 는 200 + duplicate
+# 같은 event_id 를 다른 요청이 아직 처리 중이면 409 + Retry-After (결과를 모르므로 processed 로 답하지 않음)
+@router.post("/ai-events", response_model=AIEventAck)
+async def receive_ai_event(event: AIEventIn):
+    status, duplicate = await ai_events.receive(event)
+    if status == EVENT_FAILED:
+        raise HTTPException(status_code=500, detail=f"event {event.event_id} processing failed")
+    if status == EVENT_RECEIVED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"event {event.event_id} is still being processed",
+            headers={"Retry-After": "5"},
+        )
+    return AIEventAck(event_id=event.event_id, status=status, duplicate=duplicate)
@@ -1,26 +1,32 @@
 # routers/notifications.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Literal
 from pydantic import BaseModel, Field
-import time 
-from core.deps import get_db, get_current_user
+import asyncio
+from core.config import settings
+from core.concurrency import gather_bounded
+from core.deps import bearer_scheme, get_async_db, get_db, get_current_principal, get_stream_principal
+from core.security import create_stream_ticket
 from core.utils import make_public_url
 
 from services.ai_client import (
-    list_resource,
-    get_match_by_resource,
-    get_match_by_request,
-    confirm_match,
-    manual_match as ai_manual_match,
-    get_match_history,  
+    list_resource_async,
+    get_match_by_resource_async,
+    get_match_by_request_async,
+    get_match_history_async,
 )
 from services.request_service import list_by_user_from_ai
-from services.resource_service import award_points_if_matched
+from services import ai_outbox, match_service, notification_inbox, notification_stream
 from schemas.notification import (
     ResourceBrief, RequestBrief,
-    MatchProposalItem,
-    MatchProposalsOut, ManualMatchIn, ManualMatchResponse
+    MatchProposalItem, ProposalLookupFailure,
+    MatchProposalsOut, ManualMatchIn, ManualMatchResponse,
+    MarkReadIn, UnreadCountOut, StreamTicketOut,
 )
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
@@ -32,21 +38,18 @@ def _pub(url_or_path: str | None) -> str | None:
     return make_public_url(url_or_path)
 
 
-@router.get("", response_model=MatchProposalsOut)
-def list_my_match_proposals(
-    state: str | None = Query(
-        None,
-        description='필터 상태("proposed"|"matched"|"declined"|"accepted"|None)',
-    ),
-    db: Session = Depends(get_db), 
-    current_user=Depends(get_current_user),
-):
-    proposals: List[MatchProposalItem] = []
+def _failure_reason(e: BaseException) -> str:
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout"
+    return f"{type(e).__name__}: {e}"
 
-    # 입력 state 정규화(accepted → matched)
-    if state is not None:
-        state = state.lower()
-        state = "matched" if state == "accepted" else state
+
+async def _live_proposals(
+    username: str, state: str | None
+) -> tuple[List[MatchProposalItem], List[ProposalLookupFailure]]:
+    # AI 서버의 자원/요청/히스토리를 fan-out 조회해 제안 목록을 만듦 (알림함 동기화용)
+    proposals: List[MatchProposalItem] = []
+    failures: List[ProposalLookupFailure] = []
 
     def _norm_state(x: str | None) -> str:
         raw = (x or "").lower()
@@ -57,21 +60,77 @@ def list_my_match_proposals(
 
     seen: set[tuple[str, str, str]] = set()  
 
+    # 전체 조회에 하나의 마감 시간을 적용
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.NOTIFY_FANOUT_DEADLINE
+
+    def _remaining() -> float:
+        return deadline - loop.time()
+
+    # 1단계: 내 자원 / 내 요청 / 히스토리 목록을 동시에 조회
+    rdata, my_rows_res, history = await gather_bounded(
+        [
+            lambda: list_resource_async(username=username),
+            lambda: list_by_user_from_ai(
+                username=username,
+                material_type=None,
+                wanted_item=None,
+                status=None,
+                limit=None,
+                offset=None,
+            ),
+            lambda: get_match_history_async(username=username),
+        ],
+        limit=3,
+        timeout=_remaining(),
+    )
+    # 브레이커/bulkhead 503 은 그대로 전달
+    for res in (rdata, my_rows_res):
+        if isinstance(res, HTTPException):
+            raise res
+    if isinstance(rdata, BaseException):
+        raise HTTPException(status_code=502, detail=f"자원 제안 조회 실패: {rdata}")
+    if isinstance(my_rows_res, BaseException):
+        raise HTTPException(status_code=502, detail=f"요청 제안 조회 실패: {my_rows_res}")
+    if isinstance(history, BaseException):
+        print(f"[경고] /match/history 조회 실패: {history}")
+        failures.append(ProposalLookupFailure(source="history", reason=_failure_reason(history)))
+        history = []
+
+    resources: List[Dict[str, Any]] = rdata.get("resources") or []
+    res_map: Dict[str, Dict[str, Any]] = {}
+    for r in resources:
+        rid = (r.get("resource_id") or r.get("id"))
+        if rid:
+            res_map[str(rid)] = r
+
+    my_rows, _total = my_rows_res
+    req_rows: List[tuple[str, Dict[str, Any]]] = []
+    for row in my_rows:
+        request_id = (
+            str(row.get("request_id"))
+            if row.get("request_id") is not None
+            else str(row.get("id") or "")
+        )
+        if request_id:
+            req_rows.append((request_id, row))
+
+    # 2단계: 자원/요청별 매칭 조회를 제한된 동시성으로 fan-out
+    lookups = await gather_bounded(
+        [(lambda rid=rid: get_match_by_resource_async(rid)) for rid in res_map]
+        + [(lambda qid=qid: get_match_by_request_async(qid)) for qid, _row in req_rows],
+        limit=settings.NOTIFY_FANOUT_CONCURRENCY,
+        timeout=_remaining(),
+    )
+    res_matches = lookups[: len(res_map)]
+    req_matches = lookups[len(res_map):]
+
+    # 병합은 기존과 같은 순서(자원 → 요청 → 히스토리)로 seen 중복 제거
     # 제안된 매칭
     try:
-        rdata = list_resource(username=current_user.username)
-        resources: List[Dict[str, Any]] = rdata.get("resources") or []
-
-        res_map: Dict[str, Dict[str, Any]] = {}
-        for r in resources:
-            rid = (r.get("resource_id") or r.get("id"))
-            if rid:
-                res_map[str(rid)] = r
-
-        for rid, r in res_map.items():
-            try:
-                m = get_match_by_resource(rid)
-            except Exception:
+        for (rid, r), m in zip(res_map.items(), res_matches):
+            if isinstance(m, BaseException):
+                failures.append(ProposalLookupFailure(source="resource", id=rid, reason=_failure_reason(m)))
                 continue
 
             raw_state = str((m or {}).get("status") or (m or {}).get("state") or "")
@@ -124,27 +183,9 @@ def list_my_match_proposals(
         raise HTTPException(status_code=502, detail=f"자원 제안 조회 실패: {e}")
 
     try:
-        my_rows, _total = list_by_user_from_ai(
-            username=current_user.username,
-            material_type=None,
-            wanted_item=None,
-            status=None,
-            limit=None,
-            offset=None,
-        )
-
-        for row in my_rows:
-            request_id = (
-                str(row.get("request_id"))
-                if row.get("request_id") is not None
-                else str(row.get("id") or "")
-            )
-            if not request_id:
-                continue
-
-            try:
-                m = get_match_by_request(request_id)
-            except Exception:
+        for (request_id, row), m in zip(req_rows, req_matches):
+            if isinstance(m, BaseException):
+                failures.append(ProposalLookupFailure(source="request", id=request_id, reason=_failure_reason(m)))
                 continue
 
             raw_state = str((m or {}).get("status") or (m or {}).get("state") or "")
@@ -183,7 +224,7 @@ def list_my_match_proposals(
                         amount=_s(row.get("amount") if row.get("amount") is not None else row.get("desired_amount")),
                         value=(int(row.get("value")) if row.get("value") is not None else None),
                         description=row.get("description"),
-                        username=row.get("username") or current_user.username,
+                        username=row.get("username") or username,
                         item_type=row.get("item_type"),
                         material_type=row.get("material_type"),
                         image_url=_pub(row.get("image_path") or row.get("image_url")),
@@ -196,7 +237,6 @@ def list_my_match_proposals(
 
     # 과거 히스토리(accepted/declined) 
     try:
-        history = get_match_history(username=current_user.username)
         for h in history or []:
             raw_state = str(h.get("status") or "").lower()          # accepted | declined
             st = _norm_state(raw_state)                             # accepted → matched
@@ -210,9 +250,9 @@ def list_my_match_proposals(
 
             # 현재 유저가 supplier / requester 어떤 역할인지 판별
             role = None
-            if (hr.get("username") or "").strip() == current_user.username:
+            if (hr.get("username") or "").strip() == username:
                 role = "supplier"
-            elif (hq.get("username") or "").strip() == current_user.username:
+            elif (hq.get("username") or "").strip() == username:
                 role = "requester"
             else:
                 continue 
@@ -258,61 +298,105 @@ def list_my_match_proposals(
     except Exception as e:
         print(f"[경고] /match/history 조회 실패: {e}")
 
-    return MatchProposalsOut(proposals=proposals, total=len(proposals))
-
-
-def _extract_state(m: dict | None) -> str:
-    if not m:
-        return ""
-    return str(m.get("status") or m.get("state") or "").lower()
-
-def _is_matched_state(m: dict | None) -> bool:
-    if not m:
-        return False
-    st = str(m.get("status") or "").lower()
-    return st in {"matched", "completed", "accepted"}
-
-def _try_award_on_matched(
-    db: Session,
-    resource_id: str,
-    request_id: str,
-    tries: int = 6,
-    delay_sec: float = 0.5,
-) -> dict:
-    last_state = ""
-    last_match = None
-
-    for _ in range(tries):
-        match = None
-        try:
-            match = get_match_by_resource(resource_id)
-        except Exception:
-            match = None
-
-        if not _is_matched_state(match):
-            try:
-                match = get_match_by_request(request_id)
-            except Exception:
-                match = None
-
-        last_match = match
-        last_state = _extract_state(match)
-
-        if _is_matched_state(match):
-            rid = (
-                ((match.get("request") or {}).get("matched_resource_id"))
-                or ((match.get("resource") or {}).get("resource_id"))
-                or resource_id
-            )
-            res = award_points_if_matched(db, rid)
-            if not res:
-                return {"awarded": False, "reason": "award skipped or failed", "state": last_state}
-            return {"awarded": True, "detail": res, "state": last_state}
+    return proposals, failures
+
+
+def _norm_query_state(state: str | None) -> str | None:
+    # 입력 state 정규화(accepted → matched)
+    if state is None:
+        return None
+    state = state.lower()
+    return "matched" if state == "accepted" else state
+
 
-        time.sleep(delay_sec)
+@router.get("", response_model=MatchProposalsOut)
+async def list_my_match_proposals(
+    state: str | None = Query(
+        None,
+        description='필터 상태("proposed"|"matched"|"declined"|"accepted"|None)',
+    ),
+    limit: int | None = Query(None, ge=1, le=200, description="페이지 크기 (기본 NOTIFY_INBOX_PAGE_SIZE)"),
+    before_id: int | None = Query(None, description="이전 응답의 next_before_id (다음 페이지)"),
+    refresh: bool = Query(False, description="true 면 AI 서버에서 다시 조회해 알림함을 채운 뒤 응답"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_principal),
+):
+    state = _norm_query_state(state)
+    if not settings.NOTIFY_INBOX_ENABLED:
+        proposals, failures = await _live_proposals(current_user.username, state)
+        return MatchProposalsOut(proposals=proposals, total=len(proposals), failures=failures)
+
+    # 알림함이 비었거나 오래됐을 때만 AI fan-out (평소에는 알림함 인덱스 조회 한 번)
+    if refresh or await notification_inbox.needs_sync(db, current_user.id):
+        proposals, failures = await _live_proposals(current_user.username, None)
+        await run_in_threadpool(
+            notification_inbox.materialize, current_user.id, proposals, complete=not failures
+        )
+        if failures:
+            # 일부 조회 실패: 이번에는 조회된 것만 기존 형식으로 응답하고 다음 조회 때 다시 동기화
+            if state is not None:
+                proposals = [p for p in proposals if p.state == state]
+            return MatchProposalsOut(proposals=proposals, total=len(proposals), failures=failures)
+
+    items, next_before = await notification_inbox.list_page(
+        db,
+        current_user.id,
+        state=state,
+        limit=limit or settings.NOTIFY_INBOX_PAGE_SIZE,
+        before_id=before_id,
+    )
+    unread = await notification_inbox.unread_count(db, current_user.id)
+    return MatchProposalsOut(proposals=items, total=len(items), next_before_id=next_before, unread=unread)
+
+
+@router.get("/unread-count", response_model=UnreadCountOut)
+async def my_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_principal),
+):
+    return UnreadCountOut(unread=await notification_inbox.unread_count(db, current_user.id))
 
-    return {"awarded": False, "reason": "not matched after retries", "state": last_state, "raw": last_match}
 
+@router.post("/read", response_model=UnreadCountOut)
+async def mark_my_notifications_read(
+    body: MarkReadIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_principal),
+):
+    return UnreadCountOut(unread=await notification_inbox.mark_read(db, current_user.id, body.ids))
+
+
+# 브라우저 EventSource 는 헤더를 못 붙이므로 먼저 여기서 스트림 티켓을 받아 ?ticket= 으로 접속
+# (access 토큰을 URL 에 실으면 접근 로그/프록시에 남음. 티켓은 스트림 접속에만 쓰이고 NOTIFY_STREAM_TICKET_TTL 초 뒤 만료)
+@router.post("/stream-ticket", response_model=StreamTicketOut)
+async def issue_stream_ticket(current_user=Depends(get_current_principal)):
+    return StreamTicketOut(
+        ticket=create_stream_ticket(current_user.id), expires_in=settings.NOTIFY_STREAM_TICKET_TTL
+    )
+
+
+# 새 제안/상태 변경을 SSE 로 받음 (연결된 동안은 GET /notifications 폴링 불필요)
+# 인증: Authorization 헤더 또는 ?ticket= (POST /notifications/stream-ticket). 티켓은 접속 시점에만 확인
+# 끊겼다 다시 붙으면 Last-Event-ID(또는 ?last_event_id=) 이후 것부터 재전송, 너무 오래되면 reset 이벤트
+@router.get("/stream")
+async def stream_my_notifications(
+    ticket: str | None = Query(None),
+    last_event_id: int | None = Query(None, ge=0),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+):
+    if creds is None and ticket:
+        current_user = await get_stream_principal(ticket)
+    else:
+        current_user = await get_current_principal(creds)
+
+    if last_event_id_header and last_event_id_header.strip().isdigit():
+        last_event_id = int(last_event_id_header)
+    return StreamingResponse(
+        notification_stream.stream(current_user.username, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 class ConfirmIn(BaseModel):
@@ -325,50 +409,52 @@ class ConfirmIn(BaseModel):
 
 
 @router.post("/confirm")
-def confirm_my_match(
+async def confirm_my_match(
     body: ConfirmIn,
+    mode: Literal["sync", "async"] | None = Query(
+        None, description="async 면 outbox 에 기록 후 바로 202 + outbox_id (AI 장애 시 sync 도 202)"
+    ),
     db: Session = Depends(get_db),
-    _current_user=Depends(get_current_user),
+    _current_user=Depends(get_current_principal),
 ):
     action = "decline" if body.action == "reject" else body.action
 
     try:
-        confirm_res = confirm_match(body.resource_id, body.request_id, action)
+        delivery = await match_service.confirm(
+            db, _current_user, body.resource_id, body.request_id, action,
+            wait=(mode or settings.AI_WRITE_DEFAULT_MODE) == "sync",
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"매칭 확정 실패: {e}")
+    if not delivery.delivered:
+        return ai_outbox.accepted(delivery.row)
 
-    award_info = None
-    if action == "accept":
-        try:
-            award_info = award_points_if_matched(
-                db,
-                resource_id=body.resource_id,
-                request_id=body.request_id,
-                allow_on_accept=True,
-            )
-            if not award_info:
-                award_info = {"awarded": False, "reason": "award skipped or failed"}
-            else:
-                award_info = {"awarded": True, "detail": award_info}
-        except Exception as e:
-            award_info = {"awarded": False, "error": str(e)}
-
-    return {"confirm": confirm_res, "award": award_info}
+    award_info = (delivery.extra or {}).get("award")
+    return {"confirm": delivery.row.result, "award": award_info}
 
 
 @router.post("/iwant", response_model=ManualMatchResponse, status_code=201)
-def manual_match(
+async def manual_match(
     body: ManualMatchIn,
+    mode: Literal["sync", "async"] | None = Query(
+        None, description="async 면 outbox 에 기록 후 바로 202 + outbox_id (AI 장애 시 sync 도 202)"
+    ),
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_principal),
 ):
     try:
-        ai_res = ai_manual_match(
-            resource_id=body.resource_id,
-            amount=body.amount,
-            username=current_user.username,   
+        delivery = await match_service.manual(
+            db, current_user, body.resource_id, body.amount,
+            wait=(mode or settings.AI_WRITE_DEFAULT_MODE) == "sync",
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"AI 수동매칭 실패: {e}")
+    if not delivery.delivered:
+        return ai_outbox.accepted(delivery.row)
 
+    ai_res = delivery.row.result
     return ManualMatchResponse(manual=ai_res, award=None)
\ No newline at end of file
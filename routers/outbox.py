@@ -0,0 +1,22 @@
+# routers/outbox.py
+# 202 로 접수된 AI 쓰기(POST /resources, /requests, /notifications/confirm, /notifications/iwant)의 전달 상태
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from core.deps import get_db, get_current_principal
+from schemas.outbox import AIWriteStatus
+from services import ai_outbox
+
+router = APIRouter(prefix="/outbox", tags=["outbox"])
+
+
+@router.get("/{outbox_id}", response_model=AIWriteStatus)
+def get_write_status(
+    outbox_id: str,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_principal),
+):
+    # delivered 면 ai_id 가 AI 서버의 resource_id / request_id
+    row = ai_outbox.get_owned(db, outbox_id, current_user.username)
+    if row is None:
+        raise HTTPException(status_code=404, detail="접수 내역을 찾을 수 없습니다.")
+    return ai_outbox.to_status(row)
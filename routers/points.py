@@ -1,10 +1,10 @@
 # routers/points.py
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from core.deps import get_db, get_current_user
-from core.config import settings
+from core.deps import get_db, get_async_db, get_current_principal, require_admin_key
 from services import point_service
 from services.resource_service import award_points_if_matched
 from schemas.point import PointBalanceOut, PointHistoryOut, PointHistoryItem, GrantPointsIn, PointHistoryAllOut
@@ -12,30 +12,23 @@ from schemas.point import PointBalanceOut, PointHistoryOut, PointHistoryItem, Gr
 router = APIRouter(prefix="/points", tags=["points"])
 
 
-def require_admin_key(x_admin_key: str | None = Header(default=None)):
-    if not x_admin_key or x_admin_key != settings.ADMIN_API_KEY:
-        raise HTTPException(status_code=403, detail="invalid admin key")
-    return True
-
-
-
 @router.get("/me", response_model=PointBalanceOut)
-def my_balance(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+async def my_balance(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_principal),
 ):
-    return point_service.get_balance_status(db, current_user.id)
+    return await point_service.get_balance_status_async(db, current_user.id)
 
 
 @router.get("/me/history", response_model=PointHistoryOut)
-def my_history(
+async def my_history(
     limit: int = Query(20, ge=1, le=100),
     before_id: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_principal),
 ):
     """현재 로그인한 유저의 포인트 내역 조회 (자원명, 수량 포함)"""
-    rows, next_before_id = point_service.get_history(db, current_user.id, limit, before_id)
+    rows, next_before_id = await point_service.get_history_async(db, current_user.id, limit, before_id)
 
     items = [
         PointHistoryItem(
@@ -58,12 +51,12 @@ def my_history(
     response_model=PointHistoryAllOut,
     response_model_exclude_none=True
 )
-def my_history_all(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+async def my_history_all(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_principal),
 ):
-    rows = point_service.get_all(db, current_user.id)
-    summary = point_service.get_balance_status(db, current_user.id)
+    rows = await point_service.get_all_async(db, current_user.id)
+    summary = await point_service.get_balance_status_async(db, current_user.id)
 
     items = [
         PointHistoryItem(
@@ -85,25 +78,25 @@ def my_history_all(
     response_model=PointBalanceOut,
     dependencies=[Depends(require_admin_key)],
 )
-def grant_points(
+async def grant_points(
     payload: GrantPointsIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    point_service.award(
+    await point_service.award_async(
         db,
         user_id=payload.user_id,
         amount=payload.amount,
         idempotency_key=payload.idempotency_key,
     )
-    db.commit()
-    return point_service.get_balance_status(db, payload.user_id)
+    await db.commit()
+    return await point_service.get_balance_status_async(db, payload.user_id)
 
 @router.post("/award")
-def award_matched_points(
+async def award_matched_points(
     resource_id: str = Query(..., description="AI 서버의 resource_id"),
     db: Session = Depends(get_db),
 ):
-    result = award_points_if_matched(db, resource_id)
+    result = await award_points_if_matched(db, resource_id)
     if not result:
         raise HTTPException(status_code=400, detail="지급 조건을 만족하지 않거나 AI 서버 조회 실패")
     return result
\ No newline at end of file
@@ -1,19 +1,20 @@
 # routers/requests.py
+from typing import Literal
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from pathlib import Path
-import os, uuid
-import requests
-from core.deps import get_db, get_current_user
-from core.utils import make_public_url, make_ai_url
+from core.config import settings
+from core.deps import get_db, get_current_principal
+from core.utils import make_public_url
 
 from services.request_service import (
-    list_pending_from_ai,
-    list_by_user_from_ai,
+    list_requests_page,
     get_user_by_username,
     get_by_id_from_ai, 
+    register_request,
+    request_data,
 )
-from services.ai_client import create_request_on_ai
+from services import ai_outbox, upload_store
 
 from schemas.request import (
     RequestOut, RequestListOut, 
@@ -23,19 +24,6 @@ from schemas.request import (
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
-UPLOAD_DIR = Path("uploads/requests")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-def _save_upload_file(up: UploadFile) -> str:
-    ext = os.path.splitext(up.filename or "")[1].lower()
-    name = f"{uuid.uuid4().hex}{ext}"
-    path = UPLOAD_DIR / name
-    up.file.seek(0)
-    with open(path, "wb") as f:
-        f.write(up.file.read())
-    return str(path).replace("\\", "/")
-
-
 def _to_float(v) -> float:
     try:
         s = str(v).strip()
@@ -51,7 +39,7 @@ def _to_float(v) -> float:
         return 0.0
 
 @router.post("", response_model=RequestOut, status_code=201)
-def create_request(
+async def create_request(
     title: str | None = Form(None), 
     item_name: str | None = Form(None),
     amount: str | None = Form(None),
@@ -59,8 +47,11 @@ def create_request(
     item_type: str | None = Form(None),
     material_type: str | None = Form(None),
     image: UploadFile | None = File(None),
+    mode: Literal["sync", "async"] | None = Query(
+        None, description="async 면 outbox 에 기록 후 바로 202 + outbox_id (AI 장애 시 sync 도 202)"
+    ),
     _db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_principal),
 ):
     if not item_name:
         raise HTTPException(status_code=422, detail="물품명을 입력해주세요.")
@@ -72,9 +63,13 @@ def create_request(
         title = item_name 
 
     image_path = None
+    saved = None
     if image:
         try:
-            image_path = _save_upload_file(image)
+            saved = await upload_store.store_upload(image)
+            image_path = saved.path
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"이미지 저장 실패: {e}")
     image_url = make_public_url(image_path) if image_path else None
@@ -90,30 +85,22 @@ def create_request(
     }
 
     try:
-        ai_resp = create_request_on_ai(ai_payload) 
-
-        if isinstance(ai_resp, dict) and isinstance(ai_resp.get("data"), dict):
-            base = ai_resp["data"]
-        elif isinstance(ai_resp, dict):
-            base = ai_resp
-        else:
-            base = {}
-
-        request_id = (
-            base.get("request_id")
-            or base.get("id")
-            or base.get("requestId")
+        delivery = await register_request(
+            _db, current_user.username, ai_payload, saved,
+            wait=(mode or settings.AI_WRITE_DEFAULT_MODE) == "sync",
         )
-        status = base.get("status", "pending")
-        message = base.get("message", "요청이 성공적으로 등록되었습니다.")
-
-        if not request_id:
-            raise ValueError(f"AI 응답 파싱 실패: request_id 없음. raw={ai_resp}")
-
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"AI 호출 실패: {e}")
 
-    
+    if not delivery.delivered:
+        # AI 일시 장애 또는 async: 입력은 outbox 에 남아 있고 디스패처가 전달
+        return ai_outbox.accepted(delivery.row)
+    base = request_data(delivery.row.result)
+    request_id = delivery.row.ai_id
+    status = base.get("status", "pending")
+    message = base.get("message", "요청이 성공적으로 등록되었습니다.")
     return RequestOut(
         request_id=str(request_id),
         image_url=image_url,
@@ -123,19 +110,21 @@ def create_request(
 
 
 @router.get("/all", response_model=RequestListOut)
-def get_pending_requests(
+async def get_pending_requests(
     material_type: str | None = Query(default=None),
     wanted_item: str | None = Query(default=None),
     status: str | None = Query(default=None),  
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
+    cursor: int | None = Query(default=None, description="이전 응답의 next_cursor (지정 시 offset 무시)"),
 ):
-    rows, total = list_pending_from_ai(
+    rows, total, next_cursor = await list_requests_page(
         material_type=material_type,
         wanted_item=wanted_item,
         status=status,
         limit=limit,
         offset=offset,
+        after_id=cursor,
     )
     return RequestListOut(
         requests=[
@@ -154,24 +143,27 @@ def get_pending_requests(
             for r in rows
         ],
         total=total,
+        next_cursor=next_cursor,
     )
 
 @router.get("/me", response_model=RequestListOut)
-def get_my_requests(
+async def get_my_requests(
     material_type: str | None = Query(default=None),
     wanted_item: str | None = Query(default=None),
     status: str | None = Query(default=None),
     limit: int | None = Query(default=None),
     offset: int | None = Query(default=None),
-    current_user=Depends(get_current_user),
+    cursor: int | None = Query(default=None, description="이전 응답의 next_cursor (지정 시 offset 무시)"),
+    current_user=Depends(get_current_principal),
 ):
-    rows, total = list_by_user_from_ai(
+    rows, total, next_cursor = await list_requests_page(
         username=current_user.username,
         material_type=material_type,
         wanted_item=wanted_item,
         status=status,
         limit=limit,
         offset=offset,
+        after_id=cursor,
     )
     return RequestListOut(
         requests=[
@@ -190,30 +182,33 @@ def get_my_requests(
             for r in rows
         ],
         total=total,
+        next_cursor=next_cursor,
     )
 
 @router.get("/{username}", response_model=RequestListWithAddressOut)
-def get_requests_by_username(
+async def get_requests_by_username(
     username: str,
     material_type: str | None = Query(default=None),
     wanted_item: str | None = Query(default=None),
     status: str | None = Query(default=None),  
     limit: int | None = Query(default=None),
     offset: int | None = Query(default=None),
+    cursor: int | None = Query(default=None, description="이전 응답의 next_cursor (지정 시 offset 무시)"),
     db: Session = Depends(get_db),
-    _current_user=Depends(get_current_user),
+    _current_user=Depends(get_current_principal),
 ):
-    user = get_user_by_username(db, username)
+    user = await run_in_threadpool(get_user_by_username, db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    rows, total = list_by_user_from_ai(
+    rows, total, next_cursor = await list_requests_page(
         username=username,
         material_type=material_type,
         wanted_item=wanted_item,
         status=status,
         limit=limit,
         offset=offset,
+        after_id=cursor,
     )
 
     return RequestListWithAddressOut(
@@ -236,16 +231,17 @@ def get_requests_by_username(
             for r in rows
         ],
         total=total,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/{request_id}", response_model=RequestDetailOut)
-def get_request_by_id(
+async def get_request_by_id(
     request_id: str,
     _db: Session = Depends(get_db),
-    _current_user=Depends(get_current_user),
+    _current_user=Depends(get_current_principal),
 ):
-    raw = get_by_id_from_ai(request_id=request_id, status=None)
+    raw = await get_by_id_from_ai(request_id=request_id, status=None)
     if not raw:
         raise HTTPException(status_code=404, detail="Request not found")
 
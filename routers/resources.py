@@ -1,8 +1,10 @@
 # routers/resources.py
+from typing import Literal
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from core.config import settings
 from core.utils import make_public_url
-from core.deps import get_db, get_current_user
+from core.deps import get_db, get_current_principal
 from services.resource_service import finalize_resource, list_by_username, list_all_resources
 from schemas.resource import (
     ResourceCreateIn,  
@@ -12,7 +14,8 @@ from schemas.resource import (
     ResourceRow,
 )
 from services.request_service import get_map_by_ids_from_ai 
-from services.ai_client import get_match_by_resource 
+from services.ai_client import get_match_by_resource_async
+from services import ai_outbox
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 
@@ -70,13 +73,16 @@ def _to_matched_request(row: dict) -> MatchedRequest:
 
 
 @router.post("", response_model=ResourceCreateOut, status_code=201)
-def create_resource(
+async def create_resource(
     payload: ResourceCreateIn,
+    mode: Literal["sync", "async"] | None = Query(
+        None, description="async 면 outbox 에 기록 후 바로 202 + outbox_id (AI 장애 시 sync 도 202)"
+    ),
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_principal),
 ):
     try:
-        resp = finalize_resource(
+        delivery = await finalize_resource(
             db=db,
             user=current_user,
             analysis_id=payload.analysis_id,
@@ -89,8 +95,8 @@ def create_resource(
             material_type=payload.material_type,
             matched_request_id=payload.matched_request_id,
             image_path=payload.image_path,
+            wait=(mode or settings.AI_WRITE_DEFAULT_MODE) == "sync",
         )
-        print("[AI 응답]", resp)
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -99,6 +105,12 @@ def create_resource(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    if not delivery.delivered:
+        # AI 일시 장애 또는 async: 입력은 outbox 에 남아 있고 디스패처가 전달
+        return ai_outbox.accepted(delivery.row)
+    resp = delivery.row.result
+    print("[AI 응답]", resp)
+
     if not isinstance(resp, dict):
         raise HTTPException(status_code=502, detail="AI 서버 응답 형식 오류")
 
@@ -115,7 +127,7 @@ def create_resource(
 
     matched_requests: list[MatchedRequest] = []
     try:
-        match_resp = get_match_by_resource(resource_id)
+        match_resp = await get_match_by_resource_async(resource_id)
         candidates = _extract_requests_from_match_resp(match_resp)
 
         if not candidates and isinstance(match_resp, dict) and isinstance(match_resp.get("request"), dict):
@@ -130,7 +142,7 @@ def create_resource(
                 prelim.append(b)
                 ids.append(str(rid))
 
-        idmap = get_map_by_ids_from_ai(ids, status=None) if ids else {}
+        idmap = await get_map_by_ids_from_ai(ids, status=None) if ids else {}
 
         enriched = []
         for b in prelim:
@@ -157,12 +169,14 @@ def create_resource(
     )
 
 @router.get("/myresource", response_model=ResourceListOut)
-def list_my_resources(
+async def list_my_resources(
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_principal),
 ):
     try:
-        rows, total = list_by_username(current_user.username)
+        rows, total = await list_by_username(current_user.username)
+    except HTTPException:
+        raise
     except Exception as e:
         print("예외 발생. 로그는:", e)
         raise HTTPException(status_code=400, detail=str(e))
@@ -188,21 +202,23 @@ def list_my_resources(
     )
 
 @router.get("/all", response_model=ResourceListOut)
-def list_all(
+async def list_all(
     material_type: str | None = Query(None, description="자원 종류 필터 (예: 플라스틱, 데님 등)"),
     status: str | None = Query(None, description="상태 필터 (registered, matched, in_progress 등)"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: int | None = Query(None, description="이전 응답의 next_cursor (지정 시 offset 무시)"),
 ):
     try:
-        rows, total = list_all_resources(
-            db=db,
+        rows, total, next_cursor = await list_all_resources(
             material_type=material_type,
             status=status,
             limit=limit,
             offset=offset,
+            after_id=cursor,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -224,5 +240,6 @@ def list_all(
             for r in rows
         ],
         total=total,
+        next_cursor=next_cursor,
     )
 
@@ -0,0 +1,21 @@
+# schemas/ai_event.py
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel, Field
+
+AIEventType = Literal["match.proposed", "match.accepted", "match.declined"]
+
+
+class AIEventIn(BaseModel):
+    event_id: str = Field(..., min_length=1, max_length=64, description="보낸 쪽이 정한 고유 id (재전송 시 동일)")
+    type: AIEventType
+    resource_id: Optional[str] = Field(None, max_length=64)
+    request_id: Optional[str] = Field(None, max_length=64)
+    match: Optional[Dict[str, Any]] = Field(None, description="/match/by_* 와 같은 모양의 매칭 스냅샷 (있으면 재조회 생략)")
+    occurred_at: Optional[datetime] = None
+
+
+class AIEventAck(BaseModel):
+    event_id: str
+    status: str             # processed | failed
+    duplicate: bool = False
@@ -1,5 +1,5 @@
 # schemas/analysis.py
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class AnalysisCreateOut(BaseModel):
@@ -7,3 +7,19 @@ class AnalysisCreateOut(BaseModel):
     extracted: Dict[str, Any] 
     image_url: Optional[str] = None
     status: str = "pending"
+    job_status: Optional[str] = None      # queued | running | done | failed
+    error: Optional[str] = None
+
+
+class AnalysisBatchItem(BaseModel):
+    index: int                            # 요청에서 몇 번째 이미지인지 (0부터)
+    filename: Optional[str] = None
+    ok: bool
+    result: Optional[AnalysisCreateOut] = None
+    error: Optional[str] = None
+
+
+class AnalysisBatchOut(BaseModel):
+    items: List[AnalysisBatchItem]
+    succeeded: int
+    failed: int
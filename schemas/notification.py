@@ -1,4 +1,5 @@
 # schemas/notification.py
+from datetime import datetime
 from typing import Optional, List, Literal, Dict, Any, Union
 from pydantic import BaseModel, Field
 
@@ -41,10 +42,33 @@ class MatchProposalItem(BaseModel):
     role: Literal["supplier", "requester"]  
     resource: Optional[ResourceBrief] = None
     request: Optional[RequestBrief] = None
+    # 알림함(notification_inbox)에서 읽은 경우에만 채워짐
+    notification_id: Optional[int] = None
+    is_read: Optional[bool] = None
+    created_at: Optional[datetime] = None
+
+class ProposalLookupFailure(BaseModel):
+    source: Literal["resource", "request", "history"]
+    id: Optional[str] = None
+    reason: str             # "timeout" 또는 오류 메시지
 
 class MatchProposalsOut(BaseModel):
     proposals: List[MatchProposalItem]
     total: int
+    failures: List[ProposalLookupFailure] = Field(default_factory=list)
+    next_before_id: Optional[int] = None    # 다음 페이지: ?before_id=
+    unread: Optional[int] = None
+
+class MarkReadIn(BaseModel):
+    ids: Optional[List[int]] = Field(None, description="읽음 처리할 notification_id 목록 (없으면 전부)")
+
+class UnreadCountOut(BaseModel):
+    unread: int
+
+
+class StreamTicketOut(BaseModel):
+    ticket: str = Field(..., description="GET /notifications/stream?ticket= 에 붙일 접속 전용 티켓")
+    expires_in: int = Field(..., description="유효 시간(초). 재접속 때마다 새로 발급")
 
 
 class ManualMatchIn(BaseModel):
@@ -0,0 +1,25 @@
+# schemas/outbox.py
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+
+class AIWriteAccepted(BaseModel):
+    # AI 서버 전달 전에 돌려주는 응답 (202). 결과는 GET /outbox/{outbox_id}
+    outbox_id: str
+    op: str
+    status: str             # pending | sending
+    message: str = "요청이 접수되었습니다. AI 서버에 전달되면 상태가 delivered 로 바뀝니다."
+
+
+class AIWriteStatus(BaseModel):
+    outbox_id: str
+    op: str
+    status: str             # pending | sending | delivered | dead
+    attempts: int
+    ai_id: Optional[str] = None     # 전달 후 AI 가 준 resource_id / request_id
+    result: Any = None              # AI 응답 그대로
+    error: Optional[str] = None
+    created_at: datetime
+    next_attempt_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
@@ -36,6 +36,7 @@ class RequestRow(BaseModel):
 class RequestListOut(BaseModel):
     requests: list[RequestRow]
     total: int
+    next_cursor: Optional[int] = None   # 다음 페이지 조회 시 cursor 로 전달 (keyset)
 
 class RequestListWithAddressOut(BaseModel):
     username: str
@@ -43,6 +44,7 @@ class RequestListWithAddressOut(BaseModel):
     phone: Optional[str] = None
     requests: List[RequestRow]
     total: int
+    next_cursor: Optional[int] = None
 
 class RequestDetailOut(BaseModel):
     request_id: str
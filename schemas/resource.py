@@ -57,4 +57,5 @@ class ResourceRow(BaseModel):
 
 class ResourceListOut(BaseModel):
     resources: List[ResourceRow]
-    total: int
\ No newline at end of file
+    total: int
+    next_cursor: Optional[int] = None   # 다음 페이지 조회 시 cursor 로 전달 (keyset)
\ No newline at end of file
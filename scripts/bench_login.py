@@ -0,0 +1,142 @@
+# scripts/bench_login.py
+# POST /auth/login 지연/처리량 측정: bcrypt 를 스레드풀에서 돌릴 때(AUTH_HASH_WORKERS=0, 풀 도입 전과 같은 경로)와
+# 전용 프로세스 풀(AUTH_HASH_WORKERS=N)에서 돌릴 때를 같은 조건으로 비교
+# - 앱은 httpx.ASGITransport 로 프로세스 안에서 호출 (네트워크/uvicorn 제외), DB 는 임시 sqlite
+# - 같은 시간에 이벤트 루프 지연(10ms sleep 이 실제로 얼마나 늦게 깨어나는지)도 잰다
+# 사용: python scripts/bench_login.py --workers 0,2 --requests 200 --concurrency 16 [--rounds 12]
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _pct(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+async def _loop_lag(stop: asyncio.Event, out: List[float]) -> None:
+    while not stop.is_set():
+        t = time.perf_counter()
+        await asyncio.sleep(0.01)
+        out.append(time.perf_counter() - t - 0.01)
+
+
+async def _bench(n: int, concurrency: int) -> Dict[str, Any]:
+    import httpx
+
+    import main
+    from core import security
+    from db.session import SessionLocal, engine
+    from models.user import User
+
+    User.__table__.create(engine, checkfirst=True)
+    with SessionLocal() as db:
+        db.add(User(username="bench", hashed_password=security.get_password_hash("pw-bench-1234"), name="bench"))
+        db.commit()
+
+    security.open_hash_pool()
+    transport = httpx.ASGITransport(app=main.app)
+    body = {"username": "bench", "password": "pw-bench-1234"}
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # 워커 프로세스 기동/첫 import 는 측정에서 제외
+            await asyncio.gather(*[client.post("/auth/login", json=body) for _ in range(max(1, concurrency // 2))])
+
+            sem = asyncio.Semaphore(concurrency)
+
+            async def one() -> None:
+                async with sem:
+                    t = time.perf_counter()
+                    r = await client.post("/auth/login", json=body)
+                    latencies.append(time.perf_counter() - t)
+                    statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+            lag: List[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_loop_lag(stop, lag))
+            started = time.perf_counter()
+            await asyncio.gather(*[one() for _ in range(n)])
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await probe
+    finally:
+        security.close_hash_pool()
+
+    ms = [x * 1000 for x in latencies]
+    lag_ms = [x * 1000 for x in lag] or [0.0]
+    return {
+        "workers": int(os.environ.get("AUTH_HASH_WORKERS", "0")),
+        "rounds": security.settings.AUTH_BCRYPT_ROUNDS,
+        "requests": n,
+        "concurrency": concurrency,
+        "status": statuses,
+        "throughput_rps": round(n / elapsed, 2),
+        "latency_ms": {
+            "p50": round(statistics.median(ms), 1),
+            "p95": round(_pct(ms, 95), 1),
+            "p99": round(_pct(ms, 99), 1),
+            "max": round(max(ms), 1),
+        },
+        "loop_lag_ms": {"p50": round(statistics.median(lag_ms), 2), "p99": round(_pct(lag_ms, 99), 2), "max": round(max(lag_ms), 2)},
+    }
+
+
+def _run_one(args: argparse.Namespace) -> None:
+    print(json.dumps(asyncio.run(_bench(args.requests, args.concurrency))))
+
+
+def _drive(args: argparse.Namespace) -> None:
+    # 설정은 import 시점에 읽히므로 workers 값마다 새 프로세스로
+    results = []
+    for workers in [int(w) for w in args.workers.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                "AUTH_HASH_WORKERS": str(workers),
+                "AUTH_HASH_MAX_QUEUE": str(max(args.requests, 32)),
+                "MIRROR_ENABLED": "false",
+                "PYTHONPATH": ROOT,
+            }
+            if args.rounds:
+                env["AUTH_BCRYPT_ROUNDS"] = str(args.rounds)
+            cmd = [sys.executable, os.path.abspath(__file__), "--run",
+                   "--requests", str(args.requests), "--concurrency", str(args.concurrency)]
+            out = subprocess.run(cmd, env=env, cwd=tmp, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"cpus={os.cpu_count()}")
+    print(f"{'workers':>7} {'rounds':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'lag p99':>8} {'lag max':>8}  status")
+    for r in results:
+        lat, lag = r["latency_ms"], r["loop_lag_ms"]
+        print(f"{r['workers']:>7} {r['rounds']:>6} {r['throughput_rps']:>8} {lat['p50']:>8} {lat['p95']:>8} "
+              f"{lat['p99']:>8} {lag['p99']:>8} {lag['max']:>8}  {r['status']}")
+
+
+def main_cli() -> None:
+    p = argparse.ArgumentParser(description="POST /auth/login 지연/처리량: 스레드풀 vs bcrypt 프로세스 풀")
+    p.add_argument("--workers", default="0,2", help="비교할 AUTH_HASH_WORKERS 값 (0 = 스레드풀, 풀 도입 전 경로)")
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--rounds", type=int, default=0, help="AUTH_BCRYPT_ROUNDS (0 이면 설정값)")
+    p.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.run:
+        _run_one(args)
+    else:
+        _drive(args)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,16 +1,172 @@
 # services/ai_client.py
-from typing import Any, Dict, Optional, List, Union 
+import logging
+import os
+import threading
+from typing import IO, Any, Dict, Optional, List, Union
 import httpx
+from core.cache import TTLCache, freeze
 from core.config import settings
+from core.resilience import Guard
+from core.singleflight import SingleFlight
+from core.uploads import AsyncMultipart, UploadTooLarge
 from fastapi import UploadFile
 
+logger = logging.getLogger(__name__)
+
+# 워커(프로세스)당 하나의 keep-alive 커넥션 풀을 공유한다. main.py lifespan에서 열고 닫음
+# 동기 함수는 _client, *_async 함수는 _aclient 를 사용
+_client: Optional[httpx.Client] = None
+_aclient: Optional[httpx.AsyncClient] = None
+_client_lock = threading.Lock()
+
+# 목록 조회 응답 캐시 (*_async 목록 함수만, 동기 함수는 미러 재조정용이라 항상 원본 조회)
+ai_cache = TTLCache(max_entries=settings.AI_CACHE_MAX_ENTRIES)
+
+# 같은 조회가 동시에 여러 번 나가지 않도록 진행 중인 요청을 공유 (동기/비동기 각각)
+ai_flight = SingleFlight()
+
+# 쓰기 후 비울 캐시 네임스페이스
+_NS_REQUESTS = "requests_all"
+_NS_RESOURCES = "resources_all"
+_NS_USER_RESOURCES = "list_resource"
+_NS_HISTORY = "match_history"
+_NS_MATCH_RESOURCE = "match_by_resource"
+_NS_MATCH_REQUEST = "match_by_request"
+# 매칭 확정/수동 매칭 뒤: 목록 캐시 전체 + 진행 중인 매칭 조회(by_resource/by_request)
+_NS_AFTER_MATCH = (_NS_REQUESTS, _NS_RESOURCES, _NS_USER_RESOURCES, _NS_HISTORY, _NS_MATCH_RESOURCE, _NS_MATCH_REQUEST)
+
+def _timeout(op: str) -> httpx.Timeout:
+    # op: analysis | list | match | write
+    read = {
+        "analysis": settings.AI_TIMEOUT_ANALYSIS,
+        "list": settings.AI_TIMEOUT_LIST,
+        "match": settings.AI_TIMEOUT_MATCH,
+        "write": settings.AI_TIMEOUT_WRITE,
+    }[op]
+    return httpx.Timeout(read, connect=settings.AI_CONNECT_TIMEOUT)
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+def open_client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(limits=_limits(), timeout=_timeout("list"))
+        return _client
+
+def close_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+def get_client() -> httpx.Client:
+    # lifespan 밖(스크립트, 테스트)에서 호출돼도 동작하도록 지연 생성
+    c = _client
+    if c is None or c.is_closed:
+        c = open_client()
+    return c
+
+def open_async_client() -> httpx.AsyncClient:
+    global _aclient
+    with _client_lock:
+        if _aclient is None or _aclient.is_closed:
+            _aclient = httpx.AsyncClient(limits=_limits(), timeout=_timeout("list"))
+        return _aclient
+
+async def close_async_client() -> None:
+    global _aclient
+    with _client_lock:
+        c, _aclient = _aclient, None
+    if c is not None:
+        await c.aclose()
+
+def get_async_client() -> httpx.AsyncClient:
+    c = _aclient
+    if c is None or c.is_closed:
+        c = open_async_client()
+    return c
+
+# 작업 종류별 서킷 브레이커 + bulkhead. 한 종류가 막혀도 다른 종류와 AI 무관 엔드포인트는 영향 없음
+_BULKHEAD_LIMITS = {
+    "analysis": settings.AI_BULKHEAD_ANALYSIS,
+    "list": settings.AI_BULKHEAD_LIST,
+    "match": settings.AI_BULKHEAD_MATCH,
+    "write": settings.AI_BULKHEAD_WRITE,
+}
+guards: Dict[str, Guard] = {
+    op: Guard(
+        op,
+        limit=limit,
+        max_wait=settings.AI_BULKHEAD_MAX_WAIT,
+        failure_threshold=settings.AI_BREAKER_FAILURES,
+        reset_timeout=settings.AI_BREAKER_RESET,
+    )
+    for op, limit in _BULKHEAD_LIMITS.items()
+}
+
+def _record(g: Guard, r: httpx.Response) -> None:
+    if _is_failure(r):
+        g.breaker.record_failure()
+    else:
+        g.breaker.record_success()
+
+def _is_failure(r: httpx.Response) -> bool:
+    # 4xx 는 요청 쪽 문제라 브레이커에 반영하지 않음
+    return r.status_code >= 500
+
+def _send(op: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    g = guards[op]
+    with g.bulkhead.slot():
+        g.breaker.before_call()
+        try:
+            r = get_client().request(method, url, timeout=_timeout(op), **kwargs)
+        except httpx.TransportError:
+            g.breaker.record_failure()
+            raise
+        except BaseException:
+            g.breaker.abandon()
+            raise
+    _record(g, r)
+    return r
+
+async def _asend(op: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    g = guards[op]
+    async with g.bulkhead.aslot():
+        g.breaker.before_call()
+        try:
+            r = await get_async_client().request(method, url, timeout=_timeout(op), **kwargs)
+        except httpx.TransportError:
+            g.breaker.record_failure()
+            raise
+        except BaseException:
+            # 취소 등: 성공/실패로 세지 않고 half-open 시험 슬롯만 반납
+            g.breaker.abandon()
+            raise
+    _record(g, r)
+    return r
+
+async def _asend_multipart(
+    op: str, url: str, *, data: Dict[str, Any], files: Dict[str, tuple[str, IO[bytes], str]], **kwargs: Any
+) -> httpx.Response:
+    # httpx 의 files= 는 AsyncClient 에서도 파일을 루프에서 동기로 읽으므로, 청크를 스레드풀에서 읽는 본문으로 보냄
+    body = AsyncMultipart(data, files)
+    headers = {**kwargs.pop("headers", {}), **body.headers}
+    return await _asend(op, "POST", url, headers=headers, content=body.stream(), **kwargs)
+
 def _ensure_dict(data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
     # AI 응답과 맞추기 위한 함수
     while isinstance(data, list):
-        if not data:         
+        if not data:
             return {}
-        data = data[0]      
-    return data              
+        data = data[0]
+    return data
 
 def _headers() -> Dict[str, str]:
     h = {"Accept": "application/json"}
@@ -18,52 +174,92 @@ def _headers() -> Dict[str, str]:
         h["Authorization"] = f"Bearer {settings.SERVER_ONLY_AI_API_KEY}"
     return h
 
+def _json_headers() -> Dict[str, str]:
+    return {**_headers(), "Content-Type": "application/json"}
+
 def _base() -> str:
     return settings.AI_API_BASE.rstrip("/")
 
 def _drop_none(d: Dict[str, Any]) -> Dict[str, Any]:
     return {k: v for k, v in d.items() if v is not None}
 
-def _as_file_part(upload: UploadFile) -> tuple[str, bytes, str]:
-    upload.file.seek(0)
-    buf = upload.file.read()
-    upload.file.seek(0)
-    if not buf or len(buf) == 0:
-        raise ValueError("업로드된 이미지가 비어 있습니다(0 bytes). 프론트의 multipart/form-data 및 필드명(image)을 확인하세요.")
+def _copy_rows(v: Any) -> Any:
+    # 캐시된 원본을 호출자가 수정하지 않도록 행(dict) 단위로 복사
+    if isinstance(v, list):
+        return [dict(x) if isinstance(x, dict) else x for x in v]
+    if isinstance(v, dict):
+        return {k: _copy_rows(x) if isinstance(x, list) else x for k, x in v.items()}
+    return v
+
+def _coalesce(namespace: str, params: Dict[str, Any], loader) -> Any:
+    return _copy_rows(ai_flight.do_sync(namespace, freeze(params), loader))
+
+async def _coalesce_async(namespace: str, params: Dict[str, Any], loader) -> Any:
+    return _copy_rows(await ai_flight.do(namespace, freeze(params), loader))
+
+async def _cached(namespace: str, params: Dict[str, Any], loader, ttl: float) -> Any:
+    if not settings.AI_CACHE_ENABLED:
+        return await _coalesce_async(namespace, params, loader)
+    key = freeze(params)
+
+    def load() -> Any:
+        # 캐시 세대를 singleflight 키에 넣어, 쓰기 전에 시작된 로드에 쓰기 뒤의 조회가 합류하지 않게
+        return ai_flight.do(namespace, (ai_cache.generation(namespace), key), loader)
+
+    value = await ai_cache.get_or_load(namespace, key, load, ttl=ttl, stale=settings.AI_CACHE_STALE)
+    return _copy_rows(value)
+
+def invalidate_after_write(*namespaces: str) -> None:
+    # 이 백엔드를 거친 쓰기 직후 호출. 인자가 없으면 목록 캐시 전체
+    # 진행 중인 조회도 잊어서, 이후 호출이 쓰기 전에 시작된 응답을 받지 않게 (캐시를 끈 경우 포함)
+    namespaces = namespaces or (_NS_REQUESTS, _NS_RESOURCES, _NS_USER_RESOURCES, _NS_HISTORY)
+    ai_cache.invalidate(*namespaces)
+    ai_flight.forget(*namespaces)
+
+def invalidate_after_match() -> None:
+    # 매칭 상태가 바뀐 뒤: 매칭 조회(get_match_by_*)도 쓰기 전에 시작된 응답에 합류하지 않게
+    invalidate_after_write(*_NS_AFTER_MATCH)
+
+_EMPTY_IMAGE_MSG = "업로드된 이미지가 비어 있습니다(0 bytes). 프론트의 multipart/form-data 및 필드명(image)을 확인하세요."
+
+def _file_part(upload: UploadFile) -> tuple[str, IO[bytes], str]:
+    # bytes 로 읽지 않고 업로드 임시파일을 그대로 넘김 (httpx 가 청크로 읽어 전송)
+    f = upload.file
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    if size == 0:
+        raise ValueError(_EMPTY_IMAGE_MSG)
+    if size > settings.UPLOAD_MAX_BYTES:
+        raise UploadTooLarge(settings.UPLOAD_MAX_BYTES)
     filename = upload.filename or "upload.png"
     content_type = getattr(upload, "content_type", None) or "application/octet-stream"
-    return (filename, buf, content_type)
+    return (filename, f, content_type)
 
-def analyze_image(image_file: UploadFile, username: str) -> Dict[str, Any]:
-    # bytes로 고정해서 전송
-    img_part = _as_file_part(image_file)
-    files = {"image": img_part}
-    data = {"username": username}
+def _as_file_part(upload: UploadFile) -> tuple[str, IO[bytes], str]:
+    return _file_part(upload)
 
-    with httpx.Client(timeout=30.0) as client:
-        r = client.post(
-            f"{_base()}/analysis/image",
-            headers=_headers(),
-            files=files,     
-            data=data,
-        )
-        r.raise_for_status()
-        return r.json()
+async def _as_file_part_async(upload: UploadFile) -> tuple[str, IO[bytes], str]:
+    return _file_part(upload)
 
-def register_resource(
-    *,
-    analysis_id: Optional[str] = None,   
-    title: Optional[str] = None,
-    description: Optional[str] = None,
-     amount: Optional[float | int | str] = None, 
-    value: Optional[int] = None,
-    username: Optional[str] = None,
-    item_name: Optional[str] = None,
-    item_type: Optional[str], 
-    material_type: Optional[str] = None,
-    matched_request_id: Optional[str] = None,
-    image_path: Optional[str] = None, 
 
+# ---------------------------------------------------------------------------
+# 요청 생성 / 응답 해석 (동기·비동기 공용)
+# ---------------------------------------------------------------------------
+
+def _resource_payload(
+    *,
+    analysis_id: Optional[str],
+    title: Optional[str],
+    description: Optional[str],
+    amount: Optional[float | int | str],
+    value: Optional[int],
+    username: Optional[str],
+    item_name: Optional[str],
+    item_type: Optional[str],
+    material_type: Optional[str],
+    matched_request_id: Optional[str],
+    image_path: Optional[str],
 ) -> Dict[str, Any]:
     amount_str: Optional[str] = None
     if amount is not None:
@@ -73,29 +269,171 @@ def register_resource(
         "analysis_id": analysis_id,
         "title": title,
         "description": description,
-        "amount": amount_str,  
+        "amount": amount_str,
         "value": value,
         "username": username,
         "material_type": material_type,
         "item_name": item_name,
-        "item_type": item_type, 
+        "item_type": item_type,
         "matched_request_id": matched_request_id,
         "image_path": image_path,
     })
-    if analysis_id:                
+    if analysis_id:
         payload["analysis_id"] = analysis_id
 
-    payload = {k: v for k, v in payload.items() if v is not None}
+    return {k: v for k, v in payload.items() if v is not None}
 
-    with httpx.Client(timeout=30.0) as client:
-        r = client.post(
-            f"{_base()}/resources",      
-            headers={**_headers(), "Content-Type": "application/json"},
-            json=payload,
-        )
-        print("[DEBUG AI RESPONSE]", r.status_code, r.text)  
-        r.raise_for_status()
-        return _ensure_dict(r.json())
+def _list_resource_params(
+    username: Optional[str], material_type: Optional[str], status: Optional[str], limit: int, offset: int
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"limit": limit, "offset": offset}
+    if username: params["username"] = username
+    if material_type: params["material_type"] = material_type
+    if status: params["status"] = status
+    return params
+
+def _parse_list_resource(r: httpx.Response) -> Dict[str, Any]:
+    r.raise_for_status()
+    try:
+        data = r.json()
+    except Exception as e:
+        raise ValueError(f"AI 서버 응답 파싱 실패: {e}")
+
+    if isinstance(data, list):
+        return {"resources": data, "total": len(data)}
+    if isinstance(data, dict):
+        if "resources" not in data and "items" in data:
+            return {"resources": data.get("items") or [], "total": data.get("count") or 0}
+        if "resources" in data and "total" not in data:
+            data["total"] = len(data.get("resources") or [])
+        return data
+
+    raise ValueError(f"AI 서버 응답 형식 오류: {type(data)}")
+
+def _request_form(payload: Dict[str, Any]) -> Dict[str, str]:
+    data = {
+        "item_name": str(payload.get("item_name", "")),
+        "title": str(payload.get("item_name", "")),
+        "amount": str(payload.get("amount", "")),
+        "description": str(payload.get("description", "")),
+        "username": str(payload.get("username", "")),
+        "item_type":str(payload.get("item_type", "")),
+        "image_path":str(payload.get("image_path", "")),
+    }
+    mt = payload.get("material_type")
+    if mt is not None:
+        data["material_type"] = str(mt)
+    it = payload.get("item_type")
+    if it is not None:
+        data["item_type"] = str(it)
+    return data
+
+def _parse_requests(r: httpx.Response) -> List[Dict[str, Any]]:
+    r.raise_for_status()
+    data = r.json()
+    if isinstance(data, dict) and "requests" in data:
+        return data["requests"]
+    if isinstance(data, list):
+        return data
+    raise ValueError(f"AI 서버 응답 형식 오류: {type(data)}")
+
+def _history_params(
+    username: Optional[str],
+    resource_id: Optional[str],
+    request_id: Optional[str],
+    status: Optional[str],
+    limit: int,
+    offset: int,
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"limit": limit, "offset": offset}
+    if username:    params["username"]    = username
+    if resource_id: params["resource_id"] = resource_id
+    if request_id:  params["request_id"]  = request_id
+    if status:      params["status"]      = status  # accepted | declined
+    return params
+
+def _parse_history(r: httpx.Response) -> List[Dict[str, Any]]:
+    r.raise_for_status()
+    data = r.json()
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if "items" in data and isinstance(data["items"], list):
+            return data["items"]
+        if "matches" in data and isinstance(data["matches"], list):
+            return data["matches"]
+    raise ValueError(f"AI 히스토리 응답 형식 오류: {type(data)}")
+
+def _all_resources_params(material_type: Optional[str], status: Optional[str]) -> Dict[str, Any]:
+    # AI 서버가 필터를 지원하면 그쪽에서 줄이고, 아니어도 호출부에서 한 번 더 거른다
+    return _drop_none({"material_type": material_type, "status": status})
+
+def _parse_resources(r: httpx.Response) -> List[Dict[str, Any]]:
+    r.raise_for_status()
+    data = r.json()
+    if isinstance(data, dict) and "resources" in data:
+        return data["resources"]
+    if isinstance(data, list):
+        return data
+    raise ValueError(f"AI 서버 응답 형식 오류: {type(data)}")
+
+def _manual_payload(resource_id: str, amount: str | int | float, username: str) -> Dict[str, str]:
+    return {
+        "resource_id": str(resource_id),
+        "amount": str(amount),
+        "username": str(username),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 동기 API
+# ---------------------------------------------------------------------------
+
+def analyze_image(image_file: UploadFile, username: str) -> Dict[str, Any]:
+    img_part = _as_file_part(image_file)
+    files = {"image": img_part}
+    data = {"username": username}
+
+    r = _send(
+        "analysis", "POST",
+        f"{_base()}/analysis/image",
+        headers=_headers(),
+        files=files,
+        data=data,
+    )
+    r.raise_for_status()
+    return r.json()
+
+def register_resource(
+    *,
+    analysis_id: Optional[str] = None,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    amount: Optional[float | int | str] = None,
+    value: Optional[int] = None,
+    username: Optional[str] = None,
+    item_name: Optional[str] = None,
+    item_type: Optional[str],
+    material_type: Optional[str] = None,
+    matched_request_id: Optional[str] = None,
+    image_path: Optional[str] = None,
+
+) -> Dict[str, Any]:
+    payload = _resource_payload(
+        analysis_id=analysis_id, title=title, description=description, amount=amount, value=value,
+        username=username, item_name=item_name, item_type=item_type, material_type=material_type,
+        matched_request_id=matched_request_id, image_path=image_path,
+    )
+    r = _send(
+        "write", "POST",
+        f"{_base()}/resources",
+        headers=_json_headers(),
+        json=payload,
+    )
+    print("[DEBUG AI RESPONSE]", r.status_code, r.text)
+    r.raise_for_status()
+    invalidate_after_write(_NS_RESOURCES, _NS_USER_RESOURCES)
+    return _ensure_dict(r.json())
 
 def list_resource(
     *,
@@ -105,106 +443,69 @@ def list_resource(
     limit: int = 20,
     offset: int = 0,
 ) -> Dict[str, Any]:
-    params: Dict[str, Any] = {"limit": limit, "offset": offset}
-    if username: params["username"] = username  
-    if material_type: params["material_type"] = material_type
-    if status: params["status"] = status
+    params = _list_resource_params(username, material_type, status, limit, offset)
 
-    with httpx.Client(timeout=20.0, follow_redirects=True) as client:
+    def load() -> Dict[str, Any]:
         url = f"{_base()}/resources/user/{username}/"
-        r = client.get(url, headers=_headers(), params=params)
+        r = _send("list", "GET", url, headers=_headers(), params=params, follow_redirects=True)
         print("GET", url, params, "=>", r.status_code)
         if r.status_code == 404:
             url2 = f"{_base()}/resources/user/{username}"
-            r = client.get(url2, headers=_headers(), params=params)
+            r = _send("list", "GET", url2, headers=_headers(), params=params, follow_redirects=True)
             print("FALLBACK GET", url2, params, "=>", r.status_code)
 
         if r.status_code in (307, 308):
             loc = r.headers.get("Location")
             if loc:
                 print("REDIRECT to", loc)
-                r = client.get(loc, headers=_headers())
-
-        r.raise_for_status()
-        try:
-            data = r.json()
-        except Exception as e:
-            raise ValueError(f"AI 서버 응답 파싱 실패: {e}")
+                r = _send("list", "GET", loc, headers=_headers())
 
-        if isinstance(data, list):
-            return {"resources": data, "total": len(data)}
-        if isinstance(data, dict):
-            if "resources" not in data and "items" in data:
-                return {"resources": data.get("items") or [], "total": data.get("count") or 0}
-            if "resources" in data and "total" not in data:
-                data["total"] = len(data.get("resources") or [])
-            return data
+        return _parse_list_resource(r)
 
-        raise ValueError(f"AI 서버 응답 형식 오류: {type(data)}")
+    return _coalesce(_NS_USER_RESOURCES, params, load)
 
 def create_request_on_ai(payload: Dict[str, Any], image: Optional[UploadFile] = None) -> Dict[str, Any]:
     url = f"{_base()}/requests/"
-    with httpx.Client(timeout=20.0) as client:
-        files = None
-
-        if image:
-            img_part = _as_file_part(image)
-            files = {"image": img_part}
-
-        data = {
-            "item_name": str(payload.get("item_name", "")),
-            "title": str(payload.get("item_name", "")),
-            "amount": str(payload.get("amount", "")),
-            "description": str(payload.get("description", "")),
-            "username": str(payload.get("username", "")),
-            "item_type":str(payload.get("item_type", "")),
-            "image_path":str(payload.get("image_path", "")),
-        }
-        mt = payload.get("material_type")
-        if mt is not None:
-            data["material_type"] = str(mt)
-        it = payload.get("item_type")
-        if it is not None:
-            data["item_type"] = str(it)
-
-        r = client.post(url, headers=_headers(), data=data, files=files)
-        print("🔥 AI 요청 응답 내용:", r.text)
-        r.raise_for_status()
-        return r.json()
+    files = {"image": _as_file_part(image)} if image else None
+    r = _send("write", "POST", url, headers=_headers(), data=_request_form(payload), files=files)
+    print("🔥 AI 요청 응답 내용:", r.text)
+    r.raise_for_status()
+    invalidate_after_write(_NS_REQUESTS)
+    return r.json()
 
 # 모든 요청 목록 조회 (pending 등 상태별)
 def get_all_requests(status: Optional[str] = None) -> List[Dict[str, Any]]:
     url = f"{_base()}/requests/all"
-    params = {}
-    if status:
-        params["status"] = status
+    params = {"status": status} if status else {}
+    return _coalesce(
+        _NS_REQUESTS, params,
+        lambda: _parse_requests(_send("list", "GET", url, headers=_headers(), params=params)),
+    )
 
-    with httpx.Client(timeout=15.0) as client:
-        r = client.get(url, headers=_headers(), params=params)
-        r.raise_for_status()
-        data = r.json()
-        if isinstance(data, dict) and "requests" in data:
-            return data["requests"]
-        if isinstance(data, list):
-            return data
-        raise ValueError(f"AI 서버 응답 형식 오류: {type(data)}")
-    
 # 자원 기준 매칭 조회
 def get_match_by_resource(resource_id: str) -> Dict[str, Any]:
     url = f"{_base()}/match/by_resource"
-    with httpx.Client(timeout=15.0) as client:
-        r = client.get(url, headers=_headers(), params={"resource_id": resource_id})
+    params = {"resource_id": resource_id}
+
+    def load() -> Dict[str, Any]:
+        r = _send("match", "GET", url, headers=_headers(), params=params)
         r.raise_for_status()
         return _ensure_dict(r.json())
 
+    return _coalesce(_NS_MATCH_RESOURCE, params, load)
+
 # 요청 기준 매칭 조회
 def get_match_by_request(request_id: str) -> Dict[str, Any]:
     url = f"{_base()}/match/by_request"
-    with httpx.Client(timeout=15.0) as client:
-        r = client.get(url, headers=_headers(), params={"request_id": request_id})
+    params = {"request_id": request_id}
+
+    def load() -> Dict[str, Any]:
+        r = _send("match", "GET", url, headers=_headers(), params=params)
         r.raise_for_status()
         return _ensure_dict(r.json())
 
+    return _coalesce(_NS_MATCH_REQUEST, params, load)
+
 # '수락' 또는 '거절'된 매칭 조회
 def get_match_history(
     *,
@@ -219,59 +520,213 @@ def get_match_history(
     과거 수락/거절된 매칭 기록 조회
     """
     url = f"{_base()}/match/history"
-    params: Dict[str, Any] = {"limit": limit, "offset": offset}
-    if username:    params["username"]    = username
-    if resource_id: params["resource_id"] = resource_id
-    if request_id:  params["request_id"]  = request_id
-    if status:      params["status"]      = status  # accepted | declined
-
-    with httpx.Client(timeout=20.0) as client:
-        r = client.get(url, headers=_headers(), params=params)
-        r.raise_for_status()
-        data = r.json()
-        if isinstance(data, list):
-            return data
-        if isinstance(data, dict):
-            if "items" in data and isinstance(data["items"], list):
-                return data["items"]
-            if "matches" in data and isinstance(data["matches"], list):
-                return data["matches"]
-        raise ValueError(f"AI 히스토리 응답 형식 오류: {type(data)}")
+    params = _history_params(username, resource_id, request_id, status, limit, offset)
+    return _coalesce(
+        _NS_HISTORY, params,
+        lambda: _parse_history(_send("list", "GET", url, headers=_headers(), params=params)),
+    )
 
 # 모든 자원 조회
-def get_all_resources() -> List[Dict[str, Any]]:
+def get_all_resources(
+    *, material_type: Optional[str] = None, status: Optional[str] = None
+) -> List[Dict[str, Any]]:
     url = f"{_base()}/resources/all"
-    with httpx.Client(timeout=20.0) as client:
-        r = client.get(url, headers=_headers())
-        r.raise_for_status()
-        data = r.json()
-        if isinstance(data, dict) and "resources" in data:
-            return data["resources"]
-        if isinstance(data, list):
-            return data
-        raise ValueError(f"AI 서버 응답 형식 오류: {type(data)}")
+    params = _all_resources_params(material_type, status)
+    return _coalesce(
+        _NS_RESOURCES, params,
+        lambda: _parse_resources(_send("list", "GET", url, headers=_headers(), params=params)),
+    )
 
 # 제안된 매칭 수락/거절
 def confirm_match(resource_id: str, request_id: str, action: str) -> Dict[str, Any]:
     url = f"{_base()}/match/confirm"
     body = {"resource_id": resource_id, "request_id": request_id, "action": action}
-    with httpx.Client(timeout=15.0) as client:
-        r = client.post(url, headers={**_headers(), "Content-Type": "application/json"}, json=body)
-        r.raise_for_status()
-        return r.json()
-    
+    r = _send("write", "POST", url, headers=_json_headers(), json=body)
+    r.raise_for_status()
+    invalidate_after_match()
+    return r.json()
+
 
 # 수동으로 매칭 요청
 def manual_match(resource_id: str, amount: str | int | float, username: str) -> Dict[str, Any]:
     url = f"{_base()}/match/manual"
-    payload = {
-        "resource_id": str(resource_id),
-        "amount": str(amount),      
-        "username": str(username),
-    }
-    with httpx.Client(timeout=20.0, follow_redirects=True) as client:
-        r = client.post(url, headers={**_headers(), "Content-Type": "application/json"}, json=payload)
-        print("🔥 AI 수동매칭 응답:", r.status_code, r.text)
+    payload = _manual_payload(resource_id, amount, username)
+    r = _send(
+        "write", "POST",
+        url, headers=_json_headers(), json=payload, follow_redirects=True
+    )
+    print("🔥 AI 수동매칭 응답:", r.status_code, r.text)
+    r.raise_for_status()
+    invalidate_after_match()
+    return _ensure_dict(r.json())
+
+
+# ---------------------------------------------------------------------------
+# 비동기 API (async 라우터용, 이벤트 루프를 막지 않음)
+# ---------------------------------------------------------------------------
+
+async def analyze_image_async(image_file: UploadFile, username: str) -> Dict[str, Any]:
+    files = {"image": await _as_file_part_async(image_file)}
+    r = await _asend_multipart(
+        "analysis",
+        f"{_base()}/analysis/image",
+        headers=_headers(),
+        files=files,
+        data={"username": username},
+    )
+    r.raise_for_status()
+    return r.json()
+
+async def register_resource_async(
+    *,
+    analysis_id: Optional[str] = None,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    amount: Optional[float | int | str] = None,
+    value: Optional[int] = None,
+    username: Optional[str] = None,
+    item_name: Optional[str] = None,
+    item_type: Optional[str],
+    material_type: Optional[str] = None,
+    matched_request_id: Optional[str] = None,
+    image_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    payload = _resource_payload(
+        analysis_id=analysis_id, title=title, description=description, amount=amount, value=value,
+        username=username, item_name=item_name, item_type=item_type, material_type=material_type,
+        matched_request_id=matched_request_id, image_path=image_path,
+    )
+    r = await _asend(
+        "write", "POST",
+        f"{_base()}/resources",
+        headers=_json_headers(),
+        json=payload,
+    )
+    logger.debug("AI resource 응답: %s %s", r.status_code, r.text)
+    r.raise_for_status()
+    invalidate_after_write(_NS_RESOURCES, _NS_USER_RESOURCES)
+    return _ensure_dict(r.json())
+
+async def list_resource_async(
+    *,
+    username: Optional[str] = None,
+    material_type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    params = _list_resource_params(username, material_type, status, limit, offset)
+
+    async def load() -> Dict[str, Any]:
+        url = f"{_base()}/resources/user/{username}/"
+        r = await _asend("list", "GET", url, headers=_headers(), params=params, follow_redirects=True)
+        logger.debug("GET %s %s => %s", url, params, r.status_code)
+        if r.status_code == 404:
+            url2 = f"{_base()}/resources/user/{username}"
+            r = await _asend("list", "GET", url2, headers=_headers(), params=params, follow_redirects=True)
+            logger.debug("FALLBACK GET %s %s => %s", url2, params, r.status_code)
+
+        if r.status_code in (307, 308):
+            loc = r.headers.get("Location")
+            if loc:
+                logger.debug("REDIRECT to %s", loc)
+                r = await _asend("list", "GET", loc, headers=_headers())
+
+        return _parse_list_resource(r)
+
+    return await _cached(_NS_USER_RESOURCES, params, load, settings.AI_CACHE_TTL_LIST)
+
+async def create_request_on_ai_async(payload: Dict[str, Any], image: Optional[UploadFile] = None) -> Dict[str, Any]:
+    url = f"{_base()}/requests/"
+    data = _request_form(payload)
+    if image:
+        files = {"image": await _as_file_part_async(image)}
+        r = await _asend_multipart("write", url, headers=_headers(), data=data, files=files)
+    else:
+        r = await _asend("write", "POST", url, headers=_headers(), data=data)
+    logger.debug("AI 요청 응답 내용: %s", r.text)
+    r.raise_for_status()
+    invalidate_after_write(_NS_REQUESTS)
+    return r.json()
+
+async def get_all_requests_async(status: Optional[str] = None) -> List[Dict[str, Any]]:
+    url = f"{_base()}/requests/all"
+    params = {"status": status} if status else {}
+
+    async def load() -> List[Dict[str, Any]]:
+        r = await _asend("list", "GET", url, headers=_headers(), params=params)
+        return _parse_requests(r)
+
+    return await _cached(_NS_REQUESTS, params, load, settings.AI_CACHE_TTL_LIST)
+
+async def get_match_by_resource_async(resource_id: str) -> Dict[str, Any]:
+    url = f"{_base()}/match/by_resource"
+    params = {"resource_id": resource_id}
+
+    async def load() -> Dict[str, Any]:
+        r = await _asend("match", "GET", url, headers=_headers(), params=params)
         r.raise_for_status()
         return _ensure_dict(r.json())
 
+    return await _coalesce_async(_NS_MATCH_RESOURCE, params, load)
+
+async def get_match_by_request_async(request_id: str) -> Dict[str, Any]:
+    url = f"{_base()}/match/by_request"
+    params = {"request_id": request_id}
+
+    async def load() -> Dict[str, Any]:
+        r = await _asend("match", "GET", url, headers=_headers(), params=params)
+        r.raise_for_status()
+        return _ensure_dict(r.json())
+
+    return await _coalesce_async(_NS_MATCH_REQUEST, params, load)
+
+async def get_match_history_async(
+    *,
+    username: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
+    url = f"{_base()}/match/history"
+    params = _history_params(username, resource_id, request_id, status, limit, offset)
+
+    async def load() -> List[Dict[str, Any]]:
+        r = await _asend("list", "GET", url, headers=_headers(), params=params)
+        return _parse_history(r)
+
+    return await _cached(_NS_HISTORY, params, load, settings.AI_CACHE_TTL_HISTORY)
+
+async def get_all_resources_async(
+    *, material_type: Optional[str] = None, status: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    url = f"{_base()}/resources/all"
+    params = _all_resources_params(material_type, status)
+
+    async def load() -> List[Dict[str, Any]]:
+        r = await _asend("list", "GET", url, headers=_headers(), params=params)
+        return _parse_resources(r)
+
+    return await _cached(_NS_RESOURCES, params, load, settings.AI_CACHE_TTL_LIST)
+
+async def confirm_match_async(resource_id: str, request_id: str, action: str) -> Dict[str, Any]:
+    url = f"{_base()}/match/confirm"
+    body = {"resource_id": resource_id, "request_id": request_id, "action": action}
+    r = await _asend("write", "POST", url, headers=_json_headers(), json=body)
+    r.raise_for_status()
+    invalidate_after_match()
+    return r.json()
+
+async def manual_match_async(resource_id: str, amount: str | int | float, username: str) -> Dict[str, Any]:
+    url = f"{_base()}/match/manual"
+    payload = _manual_payload(resource_id, amount, username)
+    r = await _asend(
+        "write", "POST",
+        url, headers=_json_headers(), json=payload, follow_redirects=True
+    )
+    logger.debug("AI 수동매칭 응답: %s %s", r.status_code, r.text)
+    r.raise_for_status()
+    invalidate_after_match()
+    return _ensure_dict(r.json())
@@ -0,0 +1,264 @@
+# services/ai_events.py
+# AI 서버가 보내는 매칭 상태 변경 이벤트(match.proposed/accepted/declined) 처리
+# - ai_events 에 event_id 로 한 번만 기록. 같은 event_id 가 다시 오면 처리하지 않고 duplicate
+#   (실패했던 이벤트, 처리하던 프로세스가 죽어 RECEIVED_LEASE 넘게 received 로 남은 이벤트는 재전송 시 다시 처리.
+#    아직 처리 중인 이벤트의 재전송은 received 로 돌려줘 409 → 보낸 쪽이 나중에 다시 보냄)
+# - 처리: AI 목록 캐시 무효화 → 미러 갱신 → (accepted) 포인트 지급 → 당사자 알림함 기록 → 알림 fan-out
+# - 포인트는 원장 idempotency_key(match:<rid>:<uid>)로, 미러는 upsert 라 같은 이벤트를 다시 처리(replay)해도 안전
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from db.session import SessionLocal
+from models.ai_event import EVENT_FAILED, EVENT_PROCESSED, EVENT_RECEIVED, AIEvent
+from models.request import Request
+from models.resource import Resource
+from schemas.ai_event import AIEventIn
+from services import ai_client, mirror_service, notification_inbox
+from services.resource_service import award_points_if_matched
+
+# 알림 리스너: (username, message) 를 받는 코루틴 함수
+Listener = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# 이벤트 종류 → 알림 state (GET /notifications 와 같은 표기: accepted → matched)
+STATES = {"match.proposed": "proposed", "match.accepted": "matched", "match.declined": "declined"}
+
+# received 상태로 이 시간이 지나면 처리하던 프로세스가 죽은 것으로 보고 다시 가져감 (received_at = 처리 시작 시각)
+RECEIVED_LEASE = timedelta(seconds=120)
+
+_listeners: List[Listener] = []
+_counters = {"received": 0, "processed": 0, "duplicate": 0, "failed": 0, "replayed": 0, "notified": 0}
+
+
+def subscribe(listener: Listener) -> None:
+    _listeners.append(listener)
+
+
+def unsubscribe(listener: Listener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+# ---------------------------------------------------------------------------
+# 이벤트 로그
+# ---------------------------------------------------------------------------
+
+def _claim(event: AIEventIn) -> Tuple[Optional[int], Optional[str]]:
+    """
+    (row_id, None): 이 요청이 처리. 새 이벤트면 기록, 실패했거나 lease 가 지난 received 면 다시 가져감
+    (None, status): 가져가지 못함. processed = 이미 처리됨, received = 다른 요청이 처리 중
+    """
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        row = AIEvent(
+            event_id=event.event_id,
+            event_type=event.type,
+            resource_id=event.resource_id,
+            request_id=event.request_id,
+            payload=event.model_dump(mode="json"),
+            status=EVENT_RECEIVED,
+            attempts=1,
+            received_at=now,
+        )
+        db.add(row)
+        try:
+            db.commit()
+            return row.id, False
+        except IntegrityError:
+            db.rollback()
+
+        res = db.execute(
+            update(AIEvent)
+            .where(
+                AIEvent.event_id == event.event_id,
+                or_(
+                    AIEvent.status == EVENT_FAILED,
+                    and_(AIEvent.status == EVENT_RECEIVED, AIEvent.received_at < now - RECEIVED_LEASE),
+                ),
+            )
+            .values(status=EVENT_RECEIVED, attempts=AIEvent.attempts + 1, error=None, received_at=now)
+        )
+        db.commit()
+        row = db.execute(select(AIEvent.id, AIEvent.status).where(AIEvent.event_id == event.event_id)).one()
+        if res.rowcount != 1:
+            return None, row.status
+        return row.id, None
+
+
+def _mark(row_id: int, **values: Any) -> None:
+    with SessionLocal() as db:
+        db.execute(update(AIEvent).where(AIEvent.id == row_id).values(**values))
+        db.commit()
+
+
+def _parties(event: AIEventIn) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # 매칭 스냅샷의 자원/요청. 공급자/요청자를 알 수 없으면 미러 테이블에서 보충
+    m = event.match or {}
+    res = dict(m.get("resource") or {})
+    req = dict(m.get("request") or {})
+    if not (res.get("username") and req.get("username")):
+        with SessionLocal() as db:
+            if not res.get("username") and event.resource_id:
+                row = db.execute(
+                    select(Resource.username, Resource.payload).where(Resource.ai_resource_id == event.resource_id)
+                ).first()
+                if row is not None:
+                    res = {**(row.payload or {}), **res, "username": row.username}
+            if not req.get("username") and event.request_id:
+                row = db.execute(
+                    select(Request.username, Request.payload).where(Request.ai_request_id == event.request_id)
+                ).first()
+                if row is not None:
+                    req = {**(row.payload or {}), **req, "username": row.username}
+    res.setdefault("resource_id", event.resource_id)
+    req.setdefault("request_id", event.request_id)
+    return res, req
+
+
+def _recipients(res: Dict[str, Any], req: Dict[str, Any]) -> List[Tuple[str, str]]:
+    # (username, role). 같은 사람이 양쪽이면 공급자로 한 번
+    out: List[Tuple[str, str]] = []
+    for name, role in ((res.get("username"), "supplier"), (req.get("username"), "requester")):
+        name = (name or "").strip()
+        if name and all(name != n for n, _ in out):
+            out.append((name, role))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 처리
+# ---------------------------------------------------------------------------
+
+async def _award(event: AIEventIn) -> Optional[Dict[str, Any]]:
+    if event.type != "match.accepted" or not event.resource_id:
+        return None
+    db = SessionLocal()
+    try:
+        res = await award_points_if_matched(
+            db,
+            resource_id=event.resource_id,
+            request_id=event.request_id,
+            allow_on_accept=True,
+            match=event.match,
+        )
+    finally:
+        db.close()
+    return {"awarded": bool(res), "detail": res}
+
+
+async def _publish(usernames: List[str], message: Dict[str, Any]) -> None:
+    for username in usernames:
+        for listener in list(_listeners):
+            try:
+                await listener(username, message)
+                _counters["notified"] += 1
+            except Exception as e:
+                # 알림 전달 실패는 이벤트 처리를 실패시키지 않음
+                print(f"[경고] 알림 전달 실패 {username}: {e}")
+
+
+def message(row_id: int, event: AIEventIn) -> Dict[str, Any]:
+    # 리스너/알림 스트림으로 보내는 내용. id 는 ai_events.id (스트림 재개 기준)
+    return {
+        "id": row_id,
+        "event_id": event.event_id,
+        "type": event.type,
+        "state": STATES[event.type],
+        "resource_id": event.resource_id,
+        "request_id": event.request_id,
+        "match": event.match,
+    }
+
+
+async def _process(row_id: int, event: AIEventIn) -> Dict[str, Any]:
+    ai_client.invalidate_after_match()
+    if event.match:
+        await mirror_service.record_match(event.match)
+    else:
+        mirror_service.refresh_match_later(resource_id=event.resource_id, request_id=event.request_id)
+
+    award = await _award(event)
+    res, req = await run_in_threadpool(_parties, event)
+    recipients = _recipients(res, req)
+    await run_in_threadpool(notification_inbox.record_event, STATES[event.type], res, req, recipients)
+    usernames = [name for name, _ in recipients]
+    await _publish(usernames, message(row_id, event))
+    return {"award": award, "notified": usernames}
+
+
+async def _run(row_id: int, event: AIEventIn) -> str:
+    try:
+        result = await _process(row_id, event)
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+        await run_in_threadpool(_mark, row_id, status=EVENT_FAILED, error=str(detail).splitlines()[0][:255])
+        _counters["failed"] += 1
+        print(f"[경고] AI 이벤트 처리 실패 {event.event_id}: {detail}")
+        return EVENT_FAILED
+    await run_in_threadpool(
+        _mark, row_id, status=EVENT_PROCESSED, result=result, processed_at=datetime.utcnow()
+    )
+    _counters["processed"] += 1
+    return EVENT_PROCESSED
+
+
+async def receive(event: AIEventIn) -> Tuple[str, bool]:
+    """
+    이벤트 기록 후 처리. (status, duplicate)
+    이미 처리한 event_id 면 (processed, True), 다른 요청이 아직 처리 중이면 (received, True)
+    """
+    _counters["received"] += 1
+    row_id, current = await run_in_threadpool(_claim, event)
+    if row_id is None:
+        _counters["duplicate"] += 1
+        return current, True
+    return await _run(row_id, event), False
+
+
+async def replay(event_id: str) -> Optional[str]:
+    """기록된 이벤트를 상태와 관계없이 다시 처리 (admin). 없는 event_id 면 None"""
+    def _load():
+        with SessionLocal() as db:
+            row = db.scalar(select(AIEvent).where(AIEvent.event_id == event_id))
+            if row is None:
+                return None
+            row.attempts += 1
+            row.status = EVENT_RECEIVED
+            row.received_at = datetime.utcnow()
+            db.commit()
+            return row.id, row.payload
+
+    loaded = await run_in_threadpool(_load)
+    if loaded is None:
+        return None
+    _counters["replayed"] += 1
+    row_id, payload = loaded
+    return await _run(row_id, AIEventIn.model_validate(payload))
+
+
+def list_events(status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    with SessionLocal() as db:
+        stmt = select(AIEvent).order_by(AIEvent.id.desc()).limit(limit)
+        if status:
+            stmt = stmt.where(AIEvent.status == status)
+        return [
+            {
+                "event_id": r.event_id,
+                "type": r.event_type,
+                "resource_id": r.resource_id,
+                "request_id": r.request_id,
+                "status": r.status,
+                "attempts": r.attempts,
+                "error": r.error,
+                "received_at": r.received_at,
+                "processed_at": r.processed_at,
+            }
+            for r in db.scalars(stmt)
+        ]
+
+
+def stats() -> Dict[str, Any]:
+    return {"listeners": len(_listeners), **_counters}
@@ -0,0 +1,391 @@
+# services/ai_outbox.py
+# AI 서버 쓰기(자원 등록, 요청 등록, 매칭 확정, 수동 매칭)를 ai_outbox 에 먼저 기록하고 전달
+# - add(): 호출한 쪽 세션에 행만 추가 → 로컬 상태 변경과 같은 commit 으로 남음
+# - sync 모드: 기록한 요청 안에서 한 번 바로 전달(deliver). 일시 장애면 행은 pending 으로 남고 호출자는 202 + outbox_id
+# - 디스패처: 기한이 된 pending 을 조건부 UPDATE 로 가져가 전달. 지수 backoff,
+#   재시도해도 안 될 실패(4xx 등)나 AI_OUTBOX_MAX_ATTEMPTS 초과면 dead (admin 에서 다시 pending 으로)
+# - 순서: entity_key 가 같은 행은 앞 행이 끝나야(delivered/dead) 다음 행을 보냄
+# - 작업 종류별 전송/후처리/dead 보상은 도메인 서비스가 register() 로 등록
+# - 전달은 at-least-once: AI 응답 직전에 끊기면 같은 작업이 한 번 더 갈 수 있음
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from core.concurrency import gather_bounded
+from core.config import settings
+from core.resilience import is_transient
+from db.session import SessionLocal
+from models.ai_outbox import OUTBOX_DEAD, OUTBOX_DELIVERED, OUTBOX_PENDING, OUTBOX_SENDING, AIOutbox
+from schemas.outbox import AIWriteAccepted, AIWriteStatus
+
+# payload → (AI 응답, AI 가 준 id)
+SendFn = Callable[[Dict[str, Any]], Awaitable[Tuple[Any, Optional[str]]]]
+# 전달 직후 로컬 반영. 돌려준 dict 는 sync 호출자에게 그대로 전달 (예: 포인트 지급 결과)
+AfterFn = Callable[[AIOutbox, Any], Awaitable[Optional[Dict[str, Any]]]]
+# dead 로 바꾸는 트랜잭션 안에서 로컬 상태 되돌리기
+DeadFn = Callable[[Session, AIOutbox], None]
+
+
+@dataclass(frozen=True)
+class _Handler:
+    send: SendFn
+    after: Optional[AfterFn] = None
+    on_dead: Optional[DeadFn] = None
+
+
+@dataclass
+class Delivery:
+    row: AIOutbox
+    error: Optional[BaseException] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    @property
+    def delivered(self) -> bool:
+        return self.row.status == OUTBOX_DELIVERED
+
+    @property
+    def dead(self) -> bool:
+        return self.row.status == OUTBOX_DEAD
+
+
+_handlers: Dict[str, _Handler] = {}
+_task: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+# add(claim=True) 로 넣은 행을 디스패처가 먼저 가져가지 않도록 두는 시간 (요청이 그 사이 죽으면 이후 디스패처가 전달)
+_CLAIM_GRACE = 10.0
+_counters = {"enqueued": 0, "delivered": 0, "retried": 0, "dead": 0, "recovered": 0}
+
+
+def register(op: str, send: SendFn, *, after: Optional[AfterFn] = None, on_dead: Optional[DeadFn] = None) -> None:
+    _handlers[op] = _Handler(send=send, after=after, on_dead=on_dead)
+
+
+def _count(name: str, n: int = 1) -> None:
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def _err(e: BaseException) -> str:
+    return (f"{type(e).__name__}: {e}")[:255]
+
+
+def _backoff(attempts: int) -> float:
+    return min(settings.AI_OUTBOX_BACKOFF * (2 ** max(0, attempts - 1)), settings.AI_OUTBOX_BACKOFF_MAX)
+
+
+def _claim_stmt(row_id: int, entity_key: str, now: datetime):
+    # pending 행 하나를 sending 으로. 같은 entity 의 앞선 pending/sending 행이 있으면 rowcount 0 (순서를 기다림)
+    # 확인과 변경이 한 문장이라 동시에 들어온 쓰기끼리도 앞선 행보다 먼저 나가지 않음
+    # (MySQL 은 UPDATE 대상 테이블을 WHERE 서브쿼리에서 바로 읽지 못해 LIMIT 붙은 파생 테이블로 감쌈)
+    older = aliased(AIOutbox)
+    ahead = (
+        select(older.id)
+        .where(
+            older.entity_key == entity_key,
+            older.id < row_id,
+            older.status.in_((OUTBOX_PENDING, OUTBOX_SENDING)),
+        )
+        .limit(1)
+        .subquery()
+    )
+    return (
+        update(AIOutbox)
+        .where(AIOutbox.id == row_id, AIOutbox.status == OUTBOX_PENDING, ~exists(select(ahead.c.id)))
+        .values(status=OUTBOX_SENDING, attempts=AIOutbox.attempts + 1, updated_at=now)
+    )
+
+
+# ---------------------------------------------------------------------------
+# 기록 / 전달
+# ---------------------------------------------------------------------------
+
+def add(
+    db: Session,
+    op: str,
+    *,
+    entity_key: str,
+    username: str,
+    payload: Dict[str, Any],
+    claim: bool = False,
+) -> AIOutbox:
+    """
+    outbox 행을 pending 으로 db 세션에 추가 (commit 은 호출자가 로컬 상태 변경과 함께).
+    claim=True 면 commit 뒤 submit(row, claim=True) 로 이 요청에서 가져갈 것이므로 잠시 디스패처가 건드리지 않게 둠
+    """
+    if op not in _handlers:
+        raise ValueError(f"등록되지 않은 outbox 작업: {op}")
+    now = datetime.utcnow()
+    row = AIOutbox(
+        public_id=uuid4().hex,
+        op=op,
+        entity_key=entity_key[:100],
+        username=username,
+        payload=payload,
+        status=OUTBOX_PENDING,
+        attempts=0,
+        next_attempt_at=now + timedelta(seconds=_CLAIM_GRACE) if claim else now,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(row)
+    _count("enqueued")
+    return row
+
+
+def _delivered(row_id: int, result: Any, ai_id: Optional[str]) -> AIOutbox:
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        row = db.get(AIOutbox, row_id)
+        row.status = OUTBOX_DELIVERED
+        row.result = result
+        row.ai_id = str(ai_id)[:64] if ai_id else None
+        row.last_error = None
+        row.delivered_at = now
+        row.updated_at = now
+        db.commit()
+        return row
+
+
+def _failed(row_id: int, e: BaseException) -> AIOutbox:
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        row = db.get(AIOutbox, row_id)
+        row.last_error = _err(e)
+        row.updated_at = now
+        if is_transient(e) and row.attempts < settings.AI_OUTBOX_MAX_ATTEMPTS:
+            row.status = OUTBOX_PENDING
+            row.next_attempt_at = now + timedelta(seconds=_backoff(row.attempts))
+            _count("retried")
+        else:
+            row.status = OUTBOX_DEAD
+            handler = _handlers.get(row.op)
+            if handler and handler.on_dead:
+                handler.on_dead(db, row)
+            _count("dead")
+        db.commit()
+        return row
+
+
+async def deliver(row: AIOutbox) -> Delivery:
+    """sending 으로 가져간 행 하나를 AI 서버에 전달하고 결과에 따라 delivered/pending/dead 로 바꿈"""
+    handler = _handlers.get(row.op)
+    if handler is None:
+        e = ValueError(f"등록되지 않은 outbox 작업: {row.op}")
+        return Delivery(await run_in_threadpool(_failed, row.id, e), e)
+    try:
+        result, ai_id = await handler.send(dict(row.payload or {}))
+    except Exception as e:
+        print(f"[경고] outbox {row.public_id} ({row.op}) 전달 실패 {row.attempts}회째: {e}")
+        return Delivery(await run_in_threadpool(_failed, row.id, e), e)
+
+    row = await run_in_threadpool(_delivered, row.id, result, ai_id)
+    _count("delivered")
+    extra = None
+    if handler.after:
+        try:
+            extra = await handler.after(row, row.result)
+        except Exception as e:
+            # AI 쪽에는 이미 반영됨: 로컬 후처리 실패는 로그만 (미러/알림함은 다음 동기화 때 맞춰짐)
+            print(f"[경고] outbox {row.public_id} ({row.op}) 후처리 실패: {e}")
+    return Delivery(row, extra=extra)
+
+
+def _claim(row: AIOutbox) -> Optional[AIOutbox]:
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        if db.execute(_claim_stmt(row.id, row.entity_key, now)).rowcount == 1:
+            db.commit()
+            return db.get(AIOutbox, row.id)
+        # 앞선 작업이 남아 못 가져갔으면 유예를 풀어 디스패처가 순서대로 보내게
+        db.execute(
+            update(AIOutbox)
+            .where(AIOutbox.id == row.id, AIOutbox.status == OUTBOX_PENDING)
+            .values(next_attempt_at=now, updated_at=now)
+        )
+        db.commit()
+        return None
+
+
+async def submit(row: AIOutbox, *, claim: bool = False) -> Delivery:
+    """
+    add() 후 commit 된 행. claim 이면 이 요청에서 가져가 바로 전달하고,
+    같은 entity 의 앞 작업이 남았거나 디스패처가 먼저 가져갔으면 디스패처에 맡김
+    """
+    if claim:
+        claimed = await run_in_threadpool(_claim, row)
+        if claimed is not None:
+            return await deliver(claimed)
+    wake()
+    return Delivery(row)
+
+
+def accepted(row: AIOutbox) -> JSONResponse:
+    # 아직 AI 에 전달되지 않은 쓰기: 202 + 상태 조회 위치
+    body = AIWriteAccepted(outbox_id=row.public_id, op=row.op, status=row.status)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=body.model_dump(mode="json"),
+        headers={"Location": f"/outbox/{row.public_id}"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# 디스패처
+# ---------------------------------------------------------------------------
+
+def start() -> None:
+    global _task, _wake
+    if _task is not None:
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.get_running_loop().create_task(_loop())
+
+
+async def stop() -> None:
+    global _task, _wake
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+    _wake = None
+
+
+def wake() -> None:
+    if _wake is not None:
+        _wake.set()
+
+
+async def _loop() -> None:
+    while True:
+        try:
+            n = await tick()
+        except Exception as e:
+            print(f"[경고] outbox 디스패처 오류: {e}")
+            n = 0
+        if n:
+            continue        # 가져간 게 있으면 바로 다음 묶음
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=settings.AI_OUTBOX_POLL)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def _claim_due(limit: int) -> List[AIOutbox]:
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        # 전달 중에 프로세스가 죽어 sending 에 멈춘 행은 다시 pending 으로
+        stale = now - timedelta(seconds=settings.AI_OUTBOX_STALE_AFTER)
+        recovered = db.execute(
+            update(AIOutbox)
+            .where(AIOutbox.status == OUTBOX_SENDING, AIOutbox.updated_at < stale)
+            .values(status=OUTBOX_PENDING, next_attempt_at=now, updated_at=now)
+        ).rowcount
+        if recovered:
+            _count("recovered", recovered)
+
+        older = aliased(AIOutbox)
+        due = db.execute(
+            select(AIOutbox.id, AIOutbox.entity_key)
+            .where(
+                AIOutbox.status == OUTBOX_PENDING,
+                AIOutbox.next_attempt_at <= now,
+                ~exists().where(
+                    older.entity_key == AIOutbox.entity_key,
+                    older.id < AIOutbox.id,
+                    older.status.in_((OUTBOX_PENDING, OUTBOX_SENDING)),
+                ),
+            )
+            .order_by(AIOutbox.id)
+            .limit(limit)
+        ).all()
+
+        claimed = []
+        for row_id, entity_key in due:
+            if db.execute(_claim_stmt(row_id, entity_key, now)).rowcount == 1:
+                claimed.append(row_id)    # 0 이면 다른 프로세스/요청이 먼저 가져감
+        db.commit()
+        if not claimed:
+            return []
+        return list(db.scalars(select(AIOutbox).where(AIOutbox.id.in_(claimed)).order_by(AIOutbox.id)).all())
+
+
+async def tick() -> int:
+    """기한이 된 pending 을 한 묶음 가져가 전달. 가져간 행 수"""
+    rows = await run_in_threadpool(_claim_due, settings.AI_OUTBOX_BATCH)
+    if rows:
+        results = await gather_bounded(
+            [lambda r=r: deliver(r) for r in rows], limit=settings.AI_OUTBOX_CONCURRENCY
+        )
+        for r, res in zip(rows, results):
+            if isinstance(res, BaseException):
+                print(f"[경고] outbox {r.public_id} 처리 중 오류: {res}")
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# 조회 / 관리
+# ---------------------------------------------------------------------------
+
+def to_status(row: AIOutbox) -> AIWriteStatus:
+    return AIWriteStatus(
+        outbox_id=row.public_id,
+        op=row.op,
+        status=row.status,
+        attempts=row.attempts or 0,
+        ai_id=row.ai_id,
+        result=row.result,
+        error=row.last_error,
+        created_at=row.created_at,
+        next_attempt_at=row.next_attempt_at if row.status == OUTBOX_PENDING else None,
+        delivered_at=row.delivered_at,
+    )
+
+
+def get_owned(db: Session, public_id: str, username: str) -> Optional[AIOutbox]:
+    return db.execute(
+        select(AIOutbox).where(AIOutbox.public_id == public_id, AIOutbox.username == username)
+    ).scalar_one_or_none()
+
+
+def list_rows(db: Session, *, status: Optional[str] = None, limit: int = 50) -> List[AIOutbox]:
+    stmt = select(AIOutbox)
+    if status:
+        stmt = stmt.where(AIOutbox.status == status)
+    return list(db.scalars(stmt.order_by(AIOutbox.id.desc()).limit(limit)).all())
+
+
+def retry(db: Session, public_id: str) -> Optional[AIOutbox]:
+    """dead 행을 다시 pending 으로 (시도 횟수 초기화). dead 가 아니면 그대로 돌려줌"""
+    row = db.execute(select(AIOutbox).where(AIOutbox.public_id == public_id)).scalar_one_or_none()
+    if row is None or row.status != OUTBOX_DEAD:
+        return row
+    now = datetime.utcnow()
+    row.status = OUTBOX_PENDING
+    row.attempts = 0
+    row.next_attempt_at = now
+    row.updated_at = now
+    db.commit()
+    wake()
+    return row
+
+
+def stats(db: Session) -> Dict[str, Any]:
+    by_status = dict(db.execute(select(AIOutbox.status, func.count()).group_by(AIOutbox.status)).all())
+    oldest = db.execute(
+        select(func.min(AIOutbox.created_at)).where(AIOutbox.status.in_((OUTBOX_PENDING, OUTBOX_SENDING)))
+    ).scalar()
+    return {
+        "running": _task is not None,
+        "by_status": by_status,
+        "oldest_pending_at": oldest,
+        **_counters,
+    }
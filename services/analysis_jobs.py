@@ -0,0 +1,207 @@
+# services/analysis_jobs.py
+# 이미지 분석 job 모드: 업로드 저장 후 바로 202 로 응답하고, AI 호출은 백그라운드 워커가 처리
+# - Analysis 행을 job_status=queued 로 만들고 로컬 id 를 먼저 돌려줌 (GET /analysis/{id} 로 진행 상태 조회)
+# - 워커는 조건부 UPDATE(queued → running)로 작업을 가져가므로 여러 프로세스가 같은 작업을 중복 처리하지 않음
+# - 같은 사용자가 같은 사진으로 재시도하면 진행 중인 작업을 그대로 돌려줌
+# - 오래 running/queued 로 남은 작업(프로세스 재시작 등)은 주기적으로 다시 큐에 넣음
+import asyncio
+import mimetypes
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.resilience import is_transient
+from core.uploads import SavedUpload
+from db.session import AsyncSessionLocal
+from models.analysis import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Analysis
+from services import analysis_service, upload_store
+
+_queue: Optional[asyncio.Queue] = None
+_tasks: List[asyncio.Task] = []
+_counters = {"submitted": 0, "reused": 0, "joined": 0, "done": 0, "failed": 0, "retried": 0}
+
+
+def enabled() -> bool:
+    return _queue is not None
+
+
+def start() -> None:
+    global _queue
+    if settings.ANALYSIS_JOB_WORKERS <= 0 or _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    _tasks.extend(loop.create_task(_worker()) for _ in range(settings.ANALYSIS_JOB_WORKERS))
+    _tasks.append(loop.create_task(_recover_loop()))
+
+
+async def stop() -> None:
+    global _queue
+    for t in _tasks:
+        t.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    _queue = None
+
+
+async def submit(db: Session | AsyncSession, username: str, file: UploadFile) -> Analysis:
+    saved, phash, source = await analysis_service._prepare(db, username, file)
+    if source is not None:
+        # 재사용 가능한 결과가 있으면 작업 없이 바로 done
+        _counters["reused"] += 1
+        anal = await analysis_service._save(db, analysis_service._copy_of(source, username, saved, phash))
+        await upload_store.add_ref(saved.sha256, "analysis", anal.ai_analysis_id)
+        return anal
+
+    # 재시도한 업로드: 같은 사용자/같은 내용으로 진행 중인 작업이 있으면 그것을 돌려줌
+    running = await analysis_service._scalars(
+        db,
+        select(Analysis)
+        .where(
+            Analysis.username == username,
+            Analysis.content_hash == saved.sha256,
+            Analysis.job_status.in_((JOB_QUEUED, JOB_RUNNING)),
+        )
+        .order_by(Analysis.id.desc())
+        .limit(1),
+    )
+    if running:
+        _counters["joined"] += 1
+        return running[0]
+
+    anal = await analysis_service._save(db, Analysis(
+        ai_analysis_id=uuid4().hex,
+        username=username,
+        image_path=saved.path,
+        content_hash=saved.sha256,
+        phash=phash,
+        job_status=JOB_QUEUED,
+    ))
+    await upload_store.add_ref(saved.sha256, "analysis", anal.ai_analysis_id)
+    _counters["submitted"] += 1
+    _queue.put_nowait(anal.id)
+    return anal
+
+
+# ---------------------------------------------------------------------------
+# 워커
+# ---------------------------------------------------------------------------
+
+async def _worker() -> None:
+    while True:
+        row_id = await _queue.get()
+        try:
+            await _run(row_id)
+        except Exception as e:
+            print(f"[경고] 분석 작업 {row_id} 처리 실패: {e}")
+        finally:
+            _queue.task_done()
+
+
+async def _claim(row_id: int) -> Optional[Analysis]:
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(
+            update(Analysis)
+            .where(Analysis.id == row_id, Analysis.job_status == JOB_QUEUED)
+            .values(job_status=JOB_RUNNING, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+        if res.rowcount != 1:
+            return None     # 다른 워커/프로세스가 이미 가져감
+        return await db.get(Analysis, row_id)
+
+
+async def _finish(row_id: int, **values: Any) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Analysis)
+            .where(Analysis.id == row_id, Analysis.job_status == JOB_RUNNING)
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+        await db.commit()
+
+
+def _saved_of(anal: Analysis) -> SavedUpload:
+    name = os.path.basename(anal.image_path)
+    return SavedUpload(
+        path=anal.image_path,
+        size=0,
+        sha256=anal.content_hash,
+        filename=name,
+        content_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+    )
+
+
+async def _run(row_id: int) -> None:
+    anal = await _claim(row_id)
+    if anal is None:
+        return
+
+    retries = max(0, settings.ANALYSIS_JOB_RETRIES)
+    for attempt in range(retries + 1):
+        try:
+            j = await analysis_service._request_ai(_saved_of(anal), anal.username)
+            break
+        except Exception as e:
+            if attempt < retries and is_transient(e):
+                _counters["retried"] += 1
+                await asyncio.sleep(settings.ANALYSIS_JOB_RETRY_BACKOFF * (2 ** attempt))
+                continue
+            detail = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+            await _finish(row_id, job_status=JOB_FAILED, job_error=str(detail).splitlines()[0][:255])
+            _counters["failed"] += 1
+            return
+
+    await _finish(
+        row_id,
+        job_status=JOB_DONE,
+        job_error=None,
+        source_analysis_id=j["analysis_id"],
+        **analysis_service._result_columns(j),
+    )
+    _counters["done"] += 1
+
+
+async def _recover() -> int:
+    # 오래된 running(처리하던 프로세스가 죽음) 은 queued 로 되돌리고, 오래된 queued 를 이 프로세스 큐에 넣음
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.ANALYSIS_JOB_STALE_AFTER)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Analysis)
+            .where(Analysis.job_status == JOB_RUNNING, Analysis.updated_at < cutoff)
+            .values(job_status=JOB_QUEUED, updated_at=Analysis.updated_at)     # 아래에서 바로 다시 고르도록 시각 유지
+        )
+        await db.commit()
+        ids = (await db.scalars(
+            select(Analysis.id).where(Analysis.job_status == JOB_QUEUED, Analysis.updated_at < cutoff)
+        )).all()
+    for row_id in ids:
+        _queue.put_nowait(row_id)
+    return len(ids)
+
+
+async def _recover_loop() -> None:
+    while True:
+        try:
+            n = await _recover()
+            if n:
+                print(f"[분석 작업] 멈춘 작업 {n}건 재등록")
+        except Exception as e:
+            print(f"[경고] 분석 작업 복구 실패: {e}")
+        await asyncio.sleep(max(1.0, settings.ANALYSIS_JOB_STALE_AFTER))
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "enabled": enabled(),
+        "workers": settings.ANALYSIS_JOB_WORKERS,
+        "queued": _queue.qsize() if _queue is not None else 0,
+        **_counters,
+    }
@@ -1,89 +1,253 @@
 # services/analysis_service.py
-import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
-from pathlib import Path
-import requests
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from core import images
+from core.concurrency import gather_bounded
 from core.config import settings
-from models.analysis import Analysis
+from core.uploads import SavedUpload, async_file_part
+from models.analysis import JOB_DONE, Analysis
+from services import upload_store
+from services.ai_client import _asend_multipart, _headers
 
-UPLOAD_DIR = Path("uploads/analysis")
-MAX_SIZE = 5 * 1024 * 1024  # 5MB
+MAX_SIZE = settings.UPLOAD_MAX_BYTES  # 기본 5MB
 AI_ANALYZE_URL = f"{settings.AI_API_BASE.rstrip('/')}/analysis/image"
 
-def _ensure_dir() -> None:
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-def _unique_name(orig: str | None) -> str:
-    ext = ""
-    if orig and "." in orig:
-        ext = "." + orig.rsplit(".", 1)[-1].lower()
-    return f"{uuid4().hex}{ext or '.bin'}"
-
-def _check_size(uf: UploadFile) -> None:
-    pos = uf.file.tell()
-    uf.file.seek(0, os.SEEK_END)
-    size = uf.file.tell()
-    uf.file.seek(pos)
-    if size > MAX_SIZE:
-        raise ValueError("파일 크기가 너무 큽니다. (5MB 초과)")
-
-def _save_local_copy(file: UploadFile) -> str:
-    _ensure_dir()
-    name = _unique_name(file.filename)
-    path = UPLOAD_DIR / name
-    file.file.seek(0)
-    with open(path, "wb") as f:
-        f.write(file.file.read())
-    file.file.seek(0)
-    return str(path)
-
-def call_ai_and_save(db: Session, username: str, file: UploadFile) -> Analysis:
-    _check_size(file)
-    local_path = _save_local_copy(file)
-
-    files = {
-        "file": (
-            file.filename or "upload.bin",
-            file.file,
-            file.content_type or "application/octet-stream",
+# 분석 결과 재사용 적중률 (exact: 같은 sha256, near: dHash 거리 이내, miss: AI 호출)
+_lock = threading.Lock()
+_counters = {"exact": 0, "near": 0, "miss": 0}
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+def _persist(db: Session, anal: Analysis) -> Analysis:
+    db.add(anal)
+    db.commit()
+    db.refresh(anal)
+    return anal
+
+async def _persist_async(db: AsyncSession, anal: Analysis) -> Analysis:
+    db.add(anal)
+    await db.commit()
+    await db.refresh(anal)
+    return anal
+
+async def _scalars(db: Session | AsyncSession, stmt) -> list:
+    if isinstance(db, AsyncSession):
+        return list((await db.scalars(stmt)).all())
+    return await run_in_threadpool(lambda: list(db.scalars(stmt).all()))
+
+def _phash(path: str) -> Optional[str]:
+    if settings.ANALYSIS_PHASH_DISTANCE <= 0:
+        return None
+    return images.dhash(path)
+
+async def _find_reusable(
+    db: Session | AsyncSession, username: str, sha256: str, phash: Optional[str]
+) -> Optional[Analysis]:
+    # 재사용 원본은 같은 사용자의, 추출 결과가 있는 행만 (비동기 작업 대기/실패 행 제외)
+    # AI 분석 id 는 사용자별로 발급되므로 다른 사용자의 결과/id 를 넘기지 않음
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.ANALYSIS_CACHE_MAX_AGE)
+    base = select(Analysis).where(
+        Analysis.username == username,
+        Analysis.job_status == JOB_DONE,
+        Analysis.created_at >= cutoff,
+    )
+
+    exact = await _scalars(db, base.where(Analysis.content_hash == sha256).order_by(Analysis.id.desc()).limit(1))
+    if exact:
+        _count("exact")
+        return exact[0]
+
+    if phash:
+        rows = await _scalars(
+            db,
+            base.where(Analysis.phash.is_not(None))
+            .order_by(Analysis.id.desc())
+            .limit(settings.ANALYSIS_PHASH_CANDIDATES),
         )
-    }
-    data = {"username": username}
+        best = min(rows, key=lambda a: images.hamming(phash, a.phash), default=None)
+        if best is not None and images.hamming(phash, best.phash) <= settings.ANALYSIS_PHASH_DISTANCE:
+            _count("near")
+            return best
+
+    _count("miss")
+    return None
 
-    headers = {"Accept": "application/json"}
-    if settings.SERVER_ONLY_AI_API_KEY:
-        headers["Authorization"] = f"Bearer {settings.SERVER_ONLY_AI_API_KEY}"
+async def _save(db: Session | AsyncSession, anal: Analysis) -> Analysis:
+    if isinstance(db, AsyncSession):
+        return await _persist_async(db, anal)
+    return await run_in_threadpool(_persist, db, anal)
 
-    resp = requests.post(
-        AI_ANALYZE_URL,
-        headers=headers,
-        files=files,
-        data=data,
-        timeout=20,
+async def _store(file: UploadFile) -> tuple[SavedUpload, Optional[str]]:
+    # 이미지가 아니면 저장/AI 호출 전에 415
+    images.sniff_format(file.file)
+    # 내용 기준으로 저장(같은 이미지는 기존 파일 재사용) → 정규화본(회전 보정/축소/재인코딩) + dHash
+    saved = await upload_store.store_upload(file, max_bytes=MAX_SIZE)
+    saved = await upload_store.normalized(saved)
+    phash = await run_in_threadpool(_phash, saved.path)
+    return saved, phash
+
+async def _prepare(
+    db: Session | AsyncSession, username: str, file: UploadFile
+) -> tuple[SavedUpload, Optional[str], Optional[Analysis]]:
+    # 저장하고, 이 사용자가 전에 분석한 것 중 재사용할 수 있는 것을 찾음
+    saved, phash = await _store(file)
+    source = None
+    if settings.ANALYSIS_CACHE_ENABLED:
+        source = await _find_reusable(db, username, saved.sha256, phash)
+    return saved, phash, source
+
+def _copy_of(source: Analysis, username: str, saved: SavedUpload, phash: Optional[str]) -> Analysis:
+    # AI 호출 없이 이전 추출 결과로 만든 새 분석 행
+    return Analysis(
+        ai_analysis_id=uuid4().hex,
+        username=username,
+        detected_item=source.detected_item,
+        material_type=source.material_type,
+        suggested_title=source.suggested_title,
+        image_path=saved.path,
+        estimated_value=source.estimated_value,
+        content_hash=saved.sha256,
+        phash=phash,
+        source_analysis_id=ai_analysis_id_for(source),
+        job_status=JOB_DONE,
     )
+
+async def _request_ai(saved: SavedUpload, username: str) -> Dict[str, Any]:
+    # AI 서버에는 저장된 파일을 스트리밍
+    data = {"username": username}
+
+    async with async_file_part(saved) as part:
+        resp = await _asend_multipart(
+            "analysis",
+            AI_ANALYZE_URL,
+            headers=_headers(),
+            files={"file": part},
+            data=data,
+        )
     resp.raise_for_status()
     j = resp.json()
-    analysis_id = j.get("analysis_id")
-    if not analysis_id:
+    if not j.get("analysis_id"):
         raise ValueError("AI 응답에 analysis_id가 없습니다.")
+    return j
+
+def _result_columns(j: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "detected_item": j.get("detected_item"),
+        "material_type": j.get("material_type"),
+        "suggested_title": j.get("suggested_title"),
+        "estimated_value": j.get("estimated_value"),
+    }
 
-    anal = Analysis(
-        ai_analysis_id=analysis_id,
+def _from_ai(j: Dict[str, Any], username: str, saved: SavedUpload, phash: Optional[str]) -> Analysis:
+    return Analysis(
+        ai_analysis_id=j["analysis_id"],
         username=username,
-        detected_item=j.get("detected_item"),
-        material_type=j.get("material_type"),
-        suggested_title=j.get("suggested_title"),
-        image_path=local_path,
-        estimated_value=j.get("estimated_value"),
+        image_path=saved.path,
+        content_hash=saved.sha256,
+        phash=phash,
+        job_status=JOB_DONE,
+        **_result_columns(j),
     )
-    
-    db.add(anal)
-    db.commit()
-    db.refresh(anal)
+
+async def call_ai_and_save(db: Session | AsyncSession, username: str, file: UploadFile) -> Analysis:
+    saved, phash, source = await _prepare(db, username, file)
+
+    # 같은(또는 충분히 비슷한) 사진을 이미 분석했으면 AI 호출 없이 그 결과로 새 분석 행 생성
+    if source is not None:
+        anal = await _save(db, _copy_of(source, username, saved, phash))
+    else:
+        j = await _request_ai(saved, username)
+        anal = await _save(db, _from_ai(j, username, saved, phash))
+    await upload_store.add_ref(saved.sha256, "analysis", anal.ai_analysis_id)
     return anal
 
+async def _save_all(db: Session | AsyncSession, rows: List[Analysis]) -> None:
+    db.add_all(rows)
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        await run_in_threadpool(db.commit)
+
+async def analyze_batch(
+    db: Session | AsyncSession, username: str, files: List[UploadFile]
+) -> List[Analysis | BaseException]:
+    """
+    여러 이미지를 한 번에 분석. 입력 순서대로 Analysis 또는 그 이미지의 예외를 돌려준다.
+    - 저장/AI 호출은 ANALYSIS_BATCH_CONCURRENCY 개씩 동시에, 재사용 조회는 세션 하나로 차례대로
+    - 같은 배치 안의 같은 사진은 AI 를 한 번만 호출
+    - 성공한 행은 한 트랜잭션으로 저장
+    """
+    limit = settings.ANALYSIS_BATCH_CONCURRENCY
+    stored = await gather_bounded([lambda f=f: _store(f) for f in files], limit=limit)
+
+    sources: List[Optional[Analysis]] = []
+    for item in stored:
+        reusable = settings.ANALYSIS_CACHE_ENABLED and not isinstance(item, BaseException)
+        sources.append(await _find_reusable(db, username, item[0].sha256, item[1]) if reusable else None)
+
+    # AI 가 필요한 이미지: 내용별로 한 번만
+    pending: Dict[str, SavedUpload] = {}
+    for item, source in zip(stored, sources):
+        if not isinstance(item, BaseException) and source is None:
+            pending.setdefault(item[0].sha256, item[0])
+    shas = list(pending)
+    replies = await gather_bounded(
+        [lambda s=pending[sha]: _request_ai(s, username) for sha in shas], limit=limit
+    )
+    by_sha = dict(zip(shas, replies))
+
+    results: List[Analysis | BaseException] = []
+    first: Dict[str, Analysis] = {}       # 이 배치에서 AI 결과로 처음 만든 행
+    for item, source in zip(stored, sources):
+        if isinstance(item, BaseException):
+            results.append(item)
+            continue
+        saved, phash = item
+        if source is not None:
+            results.append(_copy_of(source, username, saved, phash))
+            continue
+        reply = by_sha[saved.sha256]
+        if isinstance(reply, BaseException):
+            results.append(reply)
+        elif saved.sha256 in first:
+            results.append(_copy_of(first[saved.sha256], username, saved, phash))
+        else:
+            first[saved.sha256] = _from_ai(reply, username, saved, phash)
+            results.append(first[saved.sha256])
+
+    rows = [r for r in results if isinstance(r, Analysis)]
+    if rows:
+        await _save_all(db, rows)
+        for row in rows:
+            await upload_store.add_ref(row.content_hash, "analysis", row.ai_analysis_id)
+    return results
+
+def ai_analysis_id_for(anal: Analysis) -> str:
+    # 재사용/비동기 작업 행은 로컬 id 라, AI 쪽에는 AI 서버가 아는 분석 id 를 넘김
+    return anal.source_analysis_id or anal.ai_analysis_id
+
+def reuse_stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+    lookups = sum(counters.values())
+    hits = counters["exact"] + counters["near"]
+    return {
+        **counters,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        "enabled": settings.ANALYSIS_CACHE_ENABLED,
+        "phash_distance": settings.ANALYSIS_PHASH_DISTANCE,
+        "phash_available": images.available(),
+    }
+
 
 def get_analysis_by_id(db: Session, username: str, analysis_id: str) -> Analysis | None:
     return (
@@ -93,4 +257,14 @@ def get_analysis_by_id(db: Session, username: str, analysis_id: str) -> Analysis
             Analysis.username == username,
         )
         .first()
+    )
+
+async def get_analysis_by_id_async(db: AsyncSession, username: str, analysis_id: str) -> Analysis | None:
+    return await db.scalar(
+        select(Analysis)
+        .where(
+            Analysis.ai_analysis_id == analysis_id,
+            Analysis.username == username,
+        )
+        .limit(1)
     )
\ No newline at end of file
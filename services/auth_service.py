@@ -1,9 +1,10 @@
 # services/auth_service.py
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from models.user import User
 from repositories.user_repo import UserRepository
-from core.security import get_password_hash, verify_password, create_access_token
+from core.security import create_access_token, hash_password_async, verify_password_async
 from schemas.auth import SignUpIn
 from services import point_service 
 
@@ -12,7 +13,7 @@ class AuthService:
         self.users = UserRepository()
 
     # 회원가입
-    def signup(self, db: Session, body: SignUpIn) -> User:
+    def _check_unique(self, db: Session, body: SignUpIn) -> None:
         if self.users.get_by_username(db, body.username):
             raise HTTPException(status_code=409, detail="이미 사용 중인 아이디입니다.")
         if body.nickname and self.users.get_by_nickname(db, body.nickname):
@@ -20,14 +21,7 @@ class AuthService:
         if body.phone and self.users.get_by_phone(db, body.phone):
             raise HTTPException(status_code=409, detail="이미 등록된 전화번호입니다.")
 
-        user = User(
-            username=body.username,
-            hashed_password=get_password_hash(body.password),
-            name=body.name,
-            phone=body.phone,
-            nickname=body.nickname,
-            address=body.address,
-        )
+    def _create_with_bonus(self, db: Session, user: User) -> User:
         created_user = self.users.create(db, user)
 
         try:
@@ -48,13 +42,39 @@ class AuthService:
             print(f"[경고] 포인트 지급 실패: {e}")
 
         return created_user
+
+    async def signup(self, db: Session, body: SignUpIn) -> User:
+        # DB 작업은 스레드풀, bcrypt 는 전용 프로세스 풀에서
+        await run_in_threadpool(self._check_unique, db, body)
+        hashed = await hash_password_async(body.password)
+        user = User(
+            username=body.username,
+            hashed_password=hashed,
+            name=body.name,
+            phone=body.phone,
+            nickname=body.nickname,
+            address=body.address,
+        )
+        return await run_in_threadpool(self._create_with_bonus, db, user)
     
 
     # 로그인
-    def authenticate(self, db: Session, username: str, password: str) -> User:
-        user = self.users.get_by_username(db, username)
-        if not user or not verify_password(password, user.hashed_password):
+    def _rehash(self, db: Session, user: User, new_hash: str) -> None:
+        user.hashed_password = new_hash
+        db.commit()
+
+    async def authenticate(self, db: Session, username: str, password: str) -> User:
+        user = await run_in_threadpool(self.users.get_by_username, db, username)
+        ok, new_hash = (await verify_password_async(password, user.hashed_password)) if user else (False, None)
+        if not ok:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="아이디 또는 비밀번호가 올바르지 않습니다.")
+        if new_hash:
+            # 해시 비용 설정이 바뀐 경우 로그인 성공 시점에 조용히 교체
+            try:
+                await run_in_threadpool(self._rehash, db, user, new_hash)
+            except Exception as e:
+                await run_in_threadpool(db.rollback)
+                print(f"[경고] 비밀번호 재해시 저장 실패: {e}")
         return user
 
     # 토큰 발급
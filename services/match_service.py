@@ -0,0 +1,106 @@
+# services/match_service.py
+# 매칭 확정(/notifications/confirm)과 수동 매칭(/notifications/iwant) 쓰기. services/ai_outbox.py 를 거쳐 AI 로 전달
+# - 같은 resource 에 대한 쓰기는 entity_key(resource:<id>) 로 기록 순서대로 하나씩
+# - 전달 뒤 미러 재조회 예약, 알림함 재동기화 표시, (accept 면) 포인트 지급
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from db.session import SessionLocal
+from models.ai_outbox import AIOutbox
+from services import ai_outbox, mirror_service, notification_inbox
+from services.ai_client import confirm_match_async, manual_match_async
+from services.resource_service import award_points_if_matched
+
+OP_MATCH_CONFIRM = "match.confirm"
+OP_MATCH_MANUAL = "match.manual"
+
+
+def _enqueue(db: Session, op: str, username: str, payload: Dict[str, Any], claim: bool) -> AIOutbox:
+    try:
+        row = ai_outbox.add(
+            db, op,
+            entity_key=f"resource:{payload['resource_id']}",
+            username=username,
+            payload=payload,
+            claim=claim,
+        )
+        db.commit()
+        return row
+    except Exception:
+        db.rollback()
+        raise
+
+
+async def _submit(db: Session, op: str, username: str, payload: Dict[str, Any], wait: bool) -> ai_outbox.Delivery:
+    row = await run_in_threadpool(_enqueue, db, op, username, payload, wait)
+    delivery = await ai_outbox.submit(row, claim=wait)
+    if delivery.dead and delivery.error is not None:
+        raise delivery.error
+    return delivery
+
+
+async def confirm(
+    db: Session, user: Any, resource_id: str, request_id: str, action: str, *, wait: bool = True
+) -> ai_outbox.Delivery:
+    """action: accept | decline. 전달되면 delivery.extra["award"] 에 포인트 지급 결과 (accept 일 때)"""
+    payload = {"resource_id": resource_id, "request_id": request_id, "action": action, "_user_id": user.id}
+    return await _submit(db, OP_MATCH_CONFIRM, user.username, payload, wait)
+
+
+async def manual(db: Session, user: Any, resource_id: str, amount: Any, *, wait: bool = True) -> ai_outbox.Delivery:
+    payload = {"resource_id": resource_id, "amount": amount, "username": user.username, "_user_id": user.id}
+    return await _submit(db, OP_MATCH_MANUAL, user.username, payload, wait)
+
+
+# ---------------------------------------------------------------------------
+# outbox 전송 / 후처리
+# ---------------------------------------------------------------------------
+
+async def _send_confirm(p: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    res = await confirm_match_async(p["resource_id"], p["request_id"], p["action"])
+    return res, p["request_id"]
+
+
+async def _award(resource_id: str, request_id: str) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        info = await award_points_if_matched(
+            db,
+            resource_id=resource_id,
+            request_id=request_id,
+            allow_on_accept=True,
+        )
+    except Exception as e:
+        return {"awarded": False, "error": str(e)}
+    finally:
+        db.close()
+    if not info:
+        return {"awarded": False, "reason": "award skipped or failed"}
+    return {"awarded": True, "detail": info}
+
+
+async def _after_confirm(row: AIOutbox, _res: Dict[str, Any]) -> Dict[str, Any]:
+    p = row.payload
+    mirror_service.refresh_match_later(resource_id=p["resource_id"], request_id=p["request_id"])
+    await run_in_threadpool(notification_inbox.mark_stale, p["_user_id"])
+    award = await _award(p["resource_id"], p["request_id"]) if p["action"] == "accept" else None
+    return {"award": award}
+
+
+async def _send_manual(p: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    res = await manual_match_async(resource_id=p["resource_id"], amount=p["amount"], username=p["username"])
+    request_id = res.get("request_id") if isinstance(res, dict) else None
+    return res, request_id
+
+
+async def _after_manual(row: AIOutbox, res: Dict[str, Any]) -> None:
+    p = row.payload
+    await mirror_service.record_match(res)
+    mirror_service.refresh_match_later(resource_id=p["resource_id"])
+    await run_in_threadpool(notification_inbox.mark_stale, p["_user_id"])
+
+
+ai_outbox.register(OP_MATCH_CONFIRM, _send_confirm, after=_after_confirm)
+ai_outbox.register(OP_MATCH_MANUAL, _send_manual, after=_after_manual)
@@ -0,0 +1,402 @@
+# services/mirror_service.py
+# AI 서버가 소유한 요청/자원을 로컬 requests/resources 테이블에 읽기 전용으로 미러링한다.
+# - 기동 시 전체 백필, 이후 MIRROR_RECONCILE_INTERVAL 마다 재조정(reconcile)
+# - 이 백엔드를 거치는 쓰기(요청/자원 등록, 매칭 확정)는 즉시 upsert
+# - 목록/상세/필터 조회는 인덱스 SQL + keyset 페이지네이션으로 처리
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.session import SessionLocal
+from models.request import Request
+from models.resource import Resource
+from models.user import User
+from services.ai_client import (
+    _ensure_dict,
+    get_all_requests,
+    get_all_resources,
+    get_match_by_request_async,
+    get_match_by_resource_async,
+)
+
+Page = Tuple[List[Dict[str, Any]], int, Optional[int]]
+
+_ready = False          # 이 프로세스에서 첫 백필이 끝났는지
+_task: Optional[asyncio.Task] = None
+_pending: set[asyncio.Task] = set()     # refresh_match_later 로 띄운 작업 (GC 방지)
+
+
+def is_ready() -> bool:
+    return settings.MIRROR_ENABLED and _ready
+
+
+# ---------------------------------------------------------------------------
+# AI dict → 컬럼 매핑
+# ---------------------------------------------------------------------------
+
+def _to_float(v: Any) -> float:
+    s = str(v or "").strip()
+    num = ""
+    for ch in s:
+        if ch.isdigit() or ch in ".-+":
+            num += ch
+        elif num:
+            break
+    try:
+        return float(num) if num else 0.0
+    except ValueError:
+        return 0.0
+
+def _to_int(v: Any) -> int:
+    try:
+        return int(float(str(v))) if v is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+def _clip(v: Any, n: int) -> Optional[str]:
+    return None if v is None else str(v)[:n]
+
+def _request_columns(r: Dict[str, Any], user_ids: Dict[str, int]) -> Dict[str, Any]:
+    title = r.get("title") or r.get("item_name") or r.get("wanted_item") or ""
+    amount = r.get("amount") if r.get("amount") is not None else r.get("desired_amount")
+    username = r.get("username")
+    return {
+        "wanted_item": _clip(r.get("item_name") or r.get("wanted_item") or title, 100) or "",
+        "material_type": _clip(r.get("material_type"), 50),
+        "desired_amount": _to_float(amount),
+        "amount": _clip(amount, 50),
+        "description": r.get("description"),
+        "image_path": _clip(r.get("image_path") or r.get("image_url"), 255),
+        "status": _clip(r.get("status") or "pending", 20),
+        "username": _clip(username, 50),
+        "created_by": user_ids.get(username) if username else None,
+        "title": _clip(r.get("title"), 100),
+        "item_type": _clip(r.get("item_type"), 50),
+        "is_auto_written": bool(r.get("is_auto_written", False)),
+        "payload": r,
+    }
+
+def _resource_columns(r: Dict[str, Any], user_ids: Dict[str, int]) -> Dict[str, Any]:
+    username = r.get("username")
+    return {
+        "title": _clip(r.get("title") or r.get("item_name") or "", 100),
+        "item_name": _clip(r.get("item_name"), 100),
+        "description": r.get("description"),
+        "amount": _to_float(r.get("amount")),
+        "value": _to_int(r.get("value")),
+        "detected_item": _clip(r.get("detected_item"), 100),
+        "item_type": _clip(r.get("item_type"), 50),
+        "material_type": _clip(r.get("material_type"), 50),
+        "image_path": _clip(r.get("image_path") or r.get("image_url"), 255),
+        "status": _clip(r.get("status") or "registered", 20),
+        "username": _clip(username, 50),
+        "user_id": user_ids.get(username) if username else None,
+        "payload": r,
+    }
+
+def _request_row(obj: Request) -> Dict[str, Any]:
+    if obj.payload:
+        return dict(obj.payload)
+    return {
+        "request_id": obj.ai_request_id or str(obj.id),
+        "title": obj.title,
+        "item_name": obj.wanted_item,
+        "item_type": obj.item_type,
+        "material_type": obj.material_type,
+        "amount": obj.amount if obj.amount is not None else obj.desired_amount,
+        "description": obj.description,
+        "image_path": obj.image_path,
+        "username": obj.username,
+        "status": obj.status,
+        "is_auto_written": obj.is_auto_written,
+    }
+
+def _resource_row(obj: Resource) -> Dict[str, Any]:
+    if obj.payload:
+        row = dict(obj.payload)
+        row.setdefault("status", obj.status)
+        return row
+    return {
+        "resource_id": obj.ai_resource_id or str(obj.id),
+        "title": obj.title,
+        "item_name": obj.item_name,
+        "item_type": obj.item_type,
+        "material_type": obj.material_type,
+        "amount": obj.amount,
+        "value": obj.value,
+        "description": obj.description,
+        "image_path": obj.image_path,
+        "username": obj.username,
+        "status": obj.status,
+    }
+
+
+# ---------------------------------------------------------------------------
+# upsert / reconcile (동기, 스레드풀에서 호출)
+# ---------------------------------------------------------------------------
+
+def _user_ids(db: Session, usernames: Iterable[Optional[str]]) -> Dict[str, int]:
+    names = {u for u in usernames if u}
+    if not names:
+        return {}
+    rows = db.execute(select(User.username, User.id).where(User.username.in_(names))).all()
+    return {name: uid for name, uid in rows}
+
+def _upsert(db: Session, model, key_col, rows: List[Dict[str, Any]], id_of, columns_of, merge: bool) -> int:
+    keyed: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        r = _ensure_dict(r)
+        k = id_of(r)
+        if k:
+            keyed[k] = r
+    if not keyed:
+        return 0
+
+    user_ids = _user_ids(db, (r.get("username") for r in keyed.values()))
+    now = datetime.utcnow()
+    existing = {
+        getattr(o, key_col.key): o
+        for o in db.execute(select(model).where(key_col.in_(list(keyed)))).scalars()
+    }
+    for k, r in keyed.items():
+        obj = existing.get(k)
+        # merge: 쓰기 경로에서 받은 부분 스냅샷은 기존 원본 위에 덮어씀
+        if merge and obj is not None and obj.payload:
+            r = {**obj.payload, **r}
+        cols = columns_of(r, user_ids)
+        if obj is None:
+            obj = model(**{key_col.key: k})
+            db.add(obj)
+        for name, v in cols.items():
+            setattr(obj, name, v)
+        obj.synced_at = now
+    return len(keyed)
+
+def _request_key(r: Dict[str, Any]) -> str:
+    return str(r.get("request_id") or r.get("id") or "")
+
+def _resource_key(r: Dict[str, Any]) -> str:
+    return str(r.get("resource_id") or r.get("id") or "")
+
+def upsert_requests(db: Session, rows: List[Dict[str, Any]], *, merge: bool = False) -> int:
+    return _upsert(db, Request, Request.ai_request_id, rows, _request_key, _request_columns, merge)
+
+def upsert_resources(db: Session, rows: List[Dict[str, Any]], *, merge: bool = False) -> int:
+    return _upsert(db, Resource, Resource.ai_resource_id, rows, _resource_key, _resource_columns, merge)
+
+def _with_retry(work) -> Any:
+    # 다른 워커의 재조정/쓰기와 같은 id를 동시에 넣으면 unique 충돌이 날 수 있어 한 번 재시도
+    for attempt in range(2):
+        with SessionLocal() as db:
+            try:
+                out = work(db)
+                db.commit()
+                return out
+            except IntegrityError:
+                db.rollback()
+                if attempt:
+                    raise
+
+def _apply(requests: List[Dict[str, Any]], resources: List[Dict[str, Any]]) -> None:
+    def work(db: Session) -> None:
+        upsert_requests(db, requests, merge=True)
+        upsert_resources(db, resources, merge=True)
+    _with_retry(work)
+
+def _gone(db: Session, key_col, seen: set[str], fresh_col, started: datetime) -> List[str]:
+    # 스냅샷에 없는 행 중 스냅샷 시작 전에 마지막으로 반영된 것만 (그 뒤 쓰기 경로로 들어온 행은 다음 주기에 판단)
+    stmt = select(key_col).where(
+        key_col.is_not(None),
+        or_(fresh_col.is_(None), fresh_col < started),
+    )
+    return [k for k in db.execute(stmt).scalars() if k not in seen]
+
+def reconcile() -> Dict[str, int]:
+    """AI 서버 전체 목록으로 미러를 맞춘다. 더 이상 없는 행은 삭제 (스냅샷 시작 이후 반영된 행은 제외)."""
+    global _ready
+    started = datetime.utcnow()
+    requests = [_ensure_dict(r) for r in get_all_requests(status=None)]
+    resources = [_ensure_dict(r) for r in get_all_resources()]
+
+    def work(db: Session) -> Dict[str, int]:
+        n_req = upsert_requests(db, requests)
+        n_res = upsert_resources(db, resources)
+        gone_req = _gone(db, Request.ai_request_id, {_request_key(r) for r in requests}, Request.synced_at, started)
+        gone_res = _gone(
+            db, Resource.ai_resource_id, {_resource_key(r) for r in resources},
+            func.coalesce(Resource.synced_at, Resource.updated_at), started,
+        )
+        if gone_req:
+            db.execute(delete(Request).where(Request.ai_request_id.in_(gone_req)))
+        if gone_res:
+            db.execute(delete(Resource).where(Resource.ai_resource_id.in_(gone_res)))
+        return {"requests": n_req, "resources": n_res, "deleted": len(gone_req) + len(gone_res)}
+
+    stats = _with_retry(work)
+    _ready = True
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# 쓰기 경로에서 호출하는 증분 반영 (실패해도 사용자 요청은 성공 처리)
+# ---------------------------------------------------------------------------
+
+async def record(
+    *,
+    requests: Optional[List[Dict[str, Any]]] = None,
+    resources: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+    if not settings.MIRROR_ENABLED:
+        return
+    try:
+        await run_in_threadpool(_apply, requests or [], resources or [])
+    except Exception as e:
+        print(f"[경고] 미러 반영 실패(다음 재조정 때 보정): {e}")
+
+async def record_match(match: Dict[str, Any] | None) -> None:
+    # /match/* 응답에 포함된 자원/요청 스냅샷을 반영
+    m = _ensure_dict(match or {})
+    req = m.get("request") if isinstance(m.get("request"), dict) else None
+    res = m.get("resource") if isinstance(m.get("resource"), dict) else None
+    await record(
+        requests=[req] if req and _request_key(req) else None,
+        resources=[res] if res and _resource_key(res) else None,
+    )
+
+async def refresh_match(resource_id: Optional[str] = None, request_id: Optional[str] = None) -> None:
+    # 매칭 상태가 바뀐 뒤 /match/by_* 스냅샷으로 자원·요청 상태를 갱신
+    try:
+        if resource_id:
+            await record_match(await get_match_by_resource_async(resource_id))
+        if request_id:
+            await record_match(await get_match_by_request_async(request_id))
+    except Exception as e:
+        print(f"[경고] 미러 매칭 갱신 실패(다음 재조정 때 보정): {e}")
+
+def refresh_match_later(resource_id: Optional[str] = None, request_id: Optional[str] = None) -> None:
+    # 응답을 늦추지 않도록 백그라운드에서 갱신
+    if not settings.MIRROR_ENABLED:
+        return
+    t = asyncio.get_running_loop().create_task(refresh_match(resource_id, request_id))
+    _pending.add(t)
+    t.add_done_callback(_pending.discard)
+
+
+# ---------------------------------------------------------------------------
+# 조회 (인덱스 SQL + keyset)
+# ---------------------------------------------------------------------------
+
+def _page(db: Session, stmt, count_stmt, id_col, limit: Optional[int], offset: Optional[int], after_id: Optional[int]):
+    total = int(db.execute(count_stmt).scalar() or 0)
+    if after_id is not None:
+        stmt = stmt.where(id_col > after_id)
+    elif offset:
+        stmt = stmt.offset(offset)
+    stmt = stmt.order_by(id_col.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    objs = list(db.execute(stmt).unique().scalars())
+    next_after = objs[-1].id if objs and limit is not None and len(objs) == limit else None
+    return objs, total, next_after
+
+def query_requests(
+    *,
+    username: Optional[str] = None,
+    material_type: Optional[str] = None,
+    wanted_item: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> Page:
+    conds = [Request.ai_request_id.is_not(None)]
+    if username:
+        conds.append(Request.username == username)
+    if material_type:
+        conds.append(Request.material_type == material_type)
+    if status:
+        conds.append(Request.status == status)
+    if wanted_item:
+        conds.append(func.lower(Request.wanted_item).contains(wanted_item.lower(), autoescape=True))
+
+    with SessionLocal() as db:
+        objs, total, next_after = _page(
+            db,
+            select(Request).where(*conds),
+            select(func.count()).select_from(Request).where(*conds),
+            Request.id, limit, offset, after_id,
+        )
+        return [_request_row(o) for o in objs], total, next_after
+
+def query_resources(
+    *,
+    username: Optional[str] = None,
+    material_type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> Page:
+    conds = [Resource.ai_resource_id.is_not(None)]
+    if username:
+        conds.append(Resource.username == username)
+    if material_type:
+        conds.append(Resource.material_type == material_type)
+    if status:
+        conds.append(Resource.status == status)
+
+    with SessionLocal() as db:
+        objs, total, next_after = _page(
+            db,
+            select(Resource).where(*conds),
+            select(func.count()).select_from(Resource).where(*conds),
+            Resource.id, limit, offset, after_id,
+        )
+        return [_resource_row(o) for o in objs], total, next_after
+
+def get_requests_by_ids(request_ids: Iterable[str], status: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    ids = [str(x) for x in request_ids if x]
+    if not ids:
+        return {}
+    stmt = select(Request).where(Request.ai_request_id.in_(ids))
+    if status:
+        stmt = stmt.where(Request.status == status)
+    with SessionLocal() as db:
+        return {o.ai_request_id: _request_row(o) for o in db.execute(stmt).unique().scalars()}
+
+
+# ---------------------------------------------------------------------------
+# 백그라운드 재조정 루프 (main.py lifespan)
+# ---------------------------------------------------------------------------
+
+async def _sync_loop() -> None:
+    while True:
+        try:
+            stats = await run_in_threadpool(reconcile)
+            print(f"[미러] 재조정 완료 {stats}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[경고] 미러 재조정 실패: {e}")
+        await asyncio.sleep(settings.MIRROR_RECONCILE_INTERVAL)
+
+def start() -> None:
+    global _task
+    if settings.MIRROR_ENABLED and _task is None:
+        _task = asyncio.get_running_loop().create_task(_sync_loop())
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
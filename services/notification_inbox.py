@@ -0,0 +1,258 @@
+# services/notification_inbox.py
+# 사용자별 매칭 알림함 (notification_inbox). GET /notifications 는 AI fan-out 대신 인덱스 조회 한 번
+# - 쓰기: AI 웹훅 이벤트(services/ai_events.py)마다, 그리고 AI 조회로 목록을 다시 만들 때(sync) 한 줄씩.
+#   (user_id, resource_id:request_id:state) 가 유니크라 같은 변경은 몇 번 와도 한 줄
+# - 안 읽은 수는 notification_inbox_state.unread 를 INSERT/읽음 처리와 같은 트랜잭션에서 증감 (조회는 PK 한 번)
+# - synced_at 이 없거나 NOTIFY_INBOX_MAX_AGE 보다 오래되면 다음 조회 때 AI 에서 한 번 다시 채움
+#   (웹훅이 빠졌을 때의 안전망)
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, insert, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.utils import make_public_url
+from db.session import SessionLocal
+from models.notification import NotificationInbox, NotificationInboxState
+from models.user import User
+from schemas.notification import MatchProposalItem, RequestBrief, ResourceBrief
+
+SOURCE_EVENT = "event"
+SOURCE_SYNC = "sync"
+
+
+def _key(resource_id: Any, request_id: Any, state: str) -> str:
+    return f"{resource_id or ''}:{request_id or ''}:{state}"[:150]
+
+
+def _pub(url_or_path: Optional[str]) -> Optional[str]:
+    return make_public_url(url_or_path) if url_or_path else None
+
+
+def _s(x: Any) -> Optional[str]:
+    return str(x) if x is not None else None
+
+
+def _int(x: Any) -> Optional[int]:
+    try:
+        return int(x) if x is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def item_from_match(state: str, role: str, res: Dict[str, Any], req: Dict[str, Any]) -> MatchProposalItem:
+    """매칭 스냅샷의 resource/request dict 로 MatchProposalItem 생성 (웹훅 이벤트용)"""
+    return MatchProposalItem(
+        state=state,
+        role=role,
+        resource=ResourceBrief(
+            resource_id=str(res.get("resource_id") or res.get("id") or ""),
+            title=res.get("title"),
+            item_name=res.get("title") or res.get("item_name"),
+            description=res.get("description"),
+            amount=_s(res.get("amount")),
+            value=_int(res.get("value")),
+            username=res.get("username"),
+            item_type=res.get("item_type"),
+            material_type=res.get("material_type"),
+            image_url=_pub(res.get("image_url") or res.get("image_path")),
+            status=res.get("status"),
+        ),
+        request=RequestBrief(
+            request_id=str(req.get("request_id") or req.get("id") or ""),
+            item_name=req.get("item_name") or req.get("wanted_item") or req.get("title"),
+            title=req.get("title"),
+            amount=_s(req.get("amount") if req.get("amount") is not None else req.get("desired_amount")),
+            value=_int(req.get("value")),
+            description=req.get("description"),
+            username=req.get("username"),
+            item_type=req.get("item_type"),
+            material_type=req.get("material_type"),
+            image_url=_pub(req.get("image_path") or req.get("image_url")),
+            status=req.get("status"),
+            is_auto_written=bool(req.get("is_auto_written", False)),
+        ),
+    )
+
+
+# ---------------------------------------------------------------------------
+# 쓰기 (동기 세션: 웹훅 처리/동기화는 스레드풀에서)
+# ---------------------------------------------------------------------------
+
+def _insert_item(db: Session, values: Dict[str, Any]) -> bool:
+    """알림 한 줄 INSERT. (user_id, dedup_key) 가 이미 있으면 아무것도 안 하고 False"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql_insert(NotificationInbox).values(**values).prefix_with("IGNORE")
+    elif dialect in ("postgresql", "sqlite"):
+        ins = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = ins(NotificationInbox).values(**values).on_conflict_do_nothing(index_elements=["user_id", "dedup_key"])
+    else:
+        exists = db.execute(
+            select(NotificationInbox.id)
+            .where(NotificationInbox.user_id == values["user_id"], NotificationInbox.dedup_key == values["dedup_key"])
+            .limit(1)
+        ).scalar()
+        if exists is not None:
+            return False
+        stmt = insert(NotificationInbox).values(**values)
+    return db.execute(stmt).rowcount > 0
+
+
+def _bump_state(db: Session, user_id: int, unread: int, synced_at: Optional[datetime] = None) -> None:
+    # 상태 행이 없으면 만들고 unread += n (synced_at 이 주어지면 함께 갱신)
+    now = datetime.utcnow()
+    new_row = {"user_id": user_id, "unread": unread, "synced_at": synced_at, "updated_at": now}
+    changes = {"unread": NotificationInboxState.unread + unread, "updated_at": now}
+    if synced_at is not None:
+        changes["synced_at"] = synced_at
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        db.execute(mysql_insert(NotificationInboxState).values(**new_row).on_duplicate_key_update(**changes))
+    elif dialect in ("postgresql", "sqlite"):
+        ins = pg_insert if dialect == "postgresql" else sqlite_insert
+        db.execute(
+            ins(NotificationInboxState).values(**new_row).on_conflict_do_update(index_elements=["user_id"], set_=changes)
+        )
+    elif db.execute(
+        update(NotificationInboxState).where(NotificationInboxState.user_id == user_id).values(**changes)
+    ).rowcount == 0:
+        db.execute(insert(NotificationInboxState).values(**new_row))
+
+
+def _record(
+    db: Session,
+    user_id: int,
+    items: Iterable[MatchProposalItem],
+    *,
+    source: str,
+    unread_states: Iterable[str],
+    synced_at: Optional[datetime] = None,
+) -> int:
+    unread_states = set(unread_states)
+    added = unread = 0
+    for item in items:
+        res_id = item.resource.resource_id if item.resource else None
+        req_id = item.request.request_id if item.request else None
+        is_unread = item.state in unread_states
+        if _insert_item(db, {
+            "user_id": user_id,
+            "dedup_key": _key(res_id, req_id, item.state),
+            "state": item.state,
+            "role": item.role,
+            "resource_id": res_id,
+            "request_id": req_id,
+            "payload": item.model_dump(mode="json"),
+            "source": source,
+            "is_read": not is_unread,
+            "created_at": datetime.utcnow(),
+        }):
+            added += 1
+            unread += is_unread
+    if unread or synced_at is not None:
+        _bump_state(db, user_id, unread, synced_at)
+    return added
+
+
+def record_event(state: str, res: Dict[str, Any], req: Dict[str, Any], recipients: List[Tuple[str, str]]) -> int:
+    """웹훅 이벤트 하나를 당사자(username, role)들의 알림함에 기록. 새로 들어간 줄 수"""
+    if not recipients:
+        return 0
+    added = 0
+    with SessionLocal() as db:
+        ids = dict(db.execute(select(User.username, User.id).where(User.username.in_([u for u, _ in recipients]))).all())
+        for username, role in recipients:
+            if username in ids:
+                item = item_from_match(state, role, res, req)
+                added += _record(db, ids[username], [item], source=SOURCE_EVENT, unread_states=(state,))
+        db.commit()
+    return added
+
+
+def materialize(user_id: int, proposals: List[MatchProposalItem], *, complete: bool) -> int:
+    """AI 조회로 만든 목록을 알림함에 반영. complete(조회 실패 없음)일 때만 synced_at 갱신"""
+    with SessionLocal() as db:
+        added = _record(
+            db, user_id, proposals,
+            source=SOURCE_SYNC,
+            unread_states=("proposed",),      # 처리할 게 남은 제안만 안 읽음으로
+            synced_at=datetime.utcnow() if complete else None,
+        )
+        db.commit()
+    return added
+
+
+def mark_stale(user_id: int) -> None:
+    # 이 백엔드를 거친 매칭 쓰기(확정/수동 매칭) 뒤 호출: 다음 조회 때 AI 에서 다시 채움
+    with SessionLocal() as db:
+        db.execute(
+            update(NotificationInboxState).where(NotificationInboxState.user_id == user_id).values(synced_at=None)
+        )
+        db.commit()
+
+
+# ---------------------------------------------------------------------------
+# 읽기 (비동기 세션)
+# ---------------------------------------------------------------------------
+
+async def needs_sync(db: AsyncSession, user_id: int) -> bool:
+    st = await db.get(NotificationInboxState, user_id)
+    if st is None or st.synced_at is None:
+        return True
+    return st.synced_at < datetime.utcnow() - timedelta(seconds=settings.NOTIFY_INBOX_MAX_AGE)
+
+
+async def list_page(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    state: Optional[str] = None,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+) -> Tuple[List[MatchProposalItem], Optional[int]]:
+    """최신순 keyset 페이지. (items, 다음 페이지의 before_id 또는 None)"""
+    N = NotificationInbox
+    stmt = select(N).where(N.user_id == user_id)
+    if state:
+        stmt = stmt.where(N.state == state)
+    if before_id is not None:
+        cur = select(N.created_at).where(N.id == before_id, N.user_id == user_id).scalar_subquery()
+        stmt = stmt.where(or_(N.created_at < cur, and_(N.created_at == cur, N.id < before_id)))
+    rows = (await db.scalars(stmt.order_by(N.created_at.desc(), N.id.desc()).limit(limit))).all()
+
+    items = []
+    for row in rows:
+        item = MatchProposalItem.model_validate(row.payload)
+        item.notification_id = row.id
+        item.is_read = row.is_read
+        item.created_at = row.created_at
+        items.append(item)
+    next_before = rows[-1].id if len(rows) == limit else None
+    return items, next_before
+
+
+async def unread_count(db: AsyncSession, user_id: int) -> int:
+    n = await db.scalar(select(NotificationInboxState.unread).where(NotificationInboxState.user_id == user_id))
+    return max(0, n or 0)
+
+
+async def mark_read(db: AsyncSession, user_id: int, ids: Optional[List[int]] = None) -> int:
+    """ids(없으면 전부)를 읽음 처리하고 남은 안 읽은 수 반환"""
+    N, S = NotificationInbox, NotificationInboxState
+    stmt = update(N).where(N.user_id == user_id, N.is_read.is_(False))
+    if ids is not None:
+        stmt = stmt.where(N.id.in_(ids))
+    changed = (await db.execute(stmt.values(is_read=True, read_at=datetime.utcnow()))).rowcount
+    if ids is None:
+        remaining: Any = 0        # 전체 읽음이면 카운터를 0 으로 맞춤 (어긋났어도 여기서 복구)
+    else:
+        remaining = case((S.unread > changed, S.unread - changed), else_=0)
+    if changed or ids is None:
+        await db.execute(update(S).where(S.user_id == user_id).values(unread=remaining, updated_at=datetime.utcnow()))
+    await db.commit()
+    return await unread_count(db, user_id)
@@ -0,0 +1,222 @@
+# services/notification_stream.py
+# GET /notifications/stream (Server-Sent Events) 구독자 관리
+# - 이 프로세스가 처리한 AI 이벤트는 ai_events 리스너로 바로 전달
+# - 다른 워커 프로세스가 처리한 이벤트는 ai_events 테이블을 NOTIFY_STREAM_POLL 마다 이어 읽어 전달
+#   (구독자가 없으면 조회하지 않음). 두 경로로 같은 이벤트가 와도 연결별로 id 중복 제거
+# - SSE id = ai_events.id 라서 Last-Event-ID 로 끊긴 지점부터 재개.
+#   재개 범위(NOTIFY_STREAM_REPLAY_MAX)를 넘으면 reset 이벤트 → 클라이언트가 GET /notifications 를 한 번 다시 조회
+import asyncio
+import json
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+
+from core.config import settings
+from db.session import SessionLocal
+from models.ai_event import EVENT_PROCESSED, EVENT_RECEIVED, AIEvent
+from schemas.ai_event import AIEventIn
+from services import ai_events
+
+# 처리 중(received)인 행은 lease 동안만 기다렸다가 건너뜀 (처리하던 프로세스가 죽은 경우. 그 뒤엔 재전송이 다시 가져감)
+_RECEIVED_GRACE = ai_events.RECEIVED_LEASE
+# 커서가 지나간 failed/멈춘 received 행은 따로 기억해 두었다가 재전송/재처리로 processed 가 되면 그때 전달
+# (오래된 것부터 이 개수를 넘으면 잊음. 그 뒤엔 Last-Event-ID 재개나 GET /notifications 로만 보임)
+_PENDING_MAX = 1000
+
+
+class _Subscription:
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.NOTIFY_STREAM_QUEUE))
+        self.overflow = False
+        self.closed = False
+
+    def offer(self, msg: Optional[Dict[str, Any]]) -> None:
+        try:
+            self.queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            self.overflow = True        # 느린 클라이언트: 밀린 것은 버리고 reset 으로 다시 조회하게 함
+
+
+_subs: Dict[str, Set[_Subscription]] = {}
+_task: Optional[asyncio.Task] = None
+_counters = {"connections": 0, "sent": 0, "replayed": 0, "resets": 0, "tailed": 0}
+
+
+def start() -> None:
+    global _task
+    if _task is not None:
+        return
+    ai_events.subscribe(_on_event)
+    _task = asyncio.get_running_loop().create_task(_tail_loop())
+
+
+async def stop() -> None:
+    global _task
+    ai_events.unsubscribe(_on_event)
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+    # 열린 스트림을 끝내 종료가 막히지 않도록
+    for subs in _subs.values():
+        for sub in subs:
+            sub.closed = True
+            sub.offer(None)
+
+
+def _deliver(username: str, msg: Dict[str, Any]) -> None:
+    for sub in _subs.get(username, ()):
+        sub.offer(msg)
+
+
+async def _on_event(username: str, msg: Dict[str, Any]) -> None:
+    _deliver(username, msg)
+
+
+# ---------------------------------------------------------------------------
+# ai_events 이어 읽기
+# ---------------------------------------------------------------------------
+
+def _row_message(row: AIEvent) -> Tuple[Dict[str, Any], List[str]]:
+    event = AIEventIn.model_validate(row.payload)
+    return ai_events.message(row.id, event), list((row.result or {}).get("notified") or [])
+
+
+def _max_id() -> int:
+    with SessionLocal() as db:
+        return int(db.scalar(select(func.max(AIEvent.id))) or 0)
+
+
+def _tail(cursor: int, pending: Dict[int, None]) -> Tuple[int, List[Tuple[Dict[str, Any], List[str]]]]:
+    out = []
+    grace = datetime.utcnow() - _RECEIVED_GRACE
+    with SessionLocal() as db:
+        if pending:
+            rows = db.scalars(select(AIEvent).where(AIEvent.id.in_(list(pending)))).all()
+            alive = set()
+            for row in rows:
+                if row.status == EVENT_PROCESSED:
+                    out.append(_row_message(row))
+                else:
+                    alive.add(row.id)
+            for event_id in list(pending):
+                if event_id not in alive:
+                    del pending[event_id]       # 전달했거나 정리되어 사라진 행
+        rows = db.scalars(
+            select(AIEvent).where(AIEvent.id > cursor).order_by(AIEvent.id).limit(500)
+        ).all()
+        for row in rows:
+            if row.status == EVENT_RECEIVED and row.received_at > grace:
+                break       # 아직 처리 중: 다음 조회에서 다시 봄 (id 순서 유지)
+            if row.status == EVENT_PROCESSED:
+                out.append(_row_message(row))
+            else:
+                pending[row.id] = None
+            cursor = row.id
+    while len(pending) > _PENDING_MAX:
+        del pending[next(iter(pending))]
+    return cursor, out
+
+
+async def _tail_loop() -> None:
+    cursor: Optional[int] = None
+    pending: Dict[int, None] = {}   # 삽입 순서 = id 순서
+    while True:
+        await asyncio.sleep(max(0.2, settings.NOTIFY_STREAM_POLL))
+        if not _subs:
+            cursor = None       # 구독자가 생기면 그 시점부터 (이전 것은 Last-Event-ID 재개로)
+            pending.clear()
+            continue
+        try:
+            if cursor is None:
+                cursor = await run_in_threadpool(_max_id)
+                continue
+            cursor, found = await run_in_threadpool(_tail, cursor, pending)
+            for msg, usernames in found:
+                for username in usernames:
+                    _deliver(username, msg)
+            _counters["tailed"] += len(found)
+        except Exception as e:
+            print(f"[경고] 알림 스트림 이벤트 조회 실패: {e}")
+
+
+def _history(username: str, after_id: int) -> Optional[List[Dict[str, Any]]]:
+    # after_id 이후 username 에게 간 이벤트. 재개 범위를 넘으면 None
+    limit = max(1, settings.NOTIFY_STREAM_REPLAY_MAX)
+    with SessionLocal() as db:
+        rows = db.scalars(
+            select(AIEvent)
+            .where(AIEvent.id > after_id, AIEvent.status == EVENT_PROCESSED)
+            .order_by(AIEvent.id)
+            .limit(limit + 1)
+        ).all()
+    if len(rows) > limit:
+        return None
+    return [msg for msg, usernames in map(_row_message, rows) if username in usernames]
+
+
+# ---------------------------------------------------------------------------
+# SSE
+# ---------------------------------------------------------------------------
+
+def _sse(msg: Dict[str, Any]) -> str:
+    return f"id: {msg['id']}\nevent: match\ndata: {json.dumps(msg, ensure_ascii=False, default=str)}\n\n"
+
+
+def _reset() -> str:
+    _counters["resets"] += 1
+    return 'event: reset\ndata: {"reason": "resync"}\n\n'
+
+
+async def stream(username: str, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """username 에게 가는 매칭 이벤트를 SSE 형식 문자열로 계속 내보냄 (heartbeat 포함)"""
+    sub = _Subscription()
+    _subs.setdefault(username, set()).add(sub)     # 재개분 조회 전에 등록 (그 사이 이벤트 유실 방지)
+    _counters["connections"] += 1
+    sent: deque = deque(maxlen=256)
+    try:
+        yield f"retry: {int(settings.NOTIFY_STREAM_RETRY * 1000)}\n\n"
+        if last_event_id is not None:
+            backlog = await run_in_threadpool(_history, username, last_event_id)
+            if backlog is None:
+                yield _reset()
+            else:
+                for msg in backlog:
+                    sent.append(msg["id"])
+                    _counters["replayed"] += 1
+                    yield _sse(msg)
+
+        heartbeat = max(1.0, settings.NOTIFY_STREAM_HEARTBEAT)
+        while True:
+            try:
+                msg = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if msg is None or sub.closed:
+                return
+            if sub.overflow:
+                sub.overflow = False
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                yield _reset()
+                continue
+            if msg["id"] in sent:
+                continue
+            sent.append(msg["id"])
+            _counters["sent"] += 1
+            yield _sse(msg)
+    finally:
+        subs = _subs.get(username)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                _subs.pop(username, None)
+        _counters["connections"] -= 1
+
+
+def stats() -> Dict[str, Any]:
+    return {"users": len(_subs), **_counters}
@@ -1,7 +1,12 @@
 # services/point_service.py
 from typing import Tuple, Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func    
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import case, insert, literal, select, update, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models.point import PointWallet, PointLedger
 
 _LEVEL_TABLE = [
@@ -12,6 +17,18 @@ _LEVEL_TABLE = [
     (10000, "지구 영웅"),        # Lv5
 ]
 
+def _level_case(lifetime):
+    # _calc_level_info 와 같은 기준을 SQL CASE 로 (지갑 upsert 문 안에서 레벨 계산)
+    return case(
+        *[(lifetime >= min_pt, idx + 1) for idx, (min_pt, _t) in reversed(list(enumerate(_LEVEL_TABLE)))],
+        else_=1,
+    )
+
+
+def _level_title(level: int) -> str:
+    return _LEVEL_TABLE[max(1, min(level, len(_LEVEL_TABLE))) - 1][1]
+
+
 def _calc_level_info(balance: int) -> Tuple[int, str]:
     chosen_level_idx = 0
     for idx, (min_pt, _title) in enumerate(_LEVEL_TABLE):
@@ -51,35 +68,208 @@ def get_lifetime_earned(db: Session, user_id: int) -> int:
     return int(total or 0)
 
 
-def get_balance_status(db: Session, user_id: int) -> Dict[str, Any]:
-    balance = get_balance(db, user_id)
-    lifetime = get_lifetime_earned(db, user_id)
-    level_num, level_title = _calc_level_info(lifetime) 
+def _balance_status(wallet: PointWallet | None) -> Dict[str, Any]:
+    balance = int(wallet.balance or 0) if wallet else 0
+    lifetime = int(wallet.lifetime_earned or 0) if wallet else 0
+    level_num = int(wallet.level or 1) if wallet else 1
 
     return {
         "balance": balance,
         "lifetime_earned": lifetime,
         "level": level_num,
-        "title": level_title,
+        "title": _level_title(level_num),
     }
 
 
-def get_history(db: Session, user_id: int, limit: int = 20, before_id: int | None = None):
+def get_balance_status(db: Session, user_id: int) -> Dict[str, Any]:
+    # 지갑 한 줄(PK)만 읽음. lifetime_earned/level 은 award 에서 함께 갱신됨
+    return _balance_status(db.get(PointWallet, user_id))
+
+
+async def get_balance_status_async(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    return _balance_status(await db.get(PointWallet, user_id))
+
+
+def check_wallet_consistency(db: Session, *, fix: bool = False) -> List[Dict[str, Any]]:
+    """
+    지갑의 balance / lifetime_earned / level 을 원장 합계와 비교해 어긋난 지갑 목록을 돌려준다.
+    원장 집계에서 출발해 지갑을 LEFT JOIN 하므로 원장은 있는데 지갑이 없는 사용자도 잡힌다 (wallet=None).
+    원장이 없는데 0 이 아닌 지갑도 포함. fix=True 면 원장 기준으로 고치거나 지갑을 만든다 (커밋은 호출하는 쪽에서).
+    """
+    earned = func.coalesce(func.sum(case((PointLedger.delta > 0, PointLedger.delta), else_=0)), 0)
+    sums = (
+        select(
+            PointLedger.user_id.label("user_id"),
+            func.coalesce(func.sum(PointLedger.delta), 0).label("balance"),
+            earned.label("lifetime_earned"),
+        )
+        .group_by(PointLedger.user_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            sums.c.user_id,
+            PointWallet.user_id,
+            PointWallet.balance,
+            PointWallet.lifetime_earned,
+            PointWallet.level,
+            sums.c.balance,
+            sums.c.lifetime_earned,
+        ).outerjoin(PointWallet, PointWallet.user_id == sums.c.user_id)
+    ).all()
+    # 원장 없이 값만 있는 지갑 (원장 기준 0/0/Lv1)
+    orphans = db.execute(
+        select(
+            PointWallet.user_id,
+            PointWallet.user_id,
+            PointWallet.balance,
+            PointWallet.lifetime_earned,
+            PointWallet.level,
+            literal(0),
+            literal(0),
+        )
+        .outerjoin(sums, sums.c.user_id == PointWallet.user_id)
+        .where(sums.c.user_id.is_(None))
+    ).all()
+
+    out: List[Dict[str, Any]] = []
+    for user_id, wallet_id, balance, lifetime, level, exp_balance, exp_lifetime in [*rows, *orphans]:
+        exp_balance, exp_lifetime = int(exp_balance), int(exp_lifetime)
+        exp_level, _title = _calc_level_info(exp_lifetime)
+        has_wallet = wallet_id is not None
+        if has_wallet and (balance, lifetime, level) == (exp_balance, exp_lifetime, exp_level):
+            continue
+        out.append({
+            "user_id": user_id,
+            "wallet": {"balance": balance, "lifetime_earned": lifetime, "level": level} if has_wallet else None,
+            "ledger": {"balance": exp_balance, "lifetime_earned": exp_lifetime, "level": exp_level},
+        })
+        if not fix:
+            continue
+        values = {"balance": exp_balance, "lifetime_earned": exp_lifetime, "level": exp_level}
+        if has_wallet:
+            db.execute(update(PointWallet).where(PointWallet.user_id == user_id).values(**values))
+        else:
+            db.execute(insert(PointWallet).values(user_id=user_id, **values))
+    return out
+
+
+def _history_stmt(user_id: int, limit: int, before_id: int | None):
     stmt = select(PointLedger).where(PointLedger.user_id == user_id)
     if before_id:
         stmt = stmt.where(PointLedger.id < before_id)
-    stmt = stmt.order_by(PointLedger.id.desc()).limit(limit)
-    rows = list(db.execute(stmt).scalars())
-    next_before_id = rows[-1].id if rows and len(rows) == limit else None
-    return rows, next_before_id
+    return stmt.order_by(PointLedger.id.desc()).limit(limit)
 
-def get_all(db: Session, user_id: int) -> List[PointLedger]:
-    stmt = (
+def _next_before_id(rows: List[PointLedger], limit: int) -> int | None:
+    return rows[-1].id if rows and len(rows) == limit else None
+
+def get_history(db: Session, user_id: int, limit: int = 20, before_id: int | None = None):
+    rows = list(db.execute(_history_stmt(user_id, limit, before_id)).scalars())
+    return rows, _next_before_id(rows, limit)
+
+async def get_history_async(db: AsyncSession, user_id: int, limit: int = 20, before_id: int | None = None):
+    rows = list((await db.execute(_history_stmt(user_id, limit, before_id))).scalars())
+    return rows, _next_before_id(rows, limit)
+
+def _all_stmt(user_id: int):
+    return (
         select(PointLedger)
         .where(PointLedger.user_id == user_id)
         .order_by(PointLedger.id.desc())
     )
-    return list(db.execute(stmt).scalars())
+
+def get_all(db: Session, user_id: int) -> List[PointLedger]:
+    return list(db.execute(_all_stmt(user_id)).scalars())
+
+async def get_all_async(db: AsyncSession, user_id: int) -> List[PointLedger]:
+    return list((await db.execute(_all_stmt(user_id))).scalars())
+
+
+def _insert_ledger(db: Session, values: Dict[str, Any]) -> bool:
+    """원장 한 줄 INSERT. idempotency_key 가 이미 있으면 아무것도 안 하고 False."""
+    dialect = db.get_bind().dialect.name
+    if not values.get("idempotency_key"):
+        db.execute(insert(PointLedger).values(**values))
+        return True
+    if dialect == "mysql":
+        stmt = mysql_insert(PointLedger).values(**values).prefix_with("IGNORE")
+    elif dialect == "postgresql":
+        stmt = pg_insert(PointLedger).values(**values).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(PointLedger).values(**values).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    else:
+        exists = db.execute(
+            select(PointLedger.id).where(PointLedger.idempotency_key == values["idempotency_key"]).limit(1)
+        ).scalar()
+        if exists is not None:
+            return False
+        stmt = insert(PointLedger).values(**values)
+    return db.execute(stmt).rowcount > 0
+
+
+def _increment_wallet(db: Session, user_id: int, amount: int) -> int:
+    """
+    지갑이 없으면 만들고 balance += amount, lifetime_earned += max(amount, 0), level 재계산을
+    한 문장으로 적용한 뒤 잔액 반환.
+    """
+    dialect = db.get_bind().dialect.name
+    earned = max(int(amount), 0)
+    new_row = {
+        "user_id": user_id,
+        "balance": amount,
+        "lifetime_earned": earned,
+        "level": _calc_level_info(earned)[0],
+    }
+    if dialect == "mysql":
+        # LAST_INSERT_ID(expr) 로 갱신된 잔액을 추가 SELECT 없이 돌려받음 (INSERT 로 새로 만든 경우는 amount)
+        # MySQL 은 SET 을 왼쪽부터 적용하므로 level 은 lifetime_earned 를 바꾸기 전에 계산
+        stmt = mysql_insert(PointWallet).values(**new_row)
+        lifetime = PointWallet.lifetime_earned + stmt.inserted.lifetime_earned
+        stmt = stmt.on_duplicate_key_update([
+            ("level", _level_case(lifetime)),
+            ("lifetime_earned", lifetime),
+            ("balance", func.last_insert_id(PointWallet.balance + stmt.inserted.balance)),
+        ])
+        res = db.execute(stmt)
+        if res.rowcount == 1:
+            return amount
+        balance = int(res.lastrowid)
+        return balance - (1 << 64) if balance >= (1 << 63) else balance   # BIGINT UNSIGNED → 음수 잔액 복원
+    if dialect in ("postgresql", "sqlite"):
+        ins = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = ins(PointWallet).values(**new_row)
+        lifetime = PointWallet.lifetime_earned + stmt.excluded.lifetime_earned
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "balance": PointWallet.balance + stmt.excluded.balance,
+                "lifetime_earned": lifetime,
+                "level": _level_case(lifetime),
+            },
+        ).returning(PointWallet.balance)
+        return int(db.execute(stmt).scalar_one())
+
+    lifetime = PointWallet.lifetime_earned + earned
+    if db.execute(
+        update(PointWallet)
+        .where(PointWallet.user_id == user_id)
+        .values(balance=PointWallet.balance + amount, lifetime_earned=lifetime, level=_level_case(lifetime))
+    ).rowcount == 0:
+        db.execute(insert(PointWallet).values(**new_row))
+    return int(db.execute(select(PointWallet.balance).where(PointWallet.user_id == user_id)).scalar_one())
+
+
+def _balance_if_duplicate(db: Session, user_id: int, idempotency_key: str) -> int:
+    # INSERT IGNORE 는 중복 말고 다른 오류(FK 등)도 삼키므로 키가 실제로 있는지 잔액과 한 번에 확인
+    row = db.execute(
+        select(
+            select(PointLedger.id).where(PointLedger.idempotency_key == idempotency_key).limit(1).scalar_subquery(),
+            select(PointWallet.balance).where(PointWallet.user_id == user_id).scalar_subquery(),
+        )
+    ).one()
+    if row[0] is None:
+        raise ValueError(f"포인트 원장 기록 실패: user_id={user_id}, key={idempotency_key}")
+    return int(row[1] or 0)
 
 
 def award(
@@ -92,31 +282,34 @@ def award(
     item_amount: float | None = None,
     idempotency_key: str | None = None,
 ) -> int:
+    """
+    포인트 지급(차감). 같은 idempotency_key 는 한 번만 반영된다.
+    원장 INSERT(uq_point_ledger_idemp 로 중복 차단) + 지갑 원자적 증가, 두 문장으로 끝나며
+    여러 파드에서 동시에 호출해도 잔액 갱신이 유실되지 않는다. 커밋은 호출하는 쪽에서.
+    """
     if amount == 0:
         return get_balance(db, user_id)
 
-    if idempotency_key:
-        exists_stmt = (
-            select(PointLedger.id)
-            .where(PointLedger.idempotency_key == idempotency_key)
-            .limit(1)
-        )
-        if db.execute(exists_stmt).scalar() is not None:
-            return get_balance(db, user_id)
+    inserted = _insert_ledger(db, {
+        "user_id": user_id,
+        "delta": int(amount),
+        "ref_type": ref_type,
+        "ref_id": str(ref_id) if ref_id is not None else None,
+        "item_title": item_title,
+        "item_amount": item_amount,
+        "idempotency_key": idempotency_key,
+    })
+    if not inserted:
+        return _balance_if_duplicate(db, user_id, idempotency_key)
+
+    balance = _increment_wallet(db, user_id, int(amount))
+    # 세션에 올라와 있던 지갑 객체는 옛 잔액이므로 다음 접근 때 다시 읽게 함
+    wallet = db.identity_map.get(identity_key(PointWallet, user_id))
+    if wallet is not None:
+        db.expire(wallet)
+    return balance
 
-    wallet = _get_or_create_wallet(db, user_id)
-    wallet.balance = (wallet.balance or 0) + int(amount)
-
-    entry = PointLedger(
-        user_id=user_id,
-        delta=int(amount),
-        ref_type=ref_type,
-        ref_id=str(ref_id) if ref_id is not None else None,
-        item_title=item_title,      
-        item_amount=item_amount,   
-        idempotency_key=idempotency_key,
-    )
-    db.add(entry)
-    db.flush()
-    return int(wallet.balance)
 
+async def award_async(db: AsyncSession, user_id: int, amount: int, **kwargs: Any) -> int:
+    # 같은 문장/방언 분기를 그대로 쓰되 I/O 는 이벤트 루프에서 (AsyncSession.run_sync)
+    return await db.run_sync(lambda sync_db: award(sync_db, user_id, amount, **kwargs))
@@ -0,0 +1,87 @@
+# services/request_index.py
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.config import settings
+from services.ai_client import get_all_requests_async
+
+
+def _row_id(r: Dict[str, Any]) -> str:
+    return str(r.get("request_id") or r.get("id") or "")
+
+
+class RequestIndex:
+    """
+    AI 서버 요청 목록을 request_id 로 색인해 두는 프로세스 내 인덱스.
+    - 목록 조회 때 받은 행과 우리가 생성한 요청은 그때그때 upsert
+    - 전체 재적재는 REQUEST_INDEX_TTL 마다, 혹은 미스가 나도 REQUEST_INDEX_MISS_REFRESH 간격으로만
+    """
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: float = 0.0      # 마지막 전체 적재 시각(monotonic)
+        self._lock = asyncio.Lock()
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        rid = _row_id(row)
+        if rid:
+            self._rows[rid] = {**self._rows.get(rid, {}), **row}
+
+    def upsert_many(self, rows: Iterable[Dict[str, Any]], *, complete: bool = False) -> None:
+        # complete=True 는 상태 필터 없이 받은 전체 목록 → 인덱스를 통째로 교체
+        if complete:
+            self._rows = {rid: r for r in rows if (rid := _row_id(r))}
+            self._loaded_at = time.monotonic()
+            return
+        for r in rows:
+            self.upsert(r)
+
+    def discard(self, request_id: str) -> None:
+        self._rows.pop(str(request_id), None)
+
+    def _age(self) -> float:
+        return time.monotonic() - self._loaded_at
+
+    async def _refresh(self, *, min_age: float) -> None:
+        async with self._lock:
+            # 대기하는 동안 다른 코루틴이 이미 적재했으면 건너뜀
+            if self._loaded_at and self._age() < min_age:
+                return
+            rows = await get_all_requests_async(status=None)
+            self.upsert_many(rows, complete=True)
+
+    async def _ensure_fresh(self) -> None:
+        if not self._loaded_at or self._age() >= settings.REQUEST_INDEX_TTL:
+            await self._refresh(min_age=settings.REQUEST_INDEX_TTL)
+
+    @staticmethod
+    def _status_ok(row: Dict[str, Any], status: Optional[str]) -> bool:
+        return not status or row.get("status") == status
+
+    async def get(self, request_id: str, *, status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        rid = str(request_id)
+        await self._ensure_fresh()
+        row = self._rows.get(rid)
+        if row is None and self._age() >= settings.REQUEST_INDEX_MISS_REFRESH:
+            await self._refresh(min_age=settings.REQUEST_INDEX_MISS_REFRESH)
+            row = self._rows.get(rid)
+        if row is None or not self._status_ok(row, status):
+            return None
+        return row
+
+    async def get_many(self, request_ids: Iterable[str], *, status: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        ids = {str(x) for x in request_ids if x}
+        if not ids:
+            return {}
+        await self._ensure_fresh()
+        missing: List[str] = [i for i in ids if i not in self._rows]
+        if missing and self._age() >= settings.REQUEST_INDEX_MISS_REFRESH:
+            await self._refresh(min_age=settings.REQUEST_INDEX_MISS_REFRESH)
+        return {
+            i: row for i in ids
+            if (row := self._rows.get(i)) is not None and self._status_ok(row, status)
+        }
+
+
+request_index = RequestIndex()
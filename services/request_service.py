@@ -1,9 +1,18 @@
 # services/request_service.py
 from typing import Iterable, List, Dict, Any, Tuple, Optional
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from uuid import uuid4
+from core.uploads import SavedUpload
+from db.session import SessionLocal
+from models.ai_outbox import AIOutbox
 from models.user import User
-from services.ai_client import get_all_requests
+from services.ai_client import create_request_on_ai_async, get_all_requests_async
+from services.request_index import request_index
+from services import ai_outbox, mirror_service, upload_store
+
+OP_REQUEST_CREATE = "request.create"
 
 
 def get_user_by_username(db: Session, username: str) -> User | None:
@@ -30,20 +39,48 @@ def _paginate(rows: List[Dict[str, Any]], limit: Optional[int], offset: Optional
         return rows
     return rows[(offset or 0): (offset or 0) + limit]
 
-def list_pending_from_ai(
+async def list_requests_page(
+    *,
+    username: Optional[str] = None,
     material_type: Optional[str],
     wanted_item: Optional[str],
     status: Optional[str],
     limit: Optional[int],
     offset: Optional[int],
-) -> Tuple[List[Dict[str, Any]], int]:
-    rows = get_all_requests(status=status)
-    rows = _filter_requests(rows, material_type, wanted_item, username=None)
+    after_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], int, Optional[int]]:
+    # 미러가 준비됐으면 인덱스 SQL(keyset), 아니면 AI 전체 목록을 받아 메모리에서 필터
+    if mirror_service.is_ready():
+        return await run_in_threadpool(
+            mirror_service.query_requests,
+            username=username,
+            material_type=material_type,
+            wanted_item=wanted_item,
+            status=status,
+            limit=limit,
+            offset=offset,
+            after_id=after_id,
+        )
+    rows = await get_all_requests_async(status=status)
+    request_index.upsert_many(rows, complete=status is None)
+    rows = _filter_requests(rows, material_type, wanted_item, username=username)
     total = len(rows)
     rows = _paginate(rows, limit, offset)
+    return rows, total, None
+
+async def list_pending_from_ai(
+    material_type: Optional[str],
+    wanted_item: Optional[str],
+    status: Optional[str],
+    limit: Optional[int],
+    offset: Optional[int],
+) -> Tuple[List[Dict[str, Any]], int]:
+    rows, total, _next = await list_requests_page(
+        material_type=material_type, wanted_item=wanted_item, status=status, limit=limit, offset=offset,
+    )
     return rows, total
 
-def list_by_user_from_ai(
+async def list_by_user_from_ai(
     username: str,
     material_type: Optional[str],
     wanted_item: Optional[str],
@@ -51,44 +88,98 @@ def list_by_user_from_ai(
     limit: Optional[int],
     offset: Optional[int],
 ) -> Tuple[List[Dict[str, Any]], int]:
-    rows = get_all_requests(status=status)
-    rows = _filter_requests(rows, material_type, wanted_item, username=username)
-    total = len(rows)
-    rows = _paginate(rows, limit, offset)
+    rows, total, _next = await list_requests_page(
+        username=username, material_type=material_type, wanted_item=wanted_item,
+        status=status, limit=limit, offset=offset,
+    )
     return rows, total
 
-def get_by_id_from_ai(request_id: str, *, status: Optional[str] = None) -> Optional[dict]:
+async def get_by_id_from_ai(request_id: str, *, status: Optional[str] = None) -> Optional[dict]:
     if not request_id:
         return None
+    if mirror_service.is_ready():
+        found = await run_in_threadpool(mirror_service.get_requests_by_ids, [request_id], status)
+        if found:
+            return found.get(str(request_id))
+    return await request_index.get(request_id, status=status)
 
-    rows, _total = list_pending_from_ai(
-        material_type=None,
-        wanted_item=None,
-        status=status,
-        limit=100_000,
-        offset=0,
-    )
-    for r in rows or []:
-        rid = str(r.get("request_id") or r.get("id") or "")
-        if rid == str(request_id):
-            return r
-    return None
-
-def get_map_by_ids_from_ai(request_ids: Iterable[str], *, status: Optional[str] = None) -> Dict[str, dict]:
-    ids = {str(x) for x in (request_ids or []) if x}
-    if not ids:
-        return {}
-
-    rows, _total = list_pending_from_ai(
-        material_type=None,
-        wanted_item=None,
-        status=status,
-        limit=100_000,
-        offset=0,
-    )
-    out: Dict[str, dict] = {}
-    for r in rows or []:
-        rid = str(r.get("request_id") or r.get("id") or "")
-        if rid in ids:
-            out[rid] = r
-    return out
\ No newline at end of file
+async def get_map_by_ids_from_ai(request_ids: Iterable[str], *, status: Optional[str] = None) -> Dict[str, dict]:
+    ids = [str(x) for x in (request_ids or []) if x]
+    if mirror_service.is_ready():
+        found = await run_in_threadpool(mirror_service.get_requests_by_ids, ids, status)
+        missing = [i for i in ids if i not in found]
+        if not missing:
+            return found
+        return {**await request_index.get_many(missing, status=status), **found}
+    return await request_index.get_many(ids, status=status)
+
+async def remember_created_request(request_id: str, payload: Dict[str, Any], status: str = "pending") -> None:
+    # 방금 AI 서버에 생성한 요청을 인덱스/미러에 바로 반영 (다음 전체 적재 때 원본으로 덮어씀)
+    row = {**payload, "request_id": str(request_id), "status": status}
+    request_index.upsert(row)
+    await mirror_service.record(requests=[row])
+
+
+def request_data(ai_resp: Any) -> Dict[str, Any]:
+    if isinstance(ai_resp, dict) and isinstance(ai_resp.get("data"), dict):
+        return ai_resp["data"]
+    return ai_resp if isinstance(ai_resp, dict) else {}
+
+def _enqueue_request(db: Session, username: str, payload: Dict[str, Any], sha256: Optional[str], claim: bool) -> AIOutbox:
+    # AI 등록 작업과 이미지 참조(outbox)를 한 트랜잭션으로: 전달 전에 GC 가 이미지를 지우지 않게
+    try:
+        row = ai_outbox.add(
+            db, OP_REQUEST_CREATE,
+            entity_key=f"request:{uuid4().hex}",     # 새 요청끼리는 순서 제약 없음
+            username=username,
+            payload={**payload, "_sha256": sha256},
+            claim=claim,
+        )
+        if sha256:
+            upload_store.hold_ref(db, sha256, "outbox", row.public_id)
+        db.commit()
+        return row
+    except Exception:
+        db.rollback()
+        raise
+
+async def register_request(
+    db: Session,
+    username: str,
+    payload: Dict[str, Any],
+    saved: Optional[SavedUpload] = None,
+    *,
+    wait: bool = True,
+) -> ai_outbox.Delivery:
+    """요청 등록을 outbox 에 기록하고 wait 면 바로 한 번 전달. 재시도해도 안 될 실패는 원래 예외를 그대로 올림"""
+    row = await run_in_threadpool(_enqueue_request, db, username, payload, saved.sha256 if saved else None, wait)
+    delivery = await ai_outbox.submit(row, claim=wait)
+    if delivery.dead and delivery.error is not None:
+        raise delivery.error
+    return delivery
+
+async def _send_request(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    ai_resp = await create_request_on_ai_async({k: v for k, v in payload.items() if not k.startswith("_")})
+    base = request_data(ai_resp)
+    request_id = base.get("request_id") or base.get("id") or base.get("requestId")
+    if not request_id:
+        raise ValueError(f"AI 응답 파싱 실패: request_id 없음. raw={ai_resp}")
+    return ai_resp, str(request_id)
+
+def _release_outbox_ref(public_id: str) -> None:
+    with SessionLocal() as db:
+        upload_store.drop_ref(db, "outbox", public_id)
+        db.commit()
+
+async def _after_request(row: AIOutbox, ai_resp: Dict[str, Any]) -> None:
+    payload = {k: v for k, v in row.payload.items() if not k.startswith("_")}
+    sha256 = row.payload.get("_sha256")
+    if sha256:
+        await upload_store.add_ref(sha256, "request", row.ai_id)
+        await run_in_threadpool(_release_outbox_ref, row.public_id)
+    await remember_created_request(row.ai_id, payload, status=request_data(ai_resp).get("status", "pending"))
+
+def _request_dead(db: Session, row: AIOutbox) -> None:
+    upload_store.drop_ref(db, "outbox", row.public_id)
+
+ai_outbox.register(OP_REQUEST_CREATE, _send_request, after=_after_request, on_dead=_request_dead)
@@ -3,22 +3,56 @@ from typing import Any, Dict, List, Tuple, Optional
 from core.config import settings
 from sqlalchemy.orm import Session
 from models.user import User
-from models.analysis import Analysis
+from core.deps import Principal
+from models.analysis import JOB_DONE, Analysis
 from services import point_service
+from services.analysis_service import ai_analysis_id_for
+from fastapi.concurrency import run_in_threadpool
 from services.ai_client import (
-    get_all_resources,
-    register_resource,
-    list_resource,
+    get_all_resources_async,
+    register_resource_async,
+    list_resource_async,
     _ensure_dict,
-    get_match_by_resource,
-    get_match_by_request
+    get_match_by_resource_async,
+    get_match_by_request_async,
 )
 from services.request_service import get_by_id_from_ai
+from services import ai_outbox, mirror_service
+from models.ai_outbox import AIOutbox
+from db.session import SessionLocal
 
-def finalize_resource(
+OP_RESOURCE_CREATE = "resource.create"
+
+def _get_owned_analysis(db: Session, analysis_id: str, username: str) -> Analysis | None:
+    return (
+        db.query(Analysis)
+        .filter(Analysis.ai_analysis_id == analysis_id, Analysis.username == username)
+        .first()
+    )
+
+def _enqueue_resource(db: Session, anal: Analysis, username: str, payload: Dict[str, Any], claim: bool) -> AIOutbox:
+    # 분석 결과 사용 처리와 AI 등록 작업 기록을 한 트랜잭션으로
+    try:
+        if hasattr(anal, "status"):
+            anal.status = "used"
+            db.add(anal)
+        row = ai_outbox.add(
+            db, OP_RESOURCE_CREATE,
+            entity_key=f"analysis:{anal.ai_analysis_id}",
+            username=username,
+            payload=payload,
+            claim=claim,
+        )
+        db.commit()
+        return row
+    except Exception:
+        db.rollback()
+        raise
+
+async def finalize_resource(
     *,
     db: Session,
-    user: User,
+    user: User | Principal,
     analysis_id: str,
     title: Optional[str] = None,
     item_name: Optional[str] = None,
@@ -29,14 +63,15 @@ def finalize_resource(
     material_type: Optional[str] = None,
     matched_request_id: Optional[str] = None,
     image_path: Optional[str] = None,
-) -> Dict[str, Any]:
-    anal = (
-        db.query(Analysis)
-        .filter(Analysis.ai_analysis_id == analysis_id, Analysis.username == user.username)
-        .first()
-    )
+    wait: bool = True,
+) -> ai_outbox.Delivery:
+    # wait=False 면 outbox 에 기록만 하고 바로 반환 (전달은 디스패처)
+    # 동기 DB 작업은 스레드풀에서 실행해 이벤트 루프를 막지 않음
+    anal = await run_in_threadpool(_get_owned_analysis, db, analysis_id, user.username)
     if not anal:
         raise ValueError("유효하지 않거나 소유자가 아닌 analysis_id 입니다.")
+    if anal.job_status != JOB_DONE:
+        raise ValueError("아직 분석 중이거나 분석에 실패한 analysis_id 입니다.")
 
 
     title = title or getattr(anal, "suggested_title", None) or getattr(anal, "detected_item", None) or "Resource"
@@ -55,32 +90,77 @@ def finalize_resource(
 
     amount_str = None if amount is None else str(amount)
 
-    created = register_resource(
-        analysis_id=analysis_id,
-        title=title,
-        description=description,
-        amount=amount_str,        
-        value=value or 0,
-        username=user.username,      
-        material_type=material_type,
-        item_type=item_type, 
-        item_name=item_name,
-        matched_request_id=matched_request_id,
-        image_path=image_path,
-    )
-    print("AI 요청 응답->", created)  
-
-    if hasattr(anal, "status"):
-        try:
-            anal.status = "used"
-            db.add(anal); db.commit()
-        except Exception:
-            db.rollback()
+    payload = {
+        "analysis_id": ai_analysis_id_for(anal),
+        "title": title,
+        "description": description,
+        "amount": amount_str,        
+        "value": value or 0,
+        "username": user.username,      
+        "material_type": material_type,
+        "item_type": item_type, 
+        "item_name": item_name,
+        "matched_request_id": matched_request_id,
+        "image_path": image_path,
+        "_analysis_row_id": anal.id,    # dead 일 때 사용 처리 되돌리기용 (AI 로는 안 보냄)
+    }
+    row = await run_in_threadpool(_enqueue_resource, db, anal, user.username, payload, wait)
+    delivery = await ai_outbox.submit(row, claim=wait)
+    if delivery.dead and delivery.error is not None:
+        raise delivery.error
+    return delivery
 
-    return created
+def _created_data(created: Dict[str, Any]) -> Dict[str, Any]:
+    return created.get("data") if isinstance(created.get("data"), dict) else created
 
-def list_by_username(username: str) -> Tuple[List[Dict[str, Any]], int]:
-    data = list_resource(username=username)
+async def _send_resource(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    created = await register_resource_async(**{k: v for k, v in payload.items() if not k.startswith("_")})
+    print("AI 요청 응답->", created)  
+    data = _created_data(created)
+    return created, data.get("resource_id") or data.get("id")
+
+def _mark_used_after_retry(analysis_row_id: Optional[int]) -> None:
+    # dead 에서 admin 재전달로 등록된 경우: 되돌렸던 사용 처리를 다시 반영
+    with SessionLocal() as db:
+        anal = db.get(Analysis, analysis_row_id) if analysis_row_id else None
+        if anal is not None and anal.status != "used":
+            anal.status = "used"
+            db.commit()
+
+async def _after_resource(row: AIOutbox, created: Dict[str, Any]) -> None:
+    if not row.ai_id:
+        return
+    await run_in_threadpool(_mark_used_after_retry, row.payload.get("_analysis_row_id"))
+    p = {k: v for k, v in row.payload.items() if not k.startswith("_")}
+    # 등록 직후 미러에 반영 (AI 응답 필드가 있으면 그 값을 우선)
+    await mirror_service.record(resources=[{
+        "title": p.get("title"),
+        "item_name": p.get("item_name"),
+        "description": p.get("description"),
+        "amount": p.get("amount"),
+        "value": p.get("value") or 0,
+        "username": p.get("username"),
+        "item_type": p.get("item_type"),
+        "material_type": p.get("material_type"),
+        "image_path": p.get("image_path"),
+        "status": "registered",
+        **_created_data(created),
+        "resource_id": str(row.ai_id),
+    }])
+
+def _resource_dead(db: Session, row: AIOutbox) -> None:
+    # 등록이 끝내 실패하면 분석 결과를 다시 쓸 수 있게
+    anal = db.get(Analysis, (row.payload or {}).get("_analysis_row_id"))
+    if anal is not None and anal.status == "used":
+        anal.status = "pending"
+
+ai_outbox.register(OP_RESOURCE_CREATE, _send_resource, after=_after_resource, on_dead=_resource_dead)
+
+async def list_by_username(username: str) -> Tuple[List[Dict[str, Any]], int]:
+    if mirror_service.is_ready():
+        rows, total, _next = await run_in_threadpool(mirror_service.query_resources, username=username)
+        return rows, total
+    data = await list_resource_async(username=username)
     raw_rows = data.get("resources", []) or []
     rows: List[Dict[str, Any]] = []
     for r in raw_rows:
@@ -90,35 +170,25 @@ def list_by_username(username: str) -> Tuple[List[Dict[str, Any]], int]:
     total = data.get("total", len(rows)) or len(rows)
     return rows, total
 
-def list_all_resources(
-    db: Session,
+async def list_all_resources(
     material_type: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 20,
     offset: int = 0,
-) -> Tuple[List[Dict[str, Any]], int]:
-    usernames: List[str] = [u.username for u in db.query(User).with_entities(User.username).all()]
-
-    aggregated: List[Dict[str, Any]] = []
-    for uname in usernames:
-        try:
-            data = list_resource(
-                username=uname,
-                material_type=material_type,
-                status=status,
-                limit=1000,
-                offset=0,
-            )
-            user_rows = data.get("resources", []) or []
-            for r in user_rows:
-                if isinstance(r, list):
-                    rec = _ensure_dict(r)
-                    rec["username"] = rec.get("username") or uname 
-                    aggregated.extend(r)
-                else:
-                    aggregated.append(r)
-        except Exception as e:
-            print(f"[경고] 사용자 {uname}의 자원 목록 조회에 실패했습니다: {e}")
+    after_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], int, Optional[int]]:
+    if mirror_service.is_ready():
+        return await run_in_threadpool(
+            mirror_service.query_resources,
+            material_type=material_type,
+            status=status,
+            limit=limit,
+            offset=offset,
+            after_id=after_id,
+        )
+
+    # 사용자별 list_resource 호출 대신 /resources/all 한 번으로 조회
+    raw_rows = await get_all_resources_async(material_type=material_type, status=status)
 
     def pass_filter(rec: Dict[str, Any]) -> bool:
         if material_type and rec.get("material_type") != material_type:
@@ -127,15 +197,21 @@ def list_all_resources(
             return False
         return True
 
-    filtered = [_ensure_dict(r) for r in aggregated if pass_filter(_ensure_dict(r))]
-
-    total = len(filtered)
-    sliced = filtered[offset : offset + limit]
+    # 필터/페이지 판정은 원본 dict 위에서 하고, 응답 페이지에 들어갈 행만 복사
+    total = 0
+    sliced: List[Dict[str, Any]] = []
+    for r in raw_rows:
+        rec = _ensure_dict(r)
+        if not rec or not pass_filter(rec):
+            continue
+        if offset <= total < offset + limit:
+            sliced.append(dict(rec))
+        total += 1
 
     for r in sliced:
         r.setdefault("status", "registered")
 
-    return sliced, total
+    return sliced, total, None
 
 
 def _to_int(v, default=0):
@@ -157,17 +233,61 @@ def _parse_amount(v) -> Optional[float]:
     except Exception:
         return None
 
-def award_points_if_matched(
+def _award_match_points(
+    db: Session,
+    *,
+    supplier_username: str | None,
+    requester_username: str | None,
+    value: int,
+    matched_resource_id: str,
+    item_title: str,
+    item_amount: Optional[float],
+) -> bool:
+    # 유저 resolve
+    supplier = db.query(User).filter_by(username=supplier_username).first() if supplier_username else None
+    requester = db.query(User).filter_by(username=requester_username).first() if requester_username else None
+    if not supplier or not requester:
+        print(f"[스킵] 지급 대상 부재 supplier={supplier_username}, requester={requester_username}")
+        return False
+
+    # 양쪽(중복 제거) 지급
+    try:
+        seen = set()
+        for u in [supplier, requester]:
+            if u.id in seen: 
+                continue
+            seen.add(u.id)
+            point_service.award(
+                db=db,
+                user_id=u.id,
+                amount=value,
+                ref_type="resource",
+                ref_id=matched_resource_id,
+                item_title=item_title,
+                item_amount=item_amount,
+                idempotency_key=f"match:{matched_resource_id}:{u.id}",
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[에러] 포인트 지급 중 예외: {e}")
+        raise
+    return True
+
+async def award_points_if_matched(
     db: Session,
     resource_id: str,
     request_id: Optional[str] = None,
     allow_on_accept: bool = False,
+    match: Optional[Dict[str, Any]] = None,
 ):
-    match_data: Dict[str, Any] = {}
-    try:
-        match_data = get_match_by_resource(resource_id)
-    except Exception:
-        match_data = {}
+    # match: 웹훅 등으로 이미 받은 매칭 스냅샷이 있으면 AI 재조회 생략
+    match_data: Dict[str, Any] = dict(match or {})
+    if not match_data:
+        try:
+            match_data = await get_match_by_resource_async(resource_id)
+        except Exception:
+            match_data = {}
 
     state = (match_data.get("status") or match_data.get("state") or "").lower()
     req_info = match_data.get("request") or {}
@@ -175,7 +295,7 @@ def award_points_if_matched(
 
     if state not in ("matched", "completed", "accepted") and request_id:
         try:
-            m2 = get_match_by_request(request_id)
+            m2 = await get_match_by_request_async(request_id)
             state2 = (m2.get("status") or m2.get("state") or "").lower()
             if state2 in ("matched", "completed", "accepted"):
                 match_data = m2
@@ -207,7 +327,7 @@ def award_points_if_matched(
 
     if (value <= 0) and supplier_username:
         try:
-            data = list_resource(username=supplier_username, limit=1000, offset=0)
+            data = await list_resource_async(username=supplier_username, limit=1000, offset=0)
             for r in data.get("resources") or []:
                 r = _ensure_dict(r)
                 rid = r.get("resource_id") or r.get("id")
@@ -222,7 +342,7 @@ def award_points_if_matched(
 
     if value <= 0:
         try:
-            for r in get_all_resources():
+            for r in await get_all_resources_async():
                 rid = r.get("resource_id") or r.get("id")
                 if str(rid) == str(matched_resource_id):
                     v2 = r.get("value")
@@ -243,44 +363,27 @@ def award_points_if_matched(
         return None
 
     if not requester_username and request_id:
-        req_obj = get_by_id_from_ai(request_id, status=None)
+        req_obj = await get_by_id_from_ai(request_id, status=None)
         if req_obj:
             requester_username = req_obj.get("username")
             req_info.setdefault("item_name", req_obj.get("item_name"))
             req_info.setdefault("amount", req_obj.get("amount"))
 
-    # 유저 resolve
-    supplier = db.query(User).filter_by(username=supplier_username).first() if supplier_username else None
-    requester = db.query(User).filter_by(username=requester_username).first() if requester_username else None
-    if not supplier or not requester:
-        print(f"[스킵] 지급 대상 부재 supplier={supplier_username}, requester={requester_username}")
-        return None
-
     item_title = (req_info.get("item_name")) or "자원 매칭"
     item_amount = _parse_amount(req_info.get("amount"))
 
-    # 양쪽(중복 제거) 지급
-    try:
-        seen = set()
-        for u in [supplier, requester]:
-            if u.id in seen: 
-                continue
-            seen.add(u.id)
-            point_service.award(
-                db=db,
-                user_id=u.id,
-                amount=value,
-                ref_type="resource",
-                ref_id=matched_resource_id,
-                item_title=item_title,
-                item_amount=item_amount,
-                idempotency_key=f"match:{matched_resource_id}:{u.id}",
-            )
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        print(f"[에러] 포인트 지급 중 예외: {e}")
-        raise
+    awarded = await run_in_threadpool(
+        _award_match_points,
+        db,
+        supplier_username=supplier_username,
+        requester_username=requester_username,
+        value=value,
+        matched_resource_id=matched_resource_id,
+        item_title=item_title,
+        item_amount=item_amount,
+    )
+    if not awarded:
+        return None
 
     print(f"[포인트 지급 완료] rid={matched_resource_id}, value={value}({value_src}), state={state}, supplier={supplier_username}, requester={requester_username}")
     return {
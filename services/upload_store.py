@@ -0,0 +1,225 @@
+# services/upload_store.py
+# 업로드 이미지를 내용(sha256) 기준으로 한 번만 저장 (content-addressed)
+# - 경로: {UPLOAD_DIR}/blobs/ab/<sha256>.<ext>. 내용이 같으면 같은 경로라 make_public_url 결과도 그대로
+# - 먼저 읽기만 하며 해시를 구하고, 이미 있는 내용이면 디스크에 쓰지 않음
+# - upload_refs 에 analysis / request / outbox 참조를 남기고, 참조 없이 오래된 blob 은 collect_garbage 로 정리
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core import images
+from core.config import settings
+from core.uploads import SavedUpload, _copy_to_disk, _digest
+from db.session import SessionLocal
+from models.upload import UploadBlob, UploadRef
+
+BLOB_DIR = Path(settings.UPLOAD_DIR) / "blobs"
+
+_lock = threading.Lock()
+_counters = {"stored": 0, "deduplicated": 0, "bytes_saved": 0, "normalized_reused": 0}
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+
+def _ext(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if 1 < len(ext) <= 10 else ".bin"
+
+
+def _blob_path(sha256: str, ext: str) -> Path:
+    return BLOB_DIR / sha256[:2] / f"{sha256}{ext}"
+
+
+def _saved(blob: UploadBlob, filename: str, content_type: str) -> SavedUpload:
+    return SavedUpload(
+        path=blob.path,
+        size=blob.size,
+        sha256=blob.sha256,
+        filename=filename or os.path.basename(blob.path),
+        content_type=content_type,
+    )
+
+
+def _register(sha256: str, size: int, filename: str, content_type: str, write: Callable[[Path], None]) -> SavedUpload:
+    # sha256 으로 blob 을 찾고, 없을 때만 write(dest) 로 파일을 만든 뒤 등록
+    with SessionLocal() as db:
+        blob = db.get(UploadBlob, sha256)
+        if blob is not None and os.path.exists(blob.path):
+            # 이미 있는 내용: 쓰기 없이 기존 경로 재사용 (GC 가 지우지 않도록 last_seen_at 만 갱신)
+            blob.last_seen_at = datetime.utcnow()
+            db.commit()
+            _count("deduplicated")
+            _count("bytes_saved", size)
+            return _saved(blob, filename, content_type)
+
+        dest = Path(blob.path) if blob is not None else _blob_path(sha256, _ext(filename))
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        write(dest)
+        _count("stored")
+        if blob is not None:
+            blob.last_seen_at = datetime.utcnow()
+            db.commit()
+            return _saved(blob, filename, content_type)
+
+        blob = UploadBlob(
+            sha256=sha256,
+            path=str(dest).replace("\\", "/"),
+            size=size,
+            content_type=content_type,
+        )
+        db.add(blob)
+        try:
+            db.commit()
+        except IntegrityError:
+            # 같은 내용이 동시에 올라옴: 먼저 등록된 쪽 경로를 쓰고, 확장자가 달라 생긴 파일은 지움
+            db.rollback()
+            winner = db.get(UploadBlob, sha256)
+            if winner.path != blob.path:
+                dest.unlink(missing_ok=True)
+            return _saved(winner, filename, content_type)
+        return _saved(blob, filename, content_type)
+
+
+def _store(src, filename: str, content_type: str, max_bytes: int) -> SavedUpload:
+    chunk_size = max(1, settings.UPLOAD_CHUNK_SIZE)
+    size, sha256 = _digest(src, max_bytes, chunk_size)
+    return _register(
+        sha256, size, filename, content_type,
+        lambda dest: _copy_to_disk(src, dest, max_bytes, chunk_size),
+    )
+
+
+async def store_upload(upload: UploadFile, *, max_bytes: Optional[int] = None) -> SavedUpload:
+    """업로드를 blob 저장소에 넣고 경로/크기/sha256 을 돌려준다 (같은 내용이면 기존 파일)"""
+    return await run_in_threadpool(
+        _store,
+        upload.file,
+        upload.filename or "",
+        upload.content_type or "application/octet-stream",
+        max_bytes or settings.UPLOAD_MAX_BYTES,
+    )
+
+
+# ---------------------------------------------------------------------------
+# AI 로 보낼 정규화본 (core/images.normalize). 원본 blob 의 normalized_sha256 에 결과를 기록해
+# 같은 원본은 한 번만 변환한다
+# ---------------------------------------------------------------------------
+
+_FORMAT_EXT = {"jpeg": (".jpg", "image/jpeg"), "webp": (".webp", "image/webp")}
+
+
+def _normalized_of(sha256: str, filename: str) -> Optional[SavedUpload]:
+    with SessionLocal() as db:
+        blob = db.get(UploadBlob, sha256)
+        if blob is None or not blob.normalized_sha256:
+            return None
+        target = db.get(UploadBlob, blob.normalized_sha256)
+        if target is None or not os.path.exists(target.path):
+            return None
+        target.last_seen_at = datetime.utcnow()
+        db.commit()
+        return _saved(target, filename, target.content_type or "application/octet-stream")
+
+
+def _link_normalized(sha256: str, normalized_sha256: str) -> None:
+    with SessionLocal() as db:
+        blob = db.get(UploadBlob, sha256)
+        if blob is not None:
+            blob.normalized_sha256 = normalized_sha256
+            db.commit()
+
+
+def _adopt(tmp: Path, sha256: str, size: int, filename: str, content_type: str) -> SavedUpload:
+    # 이미 만들어진 파일(tmp)을 blob 으로 옮김. 같은 내용이 이미 있으면 tmp 는 버림
+    try:
+        return _register(sha256, size, filename, content_type, lambda dest: os.replace(tmp, dest))
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+async def normalized(saved: SavedUpload) -> SavedUpload:
+    """saved 의 정규화본(회전 보정/축소/재인코딩). 바꿀 필요가 없거나 디코딩할 수 없으면 saved 그대로"""
+    if not (settings.IMAGE_PREPROCESS_ENABLED and images.available()):
+        return saved
+    cached = await run_in_threadpool(_normalized_of, saved.sha256, saved.filename)
+    if cached is not None:
+        _count("normalized_reused")
+        return cached
+
+    ext, content_type = _FORMAT_EXT.get(settings.IMAGE_FORMAT.lower(), _FORMAT_EXT["jpeg"])
+    tmp = BLOB_DIR / "tmp" / f"{uuid4().hex}{ext}"
+    tmp.parent.mkdir(parents=True, exist_ok=True)
+    result = await images.normalize_async(saved.path, str(tmp))
+
+    target = saved
+    if result is not None and result["changed"]:
+        name = os.path.splitext(saved.filename)[0] + ext
+        target = await run_in_threadpool(_adopt, tmp, result["sha256"], result["bytes_out"], name, content_type)
+    await run_in_threadpool(_link_normalized, saved.sha256, target.sha256)
+    return target
+
+
+def _add_ref(sha256: str, ref_type: str, ref_id: str) -> None:
+    with SessionLocal() as db:
+        db.add(UploadRef(sha256=sha256, ref_type=ref_type, ref_id=str(ref_id)))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()   # 같은 참조를 다시 기록 (재시도 등)
+
+
+async def add_ref(sha256: str, ref_type: str, ref_id: str) -> None:
+    """blob 을 참조하는 쪽 기록. ref_type: analysis(ai_analysis_id) | request(AI request_id)"""
+    try:
+        await run_in_threadpool(_add_ref, sha256, ref_type, ref_id)
+    except Exception as e:
+        # 참조 기록 실패는 요청을 실패시키지 않음 (GC 유예 시간 안에 다시 쓰이면 보존됨)
+        print(f"[경고] 업로드 참조 기록 실패 {ref_type}:{ref_id}: {e}")
+
+
+def hold_ref(db: Session, sha256: str, ref_type: str, ref_id: str) -> None:
+    # 호출자 트랜잭션 안에서 참조 추가 (commit 은 호출자). 예: AI 전달 전 outbox 행이 쥐고 있는 이미지
+    db.add(UploadRef(sha256=sha256, ref_type=ref_type, ref_id=str(ref_id)))
+
+
+def drop_ref(db: Session, ref_type: str, ref_id: str) -> None:
+    db.execute(delete(UploadRef).where(UploadRef.ref_type == ref_type, UploadRef.ref_id == str(ref_id)))
+
+
+def collect_garbage(db: Session, *, older_than: float = 3600.0) -> Dict[str, Any]:
+    """참조가 하나도 없고 older_than 초 동안 쓰이지 않은 blob 과 파일을 삭제"""
+    cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+    orphans = db.scalars(
+        select(UploadBlob)
+        .outerjoin(UploadRef, UploadRef.sha256 == UploadBlob.sha256)
+        .where(UploadRef.id.is_(None), UploadBlob.last_seen_at < cutoff)
+    ).all()
+    freed = 0
+    for blob in orphans:
+        Path(blob.path).unlink(missing_ok=True)
+        freed += blob.size
+        db.delete(blob)
+    db.commit()
+    return {"deleted": len(orphans), "bytes_freed": freed}
+
+
+def store_stats(db: Session) -> Dict[str, Any]:
+    blobs, total = db.execute(
+        select(func.count(), func.coalesce(func.sum(UploadBlob.size), 0)).select_from(UploadBlob)
+    ).one()
+    refs = db.scalar(select(func.count()).select_from(UploadRef))
+    with _lock:
+        counters = dict(_counters)
+    return {"blobs": blobs, "bytes": int(total), "refs": refs, **counters}
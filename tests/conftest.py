@@ -0,0 +1,12 @@
+# tests/conftest.py
+import os
+import sys
+
+# 저장소 루트를 import 경로에 (core / models / services 를 패키지 경로 그대로 import)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# core.config 는 DATABASE_URL 이 필수. 테스트는 각자 엔진을 만들어 쓰므로 자리만 채움
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "mysql: TEST_MYSQL_URL 로 지정한 MySQL 에서만 실행 (없으면 skip)")
@@ -0,0 +1,135 @@
+# tests/test_point_concurrency.py
+# point_service.award 동시성 스트레스
+# - 여러 스레드가 같은 사용자들에게 수천 건을 동시에 지급/차감 (일부는 같은 idempotency_key 로 중복 호출)
+# - 끝난 뒤 지갑 balance / lifetime_earned / level 이 원장 합계와 정확히 같아야 함
+# MySQL(ON DUPLICATE KEY + LAST_INSERT_ID 경로)은 TEST_MYSQL_URL 에 버려도 되는 DB 를 주면 실행:
+#   TEST_MYSQL_URL=mysql+pymysql://user:pw@127.0.0.1/points_test python -m pytest -m mysql tests
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import pytest
+from sqlalchemy import case, create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models.point import PointLedger, PointWallet
+from models.user import User
+from services import point_service
+
+USERS = 5
+AWARDS = 3000
+THREADS = 32
+DUPLICATE_EVERY = 7     # 이 간격마다 앞서 쓴 idempotency_key 를 다시 보냄
+
+_TABLES = [User.__table__, PointWallet.__table__, PointLedger.__table__]
+
+
+def _sqlite_engine(tmp_path):
+    # 파일 DB + busy timeout: 스레드마다 연결을 따로 잡고 쓰기 잠금은 기다렸다가 진행
+    return create_engine(
+        f"sqlite:///{tmp_path / 'points.db'}",
+        connect_args={"check_same_thread": False, "timeout": 60},
+        pool_size=THREADS,
+    )
+
+
+def _mysql_engine():
+    url = os.environ.get("TEST_MYSQL_URL")
+    if not url:
+        pytest.skip("TEST_MYSQL_URL 이 없어 MySQL 동시성 테스트는 건너뜀")
+    return create_engine(url, pool_size=THREADS, max_overflow=0, pool_pre_ping=True)
+
+
+def _create_tables(engine) -> None:
+    # PointLedger.user_id 는 index=True 와 Index("ix_point_ledger_user_id") 가 같은 이름이라
+    # metadata.create_all 로는 만들 수 없음 → 이름이 겹치는 인덱스는 한 번만
+    with engine.begin() as conn:
+        for t in _TABLES:
+            conn.execute(CreateTable(t))
+            seen = set()
+            for ix in sorted(t.indexes, key=lambda i: i.name):
+                if ix.name not in seen:
+                    seen.add(ix.name)
+                    conn.execute(CreateIndex(ix))
+
+
+@pytest.fixture(params=["sqlite", pytest.param("mysql", marks=pytest.mark.mysql)])
+def session_factory(request, tmp_path):
+    engine = _sqlite_engine(tmp_path) if request.param == "sqlite" else _mysql_engine()
+    for t in reversed(_TABLES):
+        t.drop(engine, checkfirst=True)
+    _create_tables(engine)
+    Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with Session() as db:
+        db.add_all([User(id=i, username=f"u{i}", hashed_password="x", name=f"u{i}") for i in range(1, USERS + 1)])
+        db.commit()
+    try:
+        yield Session
+    finally:
+        for t in reversed(_TABLES):
+            t.drop(engine, checkfirst=True)
+        engine.dispose()
+
+
+def _plan(seed: int) -> List[Tuple[int, int, str]]:
+    # (user_id, amount, idempotency_key). 중복 키는 처음과 같은 사용자/금액으로 다시 보냄
+    rnd = random.Random(seed)
+    plan: List[Tuple[int, int, str]] = []
+    for i in range(AWARDS):
+        if i and i % DUPLICATE_EVERY == 0:
+            plan.append(plan[rnd.randrange(len(plan))])
+            continue
+        amount = rnd.randint(1, 120) if rnd.random() < 0.8 else -rnd.randint(1, 40)
+        plan.append((rnd.randint(1, USERS), amount, f"stress:{i}"))
+    rnd.shuffle(plan)
+    return plan
+
+
+def _award(Session, user_id: int, amount: int, key: str) -> int:
+    with Session() as db:
+        try:
+            balance = point_service.award(db, user_id, amount, ref_type="stress", idempotency_key=key)
+            db.commit()
+            return balance
+        except Exception:
+            db.rollback()
+            raise
+
+
+def test_parallel_awards_keep_wallet_equal_to_ledger(session_factory):
+    Session = session_factory
+    plan = _plan(seed=10)
+
+    with ThreadPoolExecutor(THREADS) as ex:
+        list(ex.map(lambda p: _award(Session, *p), plan))
+
+    expected: Dict[int, Tuple[int, int]] = {}
+    for user_id, amount, _key in dict((key, (u, a, key)) for u, a, key in plan).values():
+        balance, earned = expected.get(user_id, (0, 0))
+        expected[user_id] = (balance + amount, earned + max(amount, 0))
+
+    with Session() as db:
+        ledger = {
+            uid: (int(bal), int(earned))
+            for uid, bal, earned in db.execute(
+                select(
+                    PointLedger.user_id,
+                    func.sum(PointLedger.delta),
+                    func.sum(case((PointLedger.delta > 0, PointLedger.delta), else_=0)),
+                ).group_by(PointLedger.user_id)
+            )
+        }
+        wallets = {
+            w.user_id: (w.balance, w.lifetime_earned, w.level)
+            for w in db.execute(select(PointWallet)).scalars()
+        }
+        n_rows = db.execute(select(func.count()).select_from(PointLedger)).scalar_one()
+
+        # 중복 키는 한 번만 기록
+        assert n_rows == len({key for _u, _a, key in plan})
+        assert ledger == expected
+        for user_id, (balance, earned) in ledger.items():
+            assert wallets[user_id] == (balance, earned, point_service._calc_level_info(earned)[0])
+        assert point_service.check_wallet_consistency(db) == []